@@ -0,0 +1,173 @@
+from policies import KeyList, SLRU
+from structures import register_policy
+
+MASK64 = (1 << 64) - 1
+# Odd 64-bit multipliers, one per sketch row
+ROW_SEEDS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93)
+# Halves both 4-bit counters packed into a byte
+HALVE = bytes(((b >> 1) & 0x77) for b in range(256))
+
+
+class CountMinSketch:
+    """
+    Count-min sketch of 4-bit saturating counters with periodic aging.
+
+    Memory is fixed at ``depth * width / 2`` bytes however many distinct
+    keys are seen. After ``sample_size`` increments every counter is halved
+    so old popularity fades out.
+    """
+
+    def __init__(self, width=1024, depth=4, sample_size=None):
+        if not 1 <= depth <= len(ROW_SEEDS):
+            raise ValueError(f"depth must be between 1 and {len(ROW_SEEDS)}")
+        # Round the width up to a power of two so rows index with a shift
+        self.width_bits = max(4, (width - 1).bit_length())
+        self.width = 1 << self.width_bits
+        self.depth = depth
+        self.table = bytearray(self.depth * self.width // 2)
+        self.sample_size = sample_size or 10 * self.width
+        self.additions = 0
+
+    def __sizeof__(self):
+        return object.__sizeof__(self) + self.table.__sizeof__()
+
+    def _indexes(self, key):
+        h = hash(key) & MASK64
+        h ^= h >> 33
+        shift = 64 - self.width_bits
+        for row in range(self.depth):
+            yield row * self.width + (((h * ROW_SEEDS[row]) & MASK64) >> shift)
+
+    def _counter(self, i):
+        b = self.table[i >> 1]
+        return (b >> 4) if i & 1 else (b & 0x0F)
+
+    def increment(self, key):
+        table = self.table
+        for i in self._indexes(key):
+            b = table[i >> 1]
+            if i & 1:
+                if b < 0xF0:
+                    table[i >> 1] = b + 0x10
+            elif b & 0x0F != 0x0F:
+                table[i >> 1] = b + 1
+        self.additions += 1
+        if self.additions >= self.sample_size:
+            self.age()
+
+    def estimate(self, key):
+        return min(self._counter(i) for i in self._indexes(key))
+
+    def age(self):
+        self.table = bytearray(self.table.translate(HALVE))
+        self.additions //= 2
+
+    def reset(self):
+        self.table = bytearray(len(self.table))
+        self.additions = 0
+
+
+class TinyLFU:
+    """
+    Frequency-based admission filter.
+
+    Every access is recorded in a CountMinSketch; a new key is only let in
+    over an eviction victim when its estimated frequency is higher.
+    """
+
+    def __init__(self, width=1024, depth=4, sample_size=None):
+        self.sketch = CountMinSketch(width, depth, sample_size)
+        self.admitted = 0
+        self.rejected = 0
+
+    def record(self, key):
+        self.sketch.increment(key)
+
+    def admit(self, candidate, victim):
+        if victim is None or self.sketch.estimate(candidate) > self.sketch.estimate(victim):
+            self.admitted += 1
+            return True
+        self.rejected += 1
+        return False
+
+    def stats(self):
+        total = self.admitted + self.rejected
+        return {
+            'admitted': self.admitted,
+            'rejected': self.rejected,
+            'admit_rate': self.admitted / total if total > 0 else 0,
+            'sketch_bytes': len(self.sketch.table)
+        }
+
+
+@register_policy("W-TinyLFU")
+class WTinyLFU:
+    """
+    Window TinyLFU: new keys land in a small LRU window; keys leaving the
+    window compete with the main SLRU's victim and only the more frequent of
+    the two stays.
+    """
+
+    def __init__(self, capacity, window_ratio=0.01):
+        self.capacity = capacity
+        self.window_capacity = max(1, int(capacity * window_ratio)) if capacity > 0 else 0
+        self.window = KeyList()
+        self.main = SLRU(capacity - self.window_capacity)
+        self.filter = TinyLFU(width=max(16, capacity))
+
+    def __contains__(self, key):
+        return key in self.window or key in self.main
+
+    def __len__(self):
+        return len(self.window) + len(self.main)
+
+    def touch(self, key):
+        self.filter.record(key)
+        if key in self.window:
+            self.window.move_to_front(key)
+            return True
+        return self.main.touch(key)
+
+    def admit(self, key, value=None):
+        if self.capacity <= 0:
+            return None
+        self.window.push_front(key)
+        if len(self.window) <= self.window_capacity:
+            return None
+        candidate = self.window.pop_back()
+        if self.main.capacity <= 0:
+            return candidate
+        victim = self.main.victim(candidate)
+        if not self.filter.admit(candidate, victim):
+            return candidate
+        return self.main.admit(candidate)
+
+    def discard(self, key):
+        if not self.window.remove(key):
+            self.main.discard(key)
+
+    def victim(self, key=None):
+        # The window's tail only leaves if it out-scores the main victim
+        if self.capacity <= 0 or len(self) < self.capacity:
+            return None
+        candidate = self.window.back()
+        if candidate is None:
+            return self.main.victim(key)
+        victim = self.main.victim(candidate)
+        if victim is None:
+            return None
+        sketch = self.filter.sketch
+        return victim if sketch.estimate(candidate) > sketch.estimate(victim) else candidate
+
+    def evict(self):
+        candidate = self.window.back()
+        if not len(self.main):
+            return self.window.pop_back() if candidate is not None else None
+        if candidate is None:
+            return self.main.evict()
+        main = self.main
+        victim = main.probation.back() if len(main.probation) else main.protected.back()
+        sketch = self.filter.sketch
+        if sketch.estimate(candidate) > sketch.estimate(victim):
+            return main.evict()
+        return self.window.pop_back()
@@ -0,0 +1,348 @@
+from array import array
+
+EMPTY = -1
+
+
+class NodeArena:
+    """
+    Fixed-capacity node storage held in parallel arrays.
+
+    Instead of one Node object per entry, a key maps to a slot index and the
+    slot's neighbours live in ``prev``/``next`` int columns. Lists are
+    circular, so a list is identified by its head slot alone and its tail is
+    ``prev[head]``.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = max(0, capacity)
+        self.prev = array('i', [EMPTY]) * self.capacity
+        self.next = array('i', [EMPTY]) * self.capacity
+        self.keys = [None] * self.capacity
+        self.vals = [None] * self.capacity
+        self.slots = {}
+        self.free = []
+        self.used = 0
+
+    def __len__(self):
+        return len(self.slots)
+
+    def __contains__(self, key):
+        return key in self.slots
+
+    def alloc(self, key, value):
+        if self.free:
+            slot = self.free.pop()
+        else:
+            slot = self.used
+            self.used += 1
+        self.keys[slot] = key
+        self.vals[slot] = value
+        self.slots[key] = slot
+        return slot
+
+    def release(self, slot):
+        del self.slots[self.keys[slot]]
+        self.keys[slot] = None
+        self.vals[slot] = None
+        self.free.append(slot)
+
+    def link_first(self, slot, head):
+        """Insert ``slot`` at the front of the list headed by ``head``; return the new head."""
+        prev, nxt = self.prev, self.next
+        if head == EMPTY:
+            prev[slot] = nxt[slot] = slot
+        else:
+            tail = prev[head]
+            prev[slot] = tail
+            nxt[slot] = head
+            nxt[tail] = slot
+            prev[head] = slot
+        return slot
+
+    def unlink(self, slot, head):
+        """Remove ``slot`` from the list headed by ``head``; return the new head."""
+        prev, nxt = self.prev, self.next
+        after = nxt[slot]
+        if after == slot:
+            return EMPTY
+        before = prev[slot]
+        nxt[before] = after
+        prev[after] = before
+        return after if head == slot else head
+
+    def load_slots(self, keys, values=None):
+        """Place ``keys`` in slots 0..n-1 and reset the free list."""
+        n = len(keys)
+        self.keys[:n] = keys
+        self.keys[n:] = [None] * (self.capacity - n)
+        self.vals[:n] = values if values is not None else [None] * n
+        self.vals[n:] = [None] * (self.capacity - n)
+        self.slots = dict(zip(keys, range(n)))
+        self.free = []
+        self.used = n
+
+    def link_range(self, start, end):
+        """Link slots start..end-1 into one circular list; return its head."""
+        if start >= end:
+            return EMPTY
+        self.next[start:end] = array('i', range(start + 1, end + 1))
+        self.prev[start:end] = array('i', range(start - 1, end - 1))
+        self.next[end - 1] = start
+        self.prev[start] = end - 1
+        return start
+
+    def iter_list(self, head):
+        slot = head
+        while slot != EMPTY:
+            yield slot
+            slot = self.next[slot]
+            if slot == head:
+                break
+
+
+class ArenaLRU:
+    """LRU with the same interface as ``structures.LRU``, backed by a NodeArena."""
+
+    def __init__(self, C):
+        self.capacity = C
+        self.arena = NodeArena(C)
+        self.head = EMPTY
+
+    def __contains__(self, key):
+        return key in self.arena.slots
+
+    def __len__(self):
+        return len(self.arena.slots)
+
+    def _move_to_front(self, slot):
+        if slot != self.head:
+            self.head = self.arena.unlink(slot, self.head)
+            self.head = self.arena.link_first(slot, self.head)
+
+    def get(self, key):
+        slot = self.arena.slots.get(key)
+        if slot is None:
+            return -1
+        self._move_to_front(slot)
+        return self.arena.vals[slot]
+
+    def put(self, key, value):
+        slot = self.arena.slots.get(key)
+        if slot is None:
+            self.admit(key, value)
+        else:
+            self.arena.vals[slot] = value
+            self._move_to_front(slot)
+
+    def touch(self, key):
+        slot = self.arena.slots.get(key)
+        if slot is None:
+            return False
+        self._move_to_front(slot)
+        return True
+
+    def admit(self, key, value=None):
+        if self.capacity <= 0:
+            return None
+        arena = self.arena
+        evicted = None
+        if len(arena.slots) >= self.capacity:
+            tail = arena.prev[self.head]
+            evicted = arena.keys[tail]
+            self.head = arena.unlink(tail, self.head)
+            arena.release(tail)
+        slot = arena.alloc(key, value)
+        self.head = arena.link_first(slot, self.head)
+        return evicted
+
+    def discard(self, key):
+        slot = self.arena.slots.get(key)
+        if slot is not None:
+            self.head = self.arena.unlink(slot, self.head)
+            self.arena.release(slot)
+
+    def victim(self, key=None):
+        if self.capacity <= 0 or len(self.arena.slots) < self.capacity:
+            return None
+        return self.arena.keys[self.arena.prev[self.head]]
+
+    def evict(self):
+        if not self.arena.slots:
+            return None
+        key = self.arena.keys[self.arena.prev[self.head]]
+        self.discard(key)
+        return key
+
+    def snapshot_order(self):
+        arena = self.arena
+        return [arena.keys[s] for s in arena.iter_list(self.head)], None
+
+    def load_order(self, keys, freqs=None, values=None):
+        keys = keys[:self.arena.capacity]
+        self.arena.load_slots(keys, values[:len(keys)] if values is not None else None)
+        self.head = self.arena.link_range(0, len(keys))
+
+
+class ArenaLFU:
+    """LFU with the same interface as ``structures.LFU``, backed by a NodeArena."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.arena = NodeArena(capacity)
+        self.freq = array('Q', [0]) * self.arena.capacity
+        self.freq_heads = {}
+        self.min_freq = 0
+
+    def __contains__(self, key):
+        return key in self.arena.slots
+
+    def __len__(self):
+        return len(self.arena.slots)
+
+    def _unlink(self, slot):
+        f = self.freq[slot]
+        head = self.arena.unlink(slot, self.freq_heads[f])
+        if head == EMPTY:
+            del self.freq_heads[f]
+        else:
+            self.freq_heads[f] = head
+        return head
+
+    def _link(self, slot, f):
+        self.freq[slot] = f
+        self.freq_heads[f] = self.arena.link_first(slot, self.freq_heads.get(f, EMPTY))
+
+    def update_freq(self, slot):
+        old_f = self.freq[slot]
+        if self._unlink(slot) == EMPTY and old_f == self.min_freq:
+            self.min_freq += 1
+        self._link(slot, old_f + 1)
+
+    def get(self, key):
+        slot = self.arena.slots.get(key)
+        if slot is None:
+            return -1
+        self.update_freq(slot)
+        return self.arena.vals[slot]
+
+    def put(self, key, value):
+        slot = self.arena.slots.get(key)
+        if slot is None:
+            self.admit(key, value)
+        else:
+            self.arena.vals[slot] = value
+            self.update_freq(slot)
+
+    def touch(self, key):
+        slot = self.arena.slots.get(key)
+        if slot is None:
+            return False
+        self.update_freq(slot)
+        return True
+
+    def admit(self, key, value=None):
+        if self.capacity <= 0:
+            return None
+        arena = self.arena
+        evicted = None
+        if len(arena.slots) >= self.capacity:
+            head = self.freq_heads.get(self.min_freq, EMPTY)
+            if head != EMPTY:
+                victim = arena.prev[head]
+                evicted = arena.keys[victim]
+                self._unlink(victim)
+                arena.release(victim)
+        slot = arena.alloc(key, value)
+        self._link(slot, 1)
+        self.min_freq = 1
+        return evicted
+
+    def discard(self, key):
+        slot = self.arena.slots.get(key)
+        if slot is None:
+            return
+        f = self.freq[slot]
+        self._unlink(slot)
+        self.arena.release(slot)
+        if f == self.min_freq and f not in self.freq_heads:
+            self.min_freq = min(self.freq_heads, default=0)
+
+    def victim(self, key=None):
+        if self.capacity <= 0 or len(self.arena.slots) < self.capacity:
+            return None
+        head = self.freq_heads.get(self.min_freq, EMPTY)
+        return self.arena.keys[self.arena.prev[head]] if head != EMPTY else None
+
+    def evict(self):
+        if not self.arena.slots:
+            return None
+        key = self.arena.keys[self.arena.prev[self.freq_heads[self.min_freq]]]
+        self.discard(key)
+        return key
+
+    def snapshot_order(self):
+        arena = self.arena
+        keys = []
+        freqs = []
+        for f in sorted(self.freq_heads):
+            group = [arena.keys[s] for s in arena.iter_list(self.freq_heads[f])]
+            keys.extend(group)
+            freqs.extend([f] * len(group))
+        return keys, freqs
+
+    def load_order(self, keys, freqs, values=None):
+        drop = max(0, len(keys) - self.arena.capacity)
+        keys, freqs = keys[drop:], freqs[drop:]
+        values = values[drop:] if values is not None else None
+        arena = self.arena
+        arena.load_slots(keys, values)
+        self.freq = array('Q', freqs) + array('Q', [0]) * (arena.capacity - len(keys))
+        self.freq_heads = {}
+        start = 0
+        while start < len(keys):
+            f = freqs[start]
+            end = start
+            while end < len(keys) and freqs[end] == f:
+                end += 1
+            self.freq_heads[f] = arena.link_range(start, end)
+            start = end
+        self.min_freq = freqs[0] if keys else 0
+
+
+def benchmark_storage(n=100000, ops=200000, seed=0):
+    """Compare bytes per entry and ops/sec of Node/DLL policies against the arena ones."""
+    import gc
+    import random
+    import time
+    import tracemalloc
+    from structures import LRU, LFU
+
+    rng = random.Random(seed)
+    keys = [rng.randint(0, 2 * n) for _ in range(ops)]
+    results = {}
+    for name, cls in (("LRU", LRU), ("ArenaLRU", ArenaLRU), ("LFU", LFU), ("ArenaLFU", ArenaLFU)):
+        gc.collect()
+        tracemalloc.start()
+        base = tracemalloc.get_traced_memory()[0]
+        cache = cls(n)
+        for i in range(n):
+            cache.put(i, None)
+        used = tracemalloc.get_traced_memory()[0] - base
+        tracemalloc.stop()
+
+        start = time.perf_counter()
+        for k in keys:
+            if cache.get(k) == -1:
+                cache.put(k, None)
+        elapsed = time.perf_counter() - start
+        results[name] = {
+            'bytes_per_entry': used / n,
+            'ops_per_sec': len(keys) / elapsed if elapsed > 0 else 0
+        }
+        del cache
+    return results
+
+
+if __name__ == "__main__":
+    for name, r in benchmark_storage().items():
+        print(f"{name:10s} {r['bytes_per_entry']:8.1f} B/entry {r['ops_per_sec']:12.0f} ops/s")
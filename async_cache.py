@@ -0,0 +1,149 @@
+import asyncio
+import inspect
+
+
+def _fail(fut, error):
+    if fut.done():
+        return
+    if isinstance(error, asyncio.CancelledError):
+        fut.cancel()
+    else:
+        fut.set_exception(error)
+
+
+def _consume_exception(fut):
+    # Waiters may all have been cancelled; don't warn about an unread error
+    if not fut.cancelled():
+        fut.exception()
+
+
+async def _call(loader, arg):
+    result = loader(arg)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+class AsyncLoadingCache:
+    """
+    asyncio front end for DynamicCache with single-flight miss coalescing.
+
+    Concurrent misses on the same key share one in-flight load. The load runs
+    as its own task, so cancelling one waiter never cancels it for the rest.
+    Loader errors, and errors storing the loaded value, reach every waiter
+    and nothing is cached, so the next call retries. Loaders may be plain functions or coroutines.
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.in_flight = {}
+        self.tasks = set()
+        self.loads = 0
+        self.coalesced = 0
+        self.load_errors = 0
+
+    def _future(self, key):
+        fut = asyncio.get_running_loop().create_future()
+        fut.add_done_callback(_consume_exception)
+        self.in_flight[key] = fut
+        return fut
+
+    def _spawn(self, coro):
+        # The loop only keeps weak references to tasks
+        task = asyncio.get_running_loop().create_task(coro)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def get_or_load(self, key, loader):
+        """Return the cached value for ``key``, calling ``loader(key)`` once on a miss."""
+        value = self.cache.get(key)
+        if value != -1:
+            return value
+        fut = self.in_flight.get(key)
+        if fut is None:
+            fut = self._future(key)
+            self._spawn(self._load_one(key, loader, fut))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(fut)
+
+    async def _load_one(self, key, loader, fut):
+        self.loads += 1
+        try:
+            value = await _call(loader, key)
+            self.cache.put(key, value)
+        except BaseException as e:
+            self.load_errors += 1
+            _fail(fut, e)
+            if not isinstance(e, Exception):
+                raise
+        else:
+            if not fut.done():
+                fut.set_result(value)
+        finally:
+            self.in_flight.pop(key, None)
+
+    async def get_many_or_load(self, keys, batch_loader):
+        """
+        Look up ``keys`` and load every miss with one ``batch_loader(missing)``
+        call, which returns a dict. Keys already being loaded are joined
+        rather than reloaded. Keys the loader does not return are left out
+        of the result.
+        """
+        found, misses = self.cache.get_many(keys)
+        if not misses:
+            return found
+
+        waiting = {}
+        to_load = []
+        for key in misses:
+            fut = self.in_flight.get(key)
+            if fut is None:
+                to_load.append(key)
+                waiting[key] = self._future(key)
+            else:
+                self.coalesced += 1
+                waiting[key] = fut
+        if to_load:
+            futures = {key: waiting[key] for key in to_load}
+            self._spawn(self._load_batch(to_load, batch_loader, futures))
+
+        results = await asyncio.shield(asyncio.gather(*waiting.values(), return_exceptions=True))
+        for key, result in zip(waiting, results):
+            if isinstance(result, KeyError) and result.args == (key,):
+                continue
+            if isinstance(result, BaseException):
+                raise result
+            found[key] = result
+        return found
+
+    async def _load_batch(self, keys, batch_loader, futures):
+        self.loads += 1
+        try:
+            loaded = dict(await _call(batch_loader, list(keys)))
+            self.cache.put_many([(k, loaded[k]) for k in keys if k in loaded])
+        except BaseException as e:
+            self.load_errors += 1
+            for fut in futures.values():
+                _fail(fut, e)
+            if not isinstance(e, Exception):
+                raise
+        else:
+            for key, fut in futures.items():
+                if fut.done():
+                    continue
+                if key in loaded:
+                    fut.set_result(loaded[key])
+                else:
+                    fut.set_exception(KeyError(key))
+        finally:
+            for key in futures:
+                self.in_flight.pop(key, None)
+
+    def stats(self):
+        return {
+            'in_flight': len(self.in_flight),
+            'loads': self.loads,
+            'coalesced': self.coalesced,
+            'load_errors': self.load_errors
+        }
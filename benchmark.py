@@ -0,0 +1,168 @@
+"""
+Benchmark suite: every registered policy and DynamicCache against the
+synthetic workloads in workloads.py.
+
+For each (workload, policy) pair it measures hit ratio, throughput,
+per-request latency percentiles and memory per entry, and writes the
+results as JSON for plotter.plot_benchmark_results.
+
+Example:
+    python benchmark.py --quick --output benchmark_results.json
+"""
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from instrumentation import LatencyHistogram
+from replay import replay
+from structures import POLICY_REGISTRY, DynamicCache, create_policy
+from workloads import WORKLOADS, make_workload
+
+DYNAMIC = "Dynamic"
+QUICK = {'ops': 20000, 'capacity': 500}
+FULL = {'ops': 200000, 'capacity': 2000}
+
+
+def scaled_params(workload, capacity):
+    """Workload parameters sized relative to the cache so runs stay comparable."""
+    return {
+        'zipf': {'keys': 10 * capacity},
+        'scan-hot': {'hot_keys': capacity, 'scan_length': 2 * capacity, 'scan_every': 10 * capacity},
+        'shifting': {'keys': 10 * capacity},
+        'phases': {'keys': 10 * capacity, 'window': capacity, 'phase_length': 20 * capacity},
+        'loop': {'loop_size': capacity * 6 // 5},
+    }.get(workload, {})
+
+
+def _build(name, capacity, dynamic_policies):
+    if name == DYNAMIC:
+        return DynamicCache(capacity, policies=dynamic_policies)
+    return create_policy(name, capacity)
+
+
+def _latency(cache, keys):
+    # Separate pass so timer overhead does not skew the throughput figure
+    hist = LatencyHistogram()
+    clock = time.perf_counter_ns
+    if hasattr(cache, "store"):
+        get, put = cache.get, cache.put
+        for key in keys:
+            start = clock()
+            if get(key) == -1:
+                put(key, key)
+            hist.record(clock() - start)
+    else:
+        touch, admit = cache.touch, cache.admit
+        for key in keys:
+            start = clock()
+            if not touch(key):
+                admit(key)
+            hist.record(clock() - start)
+    return hist.summary()
+
+
+def _memory_per_entry(name, capacity, dynamic_policies):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        cache = _build(name, capacity, dynamic_policies)
+        if hasattr(cache, "store"):
+            for key in range(capacity):
+                cache.put(key, None)
+        else:
+            for key in range(capacity):
+                cache.admit(key)
+        used = tracemalloc.get_traced_memory()[0] - base
+    finally:
+        tracemalloc.stop()
+    entries = len(cache)
+    return used / entries if entries else 0
+
+
+def run_one(name, keys, capacity, warmup=0, dynamic_policies=("LRU", "LFU")):
+    result = replay([keys], _build(name, capacity, dynamic_policies), warmup=warmup)
+    result.pop("switches", None)
+    result["latency"] = _latency(_build(name, capacity, dynamic_policies), keys)
+    result["bytes_per_entry"] = _memory_per_entry(name, capacity, dynamic_policies)
+    return result
+
+
+def run_suite(policies=None, workloads=None, ops=FULL['ops'], capacity=FULL['capacity'],
+              seed=0, warmup_ratio=0.1, dynamic_policies=("LRU", "LFU"), progress=None):
+    """
+    Run every policy in ``policies`` (default: all registered ones plus
+    DynamicCache) on every workload. Returns a JSON-serializable dict.
+    """
+    policies = list(policies or list(POLICY_REGISTRY) + [DYNAMIC])
+    workloads = list(workloads or WORKLOADS)
+    warmup = int(ops * warmup_ratio)
+    results = {}
+    params = {}
+    for workload in workloads:
+        params[workload] = scaled_params(workload, capacity)
+        keys = make_workload(workload, ops, seed=seed, **params[workload])
+        results[workload] = {}
+        for name in policies:
+            if progress is not None:
+                progress(workload, name)
+            results[workload][name] = run_one(name, keys, capacity, warmup, tuple(dynamic_policies))
+    return {
+        'config': {
+            'ops': ops,
+            'capacity': capacity,
+            'seed': seed,
+            'warmup': warmup,
+            'dynamic_policies': list(dynamic_policies),
+            'workload_params': params,
+            'python': platform.python_version(),
+            'platform': platform.platform()
+        },
+        'results': results
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark eviction policies on synthetic workloads")
+    parser.add_argument("--quick", action="store_true", help="small run for a smoke test")
+    parser.add_argument("--ops", type=int)
+    parser.add_argument("--capacity", type=int)
+    parser.add_argument("--policies", help=f"comma-separated; default all registered plus {DYNAMIC}")
+    parser.add_argument("--workloads", help="comma-separated; default " + ",".join(WORKLOADS))
+    parser.add_argument("--dynamic-policies", default="LRU,LFU",
+                        help="candidates for DynamicCache")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    defaults = QUICK if args.quick else FULL
+    suite = run_suite(
+        policies=args.policies.split(",") if args.policies else None,
+        workloads=args.workloads.split(",") if args.workloads else None,
+        ops=args.ops or defaults['ops'],
+        capacity=args.capacity or defaults['capacity'],
+        seed=args.seed,
+        dynamic_policies=args.dynamic_policies.split(","),
+        progress=lambda w, p: print(f"{w:10s} {p}", file=sys.stderr)
+    )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(suite, f, indent=2)
+    else:
+        json.dump(suite, sys.stdout, indent=2)
+        print()
+
+    for workload, by_policy in suite['results'].items():
+        print(f"\n{workload}", file=sys.stderr)
+        for name, r in by_policy.items():
+            print(f"  {name:10s} hit {r['hit_ratio']:.3f}  {r['ops_per_sec']:10.0f} ops/s  "
+                  f"p99 {r['latency']['p99_ns']:7d} ns  {r['bytes_per_entry']:6.1f} B/entry",
+                  file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+"""
+asyncio client for one or more SwapCache servers (server.py).
+
+Keys are spread over the servers with a consistent-hash ring of virtual
+nodes, so adding or removing a server only moves about 1/N of the keys.
+Each server has a small pool of connections; a batch of commands for one
+server is written in one go and its replies read back in order
+(pipelining), and batches for different servers run concurrently.
+
+Example:
+    client = CacheClient([("127.0.0.1", 7379), ("127.0.0.1", 7380)])
+    await client.mset({"a": b"1", "b": b"2"})
+    values = await client.mget(["a", "b", "c"])   # [b"1", b"2", None]
+    await client.close()
+"""
+import asyncio
+import bisect
+import hashlib
+import json
+
+from resp import Parser, ReplyError, encode_command, to_bytes
+
+DEFAULT_VNODES = 160
+
+
+def _hash(data):
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+
+class HashRing:
+    """Consistent-hash ring with ``vnodes`` points per node."""
+
+    def __init__(self, nodes=(), vnodes=DEFAULT_VNODES):
+        self.vnodes = vnodes
+        self.points = []  # sorted hashes
+        self.owners = []  # node for each point
+        self.nodes = []
+        for node in nodes:
+            self.add(node)
+
+    def add(self, node):
+        if node in self.nodes:
+            return
+        self.nodes.append(node)
+        label = _label(node)
+        for i in range(self.vnodes):
+            point = _hash(b"%s#%d" % (label, i))
+            at = bisect.bisect(self.points, point)
+            self.points.insert(at, point)
+            self.owners.insert(at, node)
+
+    def remove(self, node):
+        if node not in self.nodes:
+            return
+        self.nodes.remove(node)
+        keep = [(p, n) for p, n in zip(self.points, self.owners) if n != node]
+        self.points = [p for p, _ in keep]
+        self.owners = [n for _, n in keep]
+
+    def node_for(self, key):
+        if not self.points:
+            raise LookupError("HashRing has no nodes")
+        at = bisect.bisect(self.points, _hash(to_bytes(key)))
+        return self.owners[at % len(self.owners)]
+
+
+def _label(node):
+    if isinstance(node, tuple):
+        return ("%s:%s" % node).encode()
+    return to_bytes(node)
+
+
+class Connection:
+    """One TCP connection that sends pipelined batches of commands."""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.parser = Parser()
+        self.broken = False
+
+    @classmethod
+    async def open(cls, host, port):
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def execute_many(self, commands):
+        """Send encoded ``commands`` in one write; returns their replies in order."""
+        try:
+            self.writer.write(b"".join(commands))
+            replies = []
+            parser = self.parser
+            while len(replies) < len(commands):
+                for reply in parser:
+                    replies.append(reply)
+                if len(replies) >= len(commands):
+                    break
+                data = await self.reader.read(1 << 16)
+                if not data:
+                    raise ConnectionError("server closed the connection")
+                parser.feed(data)
+            return replies
+        except BaseException:
+            # Replies may be half read; never reuse this connection
+            self.broken = True
+            raise
+
+    def close(self):
+        self.writer.close()
+
+
+class ConnectionPool:
+    """Up to ``size`` connections to one server, reused most-recent first."""
+
+    def __init__(self, host, port, size=8, connect_timeout=5.0):
+        self.host = host
+        self.port = port
+        self.size = size
+        self.connect_timeout = connect_timeout
+        self.idle = []
+        self.open_count = 0
+        self.available = asyncio.Condition()
+        self.created = 0
+
+    async def acquire(self):
+        async with self.available:
+            while not self.idle and self.open_count >= self.size:
+                await self.available.wait()
+            if self.idle:
+                return self.idle.pop()
+            self.open_count += 1
+        try:
+            conn = await asyncio.wait_for(Connection.open(self.host, self.port), self.connect_timeout)
+        except BaseException:
+            async with self.available:
+                self.open_count -= 1
+                self.available.notify()
+            raise
+        self.created += 1
+        return conn
+
+    async def release(self, conn):
+        async with self.available:
+            if conn.broken:
+                conn.close()
+                self.open_count -= 1
+            else:
+                self.idle.append(conn)
+            self.available.notify()
+
+    async def execute_many(self, commands):
+        conn = await self.acquire()
+        try:
+            return await conn.execute_many(commands)
+        finally:
+            await self.release(conn)
+
+    async def close(self):
+        async with self.available:
+            for conn in self.idle:
+                conn.close()
+            self.open_count -= len(self.idle)
+            self.idle.clear()
+
+
+def _check(reply):
+    if isinstance(reply, ReplyError):
+        raise reply
+    return reply
+
+
+class Pipeline:
+    """
+    Commands queued on a CacheClient and sent on ``execute``: one write
+    per server, servers in parallel, replies in queueing order.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.queued = []  # (node, encoded command)
+
+    def __len__(self):
+        return len(self.queued)
+
+    def _queue(self, key, *args):
+        self.queued.append((self.client.ring.node_for(key), encode_command(*args)))
+        return self
+
+    def get(self, key):
+        return self._queue(key, "GET", key)
+
+    def set(self, key, value, ex=None):
+        if ex is None:
+            return self._queue(key, "SET", key, value)
+        return self._queue(key, "SET", key, value, "EX", ex)
+
+    async def execute(self, raise_on_error=True):
+        queued, self.queued = self.queued, []
+        by_node = {}
+        for i, (node, command) in enumerate(queued):
+            by_node.setdefault(node, ([], []))
+            by_node[node][0].append(i)
+            by_node[node][1].append(command)
+        results = [None] * len(queued)
+        nodes = list(by_node)
+        replies = await asyncio.gather(*(self.client.pools[node].execute_many(by_node[node][1])
+                                         for node in nodes))
+        for node, node_replies in zip(nodes, replies):
+            for i, reply in zip(by_node[node][0], node_replies):
+                results[i] = reply
+        if raise_on_error:
+            for reply in results:
+                _check(reply)
+        return results
+
+
+class CacheClient:
+    """
+    Client for a set of servers given as ``(host, port)`` pairs. Keys may
+    be str or bytes; values are sent as bytes (str is UTF-8 encoded) and
+    come back as bytes, or None on a miss.
+    """
+
+    def __init__(self, servers, vnodes=DEFAULT_VNODES, pool_size=8, connect_timeout=5.0):
+        servers = [tuple(s) for s in servers]
+        if not servers:
+            raise ValueError("at least one server is required")
+        self.ring = HashRing(servers, vnodes)
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.pools = {s: ConnectionPool(s[0], s[1], pool_size, connect_timeout) for s in servers}
+
+    def add_server(self, server):
+        server = tuple(server)
+        self.pools.setdefault(server, ConnectionPool(server[0], server[1], self.pool_size, self.connect_timeout))
+        self.ring.add(server)
+
+    async def remove_server(self, server):
+        server = tuple(server)
+        self.ring.remove(server)
+        pool = self.pools.pop(server, None)
+        if pool is not None:
+            await pool.close()
+
+    def pipeline(self):
+        return Pipeline(self)
+
+    async def _one(self, key, *args):
+        replies = await self.pools[self.ring.node_for(key)].execute_many([encode_command(*args)])
+        return _check(replies[0])
+
+    async def get(self, key):
+        return await self._one(key, "GET", key)
+
+    async def set(self, key, value, ex=None):
+        if ex is None:
+            await self._one(key, "SET", key, value)
+        else:
+            await self._one(key, "SET", key, value, "EX", ex)
+
+    def _group(self, keys):
+        groups = {}
+        for i, key in enumerate(keys):
+            groups.setdefault(self.ring.node_for(key), []).append(i)
+        return groups
+
+    async def mget(self, keys):
+        """Values for ``keys`` in order (None for misses); one MGET per server."""
+        keys = list(keys)
+        groups = self._group(keys)
+        nodes = list(groups)
+        replies = await asyncio.gather(*(
+            self.pools[node].execute_many([encode_command("MGET", *(keys[i] for i in groups[node]))])
+            for node in nodes))
+        values = [None] * len(keys)
+        for node, reply in zip(nodes, replies):
+            for i, value in zip(groups[node], _check(reply[0])):
+                values[i] = value
+        return values
+
+    async def mset(self, items):
+        """Store a dict or ``(key, value)`` pairs; one MSET per server."""
+        if isinstance(items, dict):
+            items = items.items()
+        items = list(items)
+        groups = self._group([key for key, _ in items])
+        commands = []
+        for node, indexes in groups.items():
+            args = []
+            for i in indexes:
+                args.extend(items[i])
+            commands.append(self.pools[node].execute_many([encode_command("MSET", *args)]))
+        for reply in await asyncio.gather(*commands):
+            _check(reply[0])
+
+    async def ping(self):
+        """Round trip to every server; returns {server: seconds}."""
+        loop = asyncio.get_running_loop()
+
+        async def one(node):
+            start = loop.time()
+            _check((await self.pools[node].execute_many([encode_command("PING")]))[0])
+            return loop.time() - start
+
+        nodes = list(self.pools)
+        return dict(zip(nodes, await asyncio.gather(*(one(n) for n in nodes))))
+
+    async def stats(self):
+        nodes = list(self.pools)
+        replies = await asyncio.gather(*(self.pools[n].execute_many([encode_command("STATS")]) for n in nodes))
+        return {f"{n[0]}:{n[1]}": json.loads(_check(r[0])) for n, r in zip(nodes, replies)}
+
+    async def close(self):
+        for pool in self.pools.values():
+            await pool.close()
@@ -0,0 +1,159 @@
+"""
+Opt-in value compression for DynamicCache.
+
+Large ``bytes``/``str`` values are stored compressed with zlib or lzma.
+Before compressing, a byte-entropy probe over a few small windows of the
+value skips data that is already dense (images, archives, ciphertext), and
+results that save too little are kept as-is. Decompressed copies of the
+most recently read entries sit in a small LRU so hot reads skip decoding.
+
+Example:
+    cache = DynamicCache(10000, max_bytes=512 << 20, codec=ValueCodec(threshold=8192))
+"""
+import lzma
+import math
+import sys
+import time
+import zlib
+from collections import Counter, OrderedDict
+
+ALGORITHMS = ("zlib", "lzma")
+PROBE_WINDOW = 512
+COUNTERS = ('encoded', 'compressed', 'skipped_small', 'skipped_entropy', 'skipped_ratio',
+            'raw_bytes', 'stored_bytes', 'decoded', 'hot_hits', 'encode_seconds', 'decode_seconds')
+
+
+class Compressed:
+    """A compressed value as held in the cache's store."""
+    __slots__ = ('data', 'algorithm', 'is_str', 'size')
+
+    def __init__(self, data, algorithm, is_str, size):
+        self.data = data
+        self.algorithm = algorithm
+        self.is_str = is_str
+        self.size = size  # uncompressed bytes
+
+    def __sizeof__(self):
+        # Lets estimate_size and byte budgets charge the compressed payload
+        return object.__sizeof__(self) + sys.getsizeof(self.data)
+
+    def __reduce__(self):
+        return Compressed, (self.data, self.algorithm, self.is_str, self.size)
+
+
+def decompress(blob):
+    data = zlib.decompress(blob.data) if blob.algorithm == "zlib" else lzma.decompress(blob.data)
+    return data.decode("utf-8") if blob.is_str else data
+
+
+def byte_entropy(data, window=PROBE_WINDOW):
+    """Shannon entropy in bits per byte of the start, middle and end of ``data``."""
+    if len(data) > 3 * window:
+        mid = len(data) // 2
+        data = data[:window] + data[mid:mid + window] + data[-window:]
+    if not data:
+        return 0.0
+    n = len(data)
+    return -sum(c / n * math.log2(c / n) for c in Counter(data).values())
+
+
+class ValueCodec:
+    """
+    Compresses values of at least ``threshold`` bytes.
+
+    max_entropy: skip values whose probed entropy (bits per byte, 8 is
+        random) is above this.
+    min_saving: keep the original unless compression saves this fraction.
+    hot_entries: decompressed values kept for the most recently read keys.
+    """
+
+    def __init__(self, threshold=4096, algorithm="zlib", level=None, max_entropy=7.2,
+                 min_saving=0.1, hot_entries=64):
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Unknown algorithm: {algorithm!r}")
+        self.threshold = threshold
+        self.algorithm = algorithm
+        self.level = level
+        self.max_entropy = max_entropy
+        self.min_saving = min_saving
+        self.hot_entries = hot_entries
+        self.hot = OrderedDict()  # key -> (stored blob, decoded value)
+        self.counts = dict.fromkeys(COUNTERS, 0)
+
+    def clone(self):
+        """A codec with the same settings and its own state (one per shard)."""
+        return ValueCodec(self.threshold, self.algorithm, self.level, self.max_entropy,
+                          self.min_saving, self.hot_entries)
+
+    def _compress(self, data):
+        if self.algorithm == "zlib":
+            return zlib.compress(data, 6 if self.level is None else self.level)
+        return lzma.compress(data, preset=6 if self.level is None else self.level)
+
+    def encode(self, key, value):
+        """What to store for ``value``: a Compressed blob or the value itself."""
+        self.hot.pop(key, None)
+        is_str = isinstance(value, str)
+        if not is_str and not isinstance(value, (bytes, bytearray)):
+            return value
+        counts = self.counts
+        counts['encoded'] += 1
+        # str length is a lower bound on its UTF-8 size, good enough to gate on
+        if len(value) < self.threshold:
+            counts['skipped_small'] += 1
+            return value
+        start = time.perf_counter()
+        data = value.encode("utf-8") if is_str else bytes(value)
+        if byte_entropy(data) > self.max_entropy:
+            counts['skipped_entropy'] += 1
+            counts['encode_seconds'] += time.perf_counter() - start
+            return value
+        packed = self._compress(data)
+        counts['encode_seconds'] += time.perf_counter() - start
+        if len(packed) > len(data) * (1 - self.min_saving):
+            counts['skipped_ratio'] += 1
+            return value
+        counts['compressed'] += 1
+        counts['raw_bytes'] += len(data)
+        counts['stored_bytes'] += len(packed)
+        return Compressed(packed, self.algorithm, is_str, len(data))
+
+    def decode(self, key, stored):
+        """The original value for what ``encode`` returned."""
+        if not isinstance(stored, Compressed):
+            return stored
+        hot = self.hot
+        entry = hot.get(key)
+        if entry is not None and entry[0] is stored:
+            hot.move_to_end(key)
+            self.counts['hot_hits'] += 1
+            return entry[1]
+        start = time.perf_counter()
+        value = decompress(stored)
+        self.counts['decode_seconds'] += time.perf_counter() - start
+        self.counts['decoded'] += 1
+        if self.hot_entries > 0:
+            hot[key] = (stored, value)
+            hot.move_to_end(key)
+            if len(hot) > self.hot_entries:
+                hot.popitem(last=False)
+        return value
+
+    def discard(self, key):
+        self.hot.pop(key, None)
+
+    def stats(self):
+        return codec_stats([self])
+
+
+def codec_stats(codecs):
+    """Combined counters and compression ratio for one or more codecs."""
+    counts = dict.fromkeys(COUNTERS, 0)
+    for codec in codecs:
+        for name, value in codec.counts.items():
+            counts[name] += value
+    counts['ratio'] = counts['raw_bytes'] / counts['stored_bytes'] if counts['stored_bytes'] else 1.0
+    reads = counts['decoded'] + counts['hot_hits']
+    counts['hot_hit_rate'] = counts['hot_hits'] / reads if reads else 0
+    counts['hot_entries'] = sum(len(codec.hot) for codec in codecs)
+    return counts
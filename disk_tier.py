@@ -0,0 +1,248 @@
+"""
+Memory-mapped L2 tier for entries evicted from a DynamicCache.
+
+Evicted values are pickled and appended to a log in one preallocated,
+memory-mapped segment file; an in-memory index maps each key to its
+newest record. Overwrites and discards only drop index entries, leaving
+dead records behind. Once the log fills past ``compact_at`` of the
+segment, a background thread copies the newest live records (up to
+``retain`` of the segment) into a fresh segment and swaps it in, so the
+oldest entries age out the way they would in a FIFO.
+
+The segment is scratch space: it is recreated on open and removed on
+close. Use persistence.py for data that must survive a restart.
+
+Example:
+    cache = DynamicCache(1000, l2=DiskTier("/tmp/swapcache.l2", max_bytes=256 << 20))
+"""
+import mmap
+import os
+import pickle
+import threading
+import time
+
+from persistence import RECORD_HEADER
+
+PICKLE_ERRORS = (pickle.PicklingError, TypeError, AttributeError)
+
+
+class DiskTier:
+    """
+    Append-only, memory-mapped key/value log with background compaction.
+    Safe to share between threads (and between the shards of a
+    ShardedDynamicCache).
+    """
+
+    def __init__(self, path, max_bytes=64 << 20, compact_at=0.75, retain=0.5, background=True):
+        if max_bytes <= RECORD_HEADER.size:
+            raise ValueError("max_bytes is too small for a single record")
+        if not 0 < retain < compact_at <= 1:
+            raise ValueError("expected 0 < retain < compact_at <= 1")
+        self.path = path
+        self.max_bytes = max_bytes
+        self.compact_at = compact_at
+        self.retain = retain
+        self.background = background
+        self.lock = threading.Lock()
+        self.compact_lock = threading.Lock()  # one rewrite at a time
+        self.file, self.map = self._open(path)
+        self.index = {}  # key -> (offset, record size, deadline)
+        self.tail = 0
+        self.live_bytes = 0
+        self.appended = None  # keys written while a compaction runs
+        self.compactor = None
+        self.closed = False
+        self.writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejected = 0
+        self.compactions = 0
+        self.compact_seconds = 0.0
+
+    def _open(self, path):
+        f = open(path, "w+b")
+        f.truncate(self.max_bytes)  # sparse on most filesystems
+        return f, mmap.mmap(f.fileno(), self.max_bytes)
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def put(self, key, value, deadline=None):
+        """Append ``key``; returns False if the value cannot be stored."""
+        try:
+            kb = pickle.dumps(key, pickle.HIGHEST_PROTOCOL)
+            vb = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        except PICKLE_ERRORS:
+            self.rejected += 1
+            return False
+        size = RECORD_HEADER.size + len(kb) + len(vb)
+        if size > self.max_bytes * self.retain:
+            self.discard(key)
+            self.rejected += 1
+            return False
+        if self.tail + size > self.max_bytes:
+            # Full: make room now, unless a running compaction already did
+            with self.compact_lock:
+                if self.tail + size > self.max_bytes:
+                    self._rewrite()
+        with self.lock:
+            if self.closed or self.tail + size > self.max_bytes:
+                self.rejected += 1
+                return False
+            offset = self.tail
+            end = offset + RECORD_HEADER.size
+            self.map[offset:end] = RECORD_HEADER.pack(len(kb), len(vb))
+            self.map[end:end + len(kb)] = kb
+            self.map[end + len(kb):offset + size] = vb
+            self.tail = offset + size
+            old = self.index.get(key)
+            if old is not None:
+                self.live_bytes -= old[1]
+            self.index[key] = (offset, size, deadline)
+            self.live_bytes += size
+            self.writes += 1
+            if self.appended is not None:
+                self.appended.append(key)
+            start = self.compactor is None and self.tail >= self.max_bytes * self.compact_at
+        if start:
+            self._start_compaction()
+        return True
+
+    def fetch(self, key):
+        """``(value, deadline)`` for ``key``, or None if it is not stored."""
+        with self.lock:
+            entry = self.index.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            offset, size, deadline = entry
+            record = self.map[offset:offset + size]  # copied, so safe after unlock
+            self.hits += 1
+        klen, _ = RECORD_HEADER.unpack_from(record)
+        return pickle.loads(record[RECORD_HEADER.size + klen:]), deadline
+
+    def discard(self, key):
+        with self.lock:
+            entry = self.index.pop(key, None)
+            if entry is not None:
+                self.live_bytes -= entry[1]
+
+    def _start_compaction(self):
+        if not self.background:
+            self._compact()
+            return
+        with self.lock:
+            if self.compactor is not None or self.closed:
+                return
+            self.compactor = threading.Thread(target=self._compact, name="swapcache-l2-compact", daemon=True)
+        self.compactor.start()
+
+    def _compact(self):
+        try:
+            with self.compact_lock:
+                self._rewrite()
+        finally:
+            with self.lock:
+                if self.compactor is threading.current_thread():
+                    self.compactor = None
+
+    def _rewrite(self):
+        """Copy the newest live records into a fresh segment and swap it in."""
+        began = time.perf_counter()
+        with self.lock:
+            if self.closed:
+                return
+            end = self.tail
+            old_map = self.map
+            entries = sorted(self.index.items(), key=lambda item: item[1][0])
+            self.appended = []
+
+        # Keep the newest records that fit in the retained share of the segment
+        budget = int(self.max_bytes * self.retain)
+        kept = []
+        for key, (offset, size, _) in reversed(entries):
+            if size > budget:
+                break
+            budget -= size
+            kept.append((key, offset, size))
+        kept.reverse()
+
+        # Records below ``end`` never change, so they are copied without the lock
+        new_path = self.path + ".compact"
+        new_file, new_map = self._open(new_path)
+        moved = {}
+        pos = 0
+        for key, offset, size in kept:
+            new_map[pos:pos + size] = old_map[offset:offset + size]
+            moved[key] = (offset, pos)
+            pos += size
+
+        with self.lock:
+            index = {}
+            for key, (old_offset, new_offset) in moved.items():
+                entry = self.index.get(key)
+                if entry is not None and entry[0] == old_offset:
+                    index[key] = (new_offset, entry[1], entry[2])
+            # Writes that landed while copying go to the new tail. Kept records
+            # came from below ``end`` and these from above it, so they fit;
+            # a record that would not is dropped rather than overrun the map
+            for key in dict.fromkeys(self.appended):
+                entry = self.index.get(key)
+                if entry is not None and entry[0] >= end:
+                    offset, size, deadline = entry
+                    if pos + size > self.max_bytes:
+                        continue
+                    new_map[pos:pos + size] = old_map[offset:offset + size]
+                    index[key] = (pos, size, deadline)
+                    pos += size
+            self.evictions += len(self.index) - len(index)
+            self.appended = None
+            old_file = self.file
+            self.map, self.file = new_map, new_file
+            self.index = index
+            self.tail = pos
+            self.live_bytes = sum(entry[1] for entry in index.values())
+            old_map.close()
+            old_file.close()
+            os.replace(new_path, self.path)
+            self.compactions += 1
+            self.compact_seconds += time.perf_counter() - began
+
+    def compact(self):
+        """Compact now, after any background run has finished."""
+        self._compact()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.index),
+            'live_bytes': self.live_bytes,
+            'log_bytes': self.tail,
+            'max_bytes': self.max_bytes,
+            'writes': self.writes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups > 0 else 0,
+            'evictions': self.evictions,
+            'rejected': self.rejected,
+            'compactions': self.compactions,
+            'compact_seconds': self.compact_seconds
+        }
+
+    def close(self):
+        # Holding compact_lock waits out any rewrite still reading the old map
+        with self.compact_lock, self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            self.index.clear()
+            self.map.close()
+            self.file.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
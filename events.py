@@ -0,0 +1,139 @@
+"""
+Opt-in event stream from DynamicCache.
+
+Each event records the cache's operation count, what happened and the key
+it happened to. Events are kept in a bounded ring buffer and passed to any
+subscribers as they occur. Residency (which keys were cached when) can be
+rebuilt from the insert/hit/evict/expire events in a few vectorized passes,
+without copying cache state on every operation.
+"""
+from collections import deque, namedtuple
+
+INSERT = "insert"
+HIT = "hit"
+EVICT = "evict"
+SWITCH = "switch"
+EXPIRE = "expire"
+KINDS = (INSERT, HIT, EVICT, SWITCH, EXPIRE)
+
+Event = namedtuple("Event", "step kind key detail")
+
+
+class EventLog:
+    """
+    Ring buffer of the last ``maxlen`` events plus optional subscribers.
+    ``kinds`` limits what is recorded (e.g. skip "hit" on read-heavy runs).
+    """
+
+    def __init__(self, maxlen=65536, kinds=None):
+        if kinds is not None:
+            unknown = set(kinds) - set(KINDS)
+            if unknown:
+                raise ValueError(f"Unknown event kinds: {sorted(unknown)}")
+        self.buffer = deque(maxlen=maxlen)
+        self.kinds = frozenset(kinds) if kinds is not None else None
+        self.subscribers = []
+        self.emitted = 0
+        self.counts = dict.fromkeys(KINDS, 0)
+
+    def __len__(self):
+        return len(self.buffer)
+
+    def __iter__(self):
+        return iter(self.buffer)
+
+    def emit(self, step, kind, key=None, detail=None):
+        if self.kinds is not None and kind not in self.kinds:
+            return
+        event = Event(step, kind, key, detail)
+        self.buffer.append(event)
+        self.emitted += 1
+        self.counts[kind] += 1
+        for callback in self.subscribers:
+            callback(event)
+
+    def subscribe(self, callback):
+        """Call ``callback(event)`` for every future event; returns the callback."""
+        self.subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        self.subscribers.remove(callback)
+
+    def events(self, kind=None):
+        if kind is None:
+            return list(self.buffer)
+        return [e for e in self.buffer if e.kind == kind]
+
+    def clear(self):
+        self.buffer.clear()
+
+    def stats(self):
+        return {
+            'emitted': self.emitted,
+            'buffered': len(self.buffer),
+            'dropped': self.emitted - len(self.buffer),
+            'by_kind': dict(self.counts)
+        }
+
+
+def residency_matrix(events, max_steps=500, max_keys=None):
+    """
+    Rebuild which keys were resident over time from insert, hit, evict and
+    expire events.
+
+    Returns ``(matrix, keys, edges)``: a boolean matrix with one row per key
+    and one column per step bin, the row keys, and the ``max_steps + 1`` bin
+    edges in operation steps. A key counts as resident in a bin if it was
+    resident at the end of it. Keys whose first event is a hit or an
+    eviction were resident before the buffer starts; keys with no events in
+    the buffer at all cannot be seen. With ``max_keys`` only the keys
+    resident for the most bins are kept.
+    """
+    import numpy as np
+
+    index = {}
+    rows = []
+    steps = []
+    deltas = []
+    for event in events:
+        if event.kind == INSERT:
+            delta = 1
+        elif event.kind in (EVICT, EXPIRE):
+            delta = -1
+        elif event.kind == HIT:
+            delta = 0  # only tells us the key was already cached
+        else:
+            continue
+        row = index.get(event.key)
+        if row is None:
+            row = index[event.key] = len(index)
+        rows.append(row)
+        steps.append(event.step)
+        deltas.append(delta)
+
+    keys = list(index)
+    if not rows:
+        return np.zeros((0, 0), dtype=bool), keys, np.zeros(0)
+
+    rows = np.asarray(rows, dtype=np.int64)
+    steps = np.asarray(steps, dtype=np.int64)
+    deltas = np.asarray(deltas, dtype=np.int64)
+    first, last = int(steps.min()), int(steps.max())
+    bins = max(1, min(max_steps, last - first + 1))
+    edges = np.linspace(first, last + 1, bins + 1)
+    cols = np.clip(np.searchsorted(edges, steps, side="right") - 1, 0, bins - 1)
+
+    change = np.zeros((len(keys), bins + 1), dtype=np.int64)
+    np.add.at(change, (rows, cols + 1), deltas)
+    # Keys first seen hit or leaving were already cached when the buffer begins
+    _, first_event = np.unique(rows, return_index=True)
+    resident_before = rows[first_event[deltas[first_event] <= 0]]
+    change[resident_before, 0] += 1
+    matrix = np.cumsum(change, axis=1)[:, 1:] > 0
+
+    if max_keys is not None and len(keys) > max_keys:
+        keep = np.sort(np.argsort(-matrix.sum(axis=1), kind="stable")[:max_keys])
+        matrix = matrix[keep]
+        keys = [keys[i] for i in keep]
+    return matrix, keys, edges
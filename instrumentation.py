@@ -0,0 +1,130 @@
+import time
+from array import array
+
+# Each power of two is split into 2**SUB_BITS linear sub-buckets, which keeps
+# the relative error of any reported percentile under ~12%.
+SUB_BITS = 3
+SUB_BUCKETS = 1 << SUB_BITS
+# Enough buckets for anything up to 2**63 ns
+NUM_BUCKETS = (64 - SUB_BITS) * SUB_BUCKETS + 2 * SUB_BUCKETS
+
+
+def bucket_index(value):
+    shift = value.bit_length() - SUB_BITS - 1
+    if shift <= 0:
+        return value
+    return shift * SUB_BUCKETS + (value >> shift)
+
+
+def bucket_bounds(index):
+    if index < 2 * SUB_BUCKETS:
+        return index, index + 1
+    shift = index // SUB_BUCKETS - 1
+    low = (index - shift * SUB_BUCKETS) << shift
+    return low, low + (1 << shift)
+
+
+class LatencyHistogram:
+    """Fixed-size, log-bucketed histogram of nanosecond latencies."""
+
+    def __init__(self):
+        self.counts = array('Q', bytes(8 * NUM_BUCKETS))
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, ns):
+        if ns < 0:
+            ns = 0
+        self.counts[bucket_index(ns)] += 1
+        self.count += 1
+        self.total += ns
+        if ns > self.max:
+            self.max = ns
+
+    def merge(self, other):
+        for i, c in enumerate(other.counts):
+            if c:
+                self.counts[i] += c
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, q):
+        if self.count == 0:
+            return 0
+        rank = max(1, int(round(q / 100.0 * self.count)))
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank:
+                low, high = bucket_bounds(i)
+                return min((low + high) // 2, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'mean_ns': self.total / self.count if self.count else 0,
+            'p50_ns': self.percentile(50),
+            'p99_ns': self.percentile(99),
+            'p999_ns': self.percentile(99.9),
+            'max_ns': self.max
+        }
+
+
+class Instrumentation:
+    """
+    Switchable per-operation latency recorder.
+
+    Latencies are kept in one histogram per (op, outcome, policy). Set
+    ``sample_every`` to time only every Nth operation, or ``enabled`` to
+    False to turn timing off entirely.
+    """
+
+    def __init__(self, enabled=True, sample_every=1):
+        self.enabled = enabled
+        self.sample_every = max(1, sample_every)
+        self.histograms = {}
+        self._tick = 0
+
+    def start(self):
+        """Return a start timestamp if this operation is sampled, else 0."""
+        if not self.enabled:
+            return 0
+        self._tick += 1
+        if self._tick < self.sample_every:
+            return 0
+        self._tick = 0
+        return time.perf_counter_ns()
+
+    def stop(self, start, op, hit, policy):
+        elapsed = time.perf_counter_ns() - start
+        key = (op, 'hit' if hit else 'miss', policy)
+        hist = self.histograms.get(key)
+        if hist is None:
+            hist = self.histograms[key] = LatencyHistogram()
+        hist.record(elapsed)
+
+    def merge(self, other):
+        for key, hist in other.histograms.items():
+            mine = self.histograms.get(key)
+            if mine is None:
+                mine = self.histograms[key] = LatencyHistogram()
+            mine.merge(hist)
+
+    def reset(self):
+        self.histograms.clear()
+        self._tick = 0
+
+    def combined(self, op=None, outcome=None, policy=None):
+        merged = LatencyHistogram()
+        for (o, out, p), hist in self.histograms.items():
+            if op not in (None, o) or outcome not in (None, out) or policy not in (None, p):
+                continue
+            merged.merge(hist)
+        return merged
+
+    def summary(self):
+        return {f"{op}.{outcome}.{policy}": hist.summary()
+                for (op, outcome, policy), hist in sorted(self.histograms.items())}
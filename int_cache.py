@@ -0,0 +1,266 @@
+"""
+NumPy-backed cache for dense, non-negative integer keys.
+
+Keys index straight into a key -> slot array, and each slot's key, value,
+last access time and frequency live in parallel arrays, so there is no
+dict lookup or Node per entry. Batch operations are vectorized:
+``get_many`` over an int64 array of keys returns a hit mask, and
+``put_many`` picks all of a batch's victims with one ``argpartition``.
+
+Victims are the least recently used slots ("LRU") or the least frequently
+used with recency as tie-break ("LFU"). Within one batch, lookups see the
+cache as it was before the batch, so a trace replayed in batches of
+``get_many``/``put_many`` matches a sequential replay closely only while
+batches are much smaller than the capacity.
+
+Example:
+    cache = IntKeyCache(10000, policy="LFU")
+    hits = cache.get_many(keys)        # bool mask, one entry per key
+    cache.put_many(keys[~hits])
+"""
+import argparse
+import time
+
+import numpy as np
+
+EMPTY = -1
+POLICIES = ("LRU", "LFU")
+
+
+class IntKeyCache:
+    """
+    Fixed-capacity cache over integer keys in ``[0, key_range)``; the key
+    table grows (doubling) when larger keys are put.
+    """
+
+    def __init__(self, capacity, policy="LRU", key_range=1 << 16, value_dtype=object):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy: {policy!r}")
+        self.capacity = capacity
+        self.policy = policy
+        self.slot_of = np.full(max(1, key_range), EMPTY, dtype=np.int64)
+        self.keys = np.full(capacity, EMPTY, dtype=np.int64)  # slot -> key
+        self.values = np.empty(capacity, dtype=value_dtype)
+        self.last_access = np.zeros(capacity, dtype=np.int64)
+        self.freq = np.zeros(capacity, dtype=np.int64)
+        self.count = 0
+        self.clock = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, key):
+        return 0 <= key < self.slot_of.size and self.slot_of[key] != EMPTY
+
+    def _slots(self, keys):
+        # Slot per key, EMPTY for keys outside the table
+        slot_of = self.slot_of
+        if keys.size and keys.min() >= 0 and keys.max() < slot_of.size:
+            return slot_of[keys]
+        slots = np.full(keys.shape, EMPTY, dtype=np.int64)
+        inside = (keys >= 0) & (keys < slot_of.size)
+        slots[inside] = slot_of[keys[inside]]
+        return slots
+
+    def _reserve(self, max_key):
+        size = self.slot_of.size
+        if max_key < size:
+            return
+        while size <= max_key:
+            size *= 2
+        grown = np.full(size, EMPTY, dtype=np.int64)
+        grown[:self.slot_of.size] = self.slot_of
+        self.slot_of = grown
+
+    def _values(self, values, n):
+        if values is None:
+            return None
+        if isinstance(values, np.ndarray) and values.shape == (n,):
+            return values
+        if self.values.dtype != object:
+            return np.asarray(values, dtype=self.values.dtype)
+        out = np.empty(n, dtype=object)
+        # Element by element, so tuples and lists stay single values
+        for i, value in enumerate(values):
+            out[i] = value
+        return out
+
+    def get(self, key):
+        """Value for ``key``, or -1 on a miss."""
+        self.clock += 1
+        if 0 <= key < self.slot_of.size:
+            slot = self.slot_of[key]
+            if slot != EMPTY:
+                self.last_access[slot] = self.clock
+                self.freq[slot] += 1
+                self.hits += 1
+                return self.values[slot]
+        self.misses += 1
+        return -1
+
+    def put(self, key, value=None):
+        self.put_many(np.array([key], dtype=np.int64), None if value is None else [value])
+
+    def get_many(self, keys, with_values=False):
+        """
+        Look up an array of keys. Returns a boolean hit mask, or
+        ``(mask, values)`` with the hit keys' values in order when
+        ``with_values`` is set.
+        """
+        keys = np.asarray(keys, dtype=np.int64).ravel()
+        slots = self._slots(keys)
+        mask = slots != EMPTY
+        hit_slots = slots[mask]
+        if hit_slots.size:
+            # Repeated keys keep their latest position in the batch
+            times = self.clock + 1 + np.flatnonzero(mask)
+            np.maximum.at(self.last_access, hit_slots, times)
+            self.freq += np.bincount(hit_slots, minlength=self.capacity)
+        self.clock += keys.size
+        self.hits += int(hit_slots.size)
+        self.misses += int(keys.size - hit_slots.size)
+        if with_values:
+            return mask, self.values[hit_slots]
+        return mask
+
+    def _victims(self, n, protected):
+        if self.policy == "LRU":
+            score = self.last_access.astype(np.float64)
+        else:
+            # Frequency first; the fractional recency term only breaks ties
+            score = self.freq + self.last_access / (self.clock + 1.0)
+        score[self.keys == EMPTY] = -np.inf  # free slots first
+        score[protected] = np.inf
+        return np.argpartition(score, n - 1)[:n]
+
+    def put_many(self, keys, values=None):
+        """
+        Insert or update an array of keys (the last value wins for repeated
+        keys). Returns the evicted keys.
+        """
+        keys = np.asarray(keys, dtype=np.int64).ravel()
+        n = keys.size
+        if n == 0:
+            return keys
+        if keys.min() < 0:
+            raise ValueError("IntKeyCache keys must be non-negative")
+        self._reserve(int(keys.max()))
+        values = self._values(values, n)
+
+        unique, last_rev, counts = np.unique(keys[::-1], return_index=True, return_counts=True)
+        last = n - 1 - last_rev  # each key's final position in the batch
+        times = self.clock + 1 + last
+        slots = self.slot_of[unique]
+        present = slots != EMPTY
+
+        updated = slots[present]
+        self.last_access[updated] = times[present]
+        self.freq[updated] += counts[present]
+        if values is not None:
+            self.values[updated] = values[last[present]]
+
+        new = ~present
+        new_keys = unique[new]
+        new_last = last[new]
+        new_times = times[new]
+        new_counts = counts[new]
+        room = self.capacity - updated.size
+        if new_keys.size > room:
+            # More new keys than slots: only the latest ones would survive
+            keep = np.argsort(new_times)[-room:] if room > 0 else np.zeros(0, dtype=np.int64)
+            new_keys, new_last, new_times, new_counts = (
+                new_keys[keep], new_last[keep], new_times[keep], new_counts[keep])
+
+        evicted = np.zeros(0, dtype=np.int64)
+        if new_keys.size:
+            target = self._victims(new_keys.size, updated)
+            old = self.keys[target]
+            evicted = old[old != EMPTY]
+            self.slot_of[evicted] = EMPTY
+            self.evictions += evicted.size
+            self.count += new_keys.size - evicted.size
+            self.keys[target] = new_keys
+            self.slot_of[new_keys] = target
+            self.last_access[target] = new_times
+            self.freq[target] = new_counts
+            if values is not None:
+                self.values[target] = values[new_last]
+            elif self.values.dtype == object:
+                self.values[target] = None
+        self.clock += n
+        return evicted
+
+    def discard(self, key):
+        if key not in self:
+            return
+        slot = self.slot_of[key]
+        self.slot_of[key] = EMPTY
+        self.keys[slot] = EMPTY
+        self.values[slot] = None if self.values.dtype == object else 0
+        self.last_access[slot] = 0
+        self.freq[slot] = 0
+        self.count -= 1
+
+    def stats(self):
+        total = self.hits + self.misses
+        arrays = (self.slot_of, self.keys, self.values, self.last_access, self.freq)
+        return {
+            'policy': self.policy,
+            'capacity': self.capacity,
+            'entries': self.count,
+            'key_range': int(self.slot_of.size),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total > 0 else 0,
+            'miss_rate': self.misses / total if total > 0 else 0,
+            'evictions': self.evictions,
+            'array_bytes': sum(a.nbytes for a in arrays)
+        }
+
+
+def benchmark_batch(batch=100000, capacity=10000, keys_range=20000, policy="LFU", seed=0):
+    """Time one batched lookup of ``batch`` keys against DynamicCache.get_many."""
+    from structures import DynamicCache
+
+    rng = np.random.default_rng(seed)
+    warm = rng.integers(1, keys_range + 1, size=batch)
+    probe = rng.integers(1, keys_range + 1, size=batch)
+
+    cache = IntKeyCache(capacity, policy=policy, key_range=keys_range + 1)
+    cache.put_many(warm)
+    start = time.perf_counter()
+    mask = cache.get_many(probe)
+    int_s = time.perf_counter() - start
+
+    dynamic = DynamicCache(capacity, policies=(policy,))
+    dynamic.put_many((k, None) for k in warm.tolist())
+    probe_list = probe.tolist()
+    start = time.perf_counter()
+    found, _ = dynamic.get_many(probe_list)
+    dynamic_s = time.perf_counter() - start
+
+    return {
+        'batch': batch,
+        'capacity': capacity,
+        'int_cache_ms': int_s * 1e3,
+        'int_cache_hit_rate': float(mask.mean()),
+        'dynamic_ms': dynamic_s * 1e3,
+        'dynamic_hit_rate': sum(1 for k in probe_list if k in found) / batch,
+        'speedup': dynamic_s / int_s if int_s > 0 else float("inf")
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batched lookups: IntKeyCache vs DynamicCache")
+    parser.add_argument("--batch", type=int, default=100000)
+    parser.add_argument("--capacity", type=int, default=10000)
+    parser.add_argument("--keys-range", type=int, default=20000)
+    parser.add_argument("--policy", choices=POLICIES, default="LFU")
+    args = parser.parse_args()
+    for name, value in benchmark_batch(args.batch, args.capacity, args.keys_range, args.policy).items():
+        print(f"{name:20s} {value:.3f}" if isinstance(value, float) else f"{name:20s} {value}")
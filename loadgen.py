@@ -0,0 +1,165 @@
+"""
+Load generator for SwapCache servers.
+
+Replays a seeded workload from workloads.py as GET-then-SET-on-miss
+traffic (plus a share of blind SETs) from many concurrent workers, and
+reports throughput and latency percentiles. With ``pipeline`` > 1 each
+worker sends that many commands per round trip, and latency is measured
+per batch.
+
+Example:
+    python loadgen.py --spawn 3 --ops 200000 --concurrency 32 --pipeline 16
+    python loadgen.py --servers 127.0.0.1:7379,127.0.0.1:7380
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+from client import CacheClient
+from instrumentation import LatencyHistogram
+from workloads import WORKLOADS, make_workload
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+async def _worker(client, keys, pipeline, value, write_every, hist, counts):
+    clock = time.perf_counter_ns
+    for begin in range(0, len(keys), pipeline):
+        batch = keys[begin:begin + pipeline]
+        pipe = client.pipeline()
+        for i, key in enumerate(batch, begin):
+            if write_every and i % write_every == 0:
+                pipe.set(key, value)
+            else:
+                pipe.get(key)
+        start = clock()
+        replies = await pipe.execute()
+        misses = [key for key, reply in zip(batch, replies) if reply is None]
+        if misses:
+            pipe = client.pipeline()
+            for key in misses:
+                pipe.set(key, value)
+            await pipe.execute()
+        hist.record(clock() - start)
+        counts['requests'] += len(batch) + len(misses)
+        counts['misses'] += len(misses)
+
+
+async def run_load(servers, ops=100000, concurrency=16, pipeline=1, workload="zipf",
+                   keys=100000, value_size=100, write_ratio=0.0, seed=0, pool_size=None):
+    """
+    Drive ``servers`` (``(host, port)`` pairs) with ``ops`` keyed
+    operations from ``concurrency`` workers. Returns a JSON-serializable
+    summary.
+    """
+    params = {'keys': keys} if workload in ("zipf", "shifting") else {}
+    trace = [f"key:{k}" for k in make_workload(workload, ops, seed=seed, **params)]
+    client = CacheClient(servers, pool_size=pool_size or concurrency)
+    value = os.urandom(value_size)
+    write_every = round(1 / write_ratio) if write_ratio > 0 else 0
+    hist = LatencyHistogram()
+    counts = {'requests': 0, 'misses': 0}
+    share = -(-len(trace) // concurrency)
+    try:
+        await client.ping()  # connect before the clock starts
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            _worker(client, trace[i * share:(i + 1) * share], pipeline, value, write_every, hist, counts)
+            for i in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        server_stats = await client.stats()
+    finally:
+        await client.close()
+
+    gets = ops - (ops // write_every if write_every else 0)
+    return {
+        'servers': [f"{h}:{p}" for h, p in servers],
+        'ops': ops,
+        'requests': counts['requests'],
+        'elapsed_s': elapsed,
+        'ops_per_sec': ops / elapsed if elapsed > 0 else 0,
+        'requests_per_sec': counts['requests'] / elapsed if elapsed > 0 else 0,
+        'get_hit_rate': 1 - counts['misses'] / gets if gets else 0,
+        'concurrency': concurrency,
+        'pipeline': pipeline,
+        'latency': hist.summary(),
+        'keys_per_server': {name: s['cache']['entries'] for name, s in server_stats.items()}
+    }
+
+
+def spawn_servers(count, capacity=100000, host="127.0.0.1"):
+    """Start ``count`` server.py processes on free ports; returns (processes, addresses)."""
+    procs = []
+    addresses = []
+    try:
+        for _ in range(count):
+            proc = subprocess.Popen(
+                [sys.executable, os.path.join(HERE, "server.py"), "--host", host, "--port", "0",
+                 "--capacity", str(capacity)],
+                stdout=subprocess.PIPE, text=True)
+            procs.append(proc)
+            line = proc.stdout.readline()
+            if not line.startswith("listening on "):
+                raise RuntimeError(f"server did not start: {line!r}")
+            addr_host, port = line.split()[-1].rsplit(":", 1)
+            addresses.append((addr_host, int(port)))
+    except BaseException:
+        stop_servers(procs)
+        raise
+    return procs, addresses
+
+
+def stop_servers(procs):
+    for proc in procs:
+        proc.terminate()
+    for proc in procs:
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test SwapCache servers")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--servers", help="comma-separated host:port list")
+    target.add_argument("--spawn", type=int, help="start this many local server processes")
+    parser.add_argument("--capacity", type=int, default=100000, help="per spawned server")
+    parser.add_argument("--ops", type=int, default=100000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--pipeline", type=int, default=1)
+    parser.add_argument("--workload", choices=list(WORKLOADS), default="zipf")
+    parser.add_argument("--keys", type=int, default=100000, help="key space for zipf/shifting")
+    parser.add_argument("--value-size", type=int, default=100)
+    parser.add_argument("--write-ratio", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    procs = []
+    if args.spawn:
+        procs, servers = spawn_servers(args.spawn, args.capacity)
+    else:
+        servers = []
+        for item in args.servers.split(","):
+            host, port = item.rsplit(":", 1)
+            servers.append((host, int(port)))
+    try:
+        result = asyncio.run(run_load(
+            servers, ops=args.ops, concurrency=args.concurrency, pipeline=args.pipeline,
+            workload=args.workload, keys=args.keys, value_size=args.value_size,
+            write_ratio=args.write_ratio, seed=args.seed))
+    finally:
+        stop_servers(procs)
+    json.dump(result, sys.stdout, indent=2)
+    print()
+    lat = result['latency']
+    print(f"{result['ops_per_sec']:.0f} ops/s  p50 {lat['p50_ns'] / 1e3:.0f} us  "
+          f"p99 {lat['p99_ns'] / 1e3:.0f} us  p99.9 {lat['p999_ns'] / 1e3:.0f} us", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
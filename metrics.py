@@ -0,0 +1,256 @@
+"""
+OpenMetrics exporter for DynamicCache and ShardedDynamicCache.
+
+Scrapes read the caches' plain counters directly and copy histogram
+buckets in single C-level operations; they never take a shard lock or
+call ``stats()``, so a scrape cannot stall the hot path. Values read while
+operations are in flight may be a few operations apart from each other,
+which is fine for monotonically increasing counters.
+
+Example:
+    exporter = MetricsExporter(cache)
+    exporter.serve(port=9464)   # http://127.0.0.1:9464/metrics
+"""
+import threading
+from array import array
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import islice
+
+from instrumentation import NUM_BUCKETS, bucket_bounds
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+# Histogram bucket bounds in seconds, from 100ns to 1s
+LATENCY_BOUNDS = (1e-7, 2.5e-7, 5e-7, 1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5,
+                  1e-4, 2.5e-4, 5e-4, 1e-3, 1e-2, 1e-1, 1.0)
+SIZE_SAMPLE = 64
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _number(value):
+    if isinstance(value, float):
+        if value != value:
+            return "NaN"
+        if value in (float("inf"), float("-inf")):
+            return "+Inf" if value > 0 else "-Inf"
+        return repr(value)
+    return str(value)
+
+
+class _Family:
+    def __init__(self, name, kind, help_text, unit=None):
+        self.name = name
+        self.kind = kind
+        self.help = help_text
+        self.unit = unit
+        self.samples = []
+
+    def add(self, value, suffix="", **labels):
+        self.samples.append((suffix, labels, value))
+
+    def render(self, out):
+        out.append(f"# TYPE {self.name} {self.kind}")
+        if self.unit:
+            out.append(f"# UNIT {self.name} {self.unit}")
+        out.append(f"# HELP {self.name} {_escape(self.help)}")
+        for suffix, labels, value in self.samples:
+            out.append(f"{self.name}{suffix}{_labels(labels)} {_number(value)}")
+
+
+def _shards(cache):
+    return getattr(cache, "shards", None) or [cache]
+
+
+def _estimated_bytes(shard):
+    # Byte-budget caches track this exactly; otherwise extrapolate a sample
+    if shard.weights is not None:
+        return shard.policy_bytes[shard.current_strategy]
+    entries = len(shard.store)
+    if not entries:
+        return 0
+    sample = list(islice(shard.store.values(), SIZE_SAMPLE))  # copied in one C call
+    if not sample:
+        return 0
+    return int(entries * sum(shard.sizer(v) for v in sample) / len(sample))
+
+
+class MetricsExporter:
+    """
+    Renders a cache's counters and gauges as OpenMetrics text, and can serve
+    them from a small local HTTP endpoint on a background thread.
+    """
+
+    def __init__(self, cache, prefix="swapcache"):
+        self.cache = cache
+        self.prefix = prefix
+        self.server = None
+        self.thread = None
+
+    def _family(self, families, name, kind, help_text, unit=None):
+        family = _Family(f"{self.prefix}_{name}", kind, help_text, unit)
+        families.append(family)
+        return family
+
+    def collect(self):
+        families = []
+        shards = _shards(self.cache)
+
+        operations = self._family(families, "operations", "counter", "Cache operations (gets and puts)")
+        operations.add(sum(s.operation_count for s in shards), "_total")
+
+        requests = self._family(families, "requests", "counter", "Lookups answered, by result")
+        requests.add(sum(s.hits for s in shards), "_total", result="hit")
+        requests.add(sum(s.misses for s in shards), "_total", result="miss")
+
+        hits = self._family(families, "hits", "counter", "Lookups each policy would have served")
+        misses = self._family(families, "misses", "counter", "Lookups each policy would have missed")
+        hit_ratio = self._family(families, "recent_hit_ratio", "gauge",
+                                 "Windowed hit ratio the switcher compares, averaged over shards")
+        totals = {}
+        for shard in shards:
+            for name, stats in list(shard.policy_stats.items()):
+                agg = totals.setdefault(name, [0, 0, 0.0])
+                agg[0] += stats.hits
+                agg[1] += stats.misses
+                agg[2] += stats.recent_hit_rate()
+        for name, (h, m, recent) in totals.items():
+            hits.add(h, "_total", policy=name)
+            misses.add(m, "_total", policy=name)
+            hit_ratio.add(recent / len(shards), policy=name)
+
+        live = self._family(families, "policy", "stateset", "Policy currently serving requests")
+        serving = {}
+        for shard in shards:
+            serving[shard.current_strategy] = serving.get(shard.current_strategy, 0) + 1
+        for name in totals:
+            live.add(1 if serving.get(name) else 0, **{f"{self.prefix}_policy": name})
+        if len(shards) > 1:
+            by_policy = self._family(families, "shards_serving", "gauge", "Shards whose live policy is each policy")
+            for name in totals:
+                by_policy.add(serving.get(name, 0), policy=name)
+
+        self._family(families, "switches", "counter", "Policy switches").add(
+            sum(s.switch_count for s in shards), "_total")
+        self._family(families, "evictions", "counter", "Entries evicted by the live policy").add(
+            sum(s.evictions for s in shards), "_total")
+        self._family(families, "expirations", "counter", "Entries removed by TTL expiry").add(
+            sum(s.expirations for s in shards), "_total")
+        self._family(families, "entries", "gauge", "Entries currently stored").add(
+            sum(len(s.store) for s in shards))
+        self._family(families, "capacity", "gauge", "Configured entry capacity").add(self.cache.capacity)
+        self._family(families, "estimated_bytes", "gauge", "Estimated bytes held by stored values",
+                     unit="bytes").add(sum(_estimated_bytes(s) for s in shards))
+        budgets = [s.max_bytes for s in shards if s.max_bytes is not None]
+        if budgets:
+            self._family(families, "max_bytes", "gauge", "Configured byte budget", unit="bytes").add(sum(budgets))
+
+        tiered = [s for s in shards if s.l2 is not None]
+        if tiered:
+            lookups = self._family(families, "tier_lookups", "counter",
+                                   "Lookups by the tier that answered; backend means both tiers missed")
+            lookups.add(sum(s.l1_hits for s in tiered), "_total", tier="l1")
+            lookups.add(sum(s.l2_hits for s in tiered), "_total", tier="l2")
+            lookups.add(sum(s.l2_misses for s in tiered), "_total", tier="backend")
+            tiers = {id(s.l2): s.l2 for s in tiered}.values()  # shards may share one
+            self._family(families, "l2_entries", "gauge", "Entries held in the L2 tier").add(
+                sum(len(t.index) for t in tiers))
+            self._family(families, "l2_log_bytes", "gauge", "Bytes used by the L2 log, dead records included",
+                         unit="bytes").add(sum(t.tail for t in tiers))
+            self._family(families, "l2_compactions", "counter", "L2 log compactions").add(
+                sum(t.compactions for t in tiers), "_total")
+
+        codecs = [s.codec.counts for s in shards if s.codec is not None]
+        if codecs:
+            raw = sum(c['raw_bytes'] for c in codecs)
+            stored = sum(c['stored_bytes'] for c in codecs)
+            self._family(families, "compression_ratio", "gauge",
+                         "Uncompressed over compressed bytes for values stored compressed").add(
+                raw / stored if stored else 1.0)
+            codec_time = self._family(families, "codec_seconds", "counter", "Time spent compressing and decompressing",
+                                      unit="seconds")
+            codec_time.add(sum(c['encode_seconds'] for c in codecs), "_total", op="encode")
+            codec_time.add(sum(c['decode_seconds'] for c in codecs), "_total", op="decode")
+
+        self._latency(families, shards)
+        return families
+
+    def _latency(self, families, shards):
+        merged = {}
+        for shard in shards:
+            inst = shard.instrumentation
+            if inst is None:
+                continue
+            for key, hist in list(inst.histograms.items()):
+                counts = array('Q', hist.counts)  # snapshot without locking
+                agg = merged.get(key)
+                if agg is None:
+                    merged[key] = [counts, hist.total]
+                else:
+                    for i, c in enumerate(counts):
+                        agg[0][i] += c
+                    agg[1] += hist.total
+        if not merged:
+            return
+        family = self._family(families, "latency_seconds", "histogram",
+                              "Sampled operation latency", unit="seconds")
+        uppers = [bucket_bounds(i)[1] for i in range(NUM_BUCKETS)]
+        for (op, outcome, policy), (counts, total_ns) in sorted(merged.items()):
+            labels = {'op': op, 'outcome': outcome, 'policy': policy}
+            cumulative = 0
+            i = 0
+            for bound in LATENCY_BOUNDS:
+                limit = bound * 1e9
+                while i < NUM_BUCKETS and uppers[i] <= limit:
+                    cumulative += counts[i]
+                    i += 1
+                family.add(cumulative, "_bucket", **labels, le=repr(bound))
+            count = sum(counts)
+            family.add(count, "_bucket", **labels, le="+Inf")
+            family.add(count, "_count", **labels)
+            family.add(total_ns / 1e9, "_sum", **labels)
+
+    def render(self):
+        out = []
+        for family in self.collect():
+            family.render(out)
+        out.append("# EOF")
+        return "\n".join(out) + "\n"
+
+    def serve(self, port=9464, host="127.0.0.1"):
+        """Serve ``/metrics`` on a daemon thread; returns the bound (host, port)."""
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = exporter.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, name="swapcache-metrics", daemon=True)
+        self.thread.start()
+        return self.server.server_address
+
+    def close(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
@@ -0,0 +1,140 @@
+import math
+import random
+from collections import OrderedDict
+
+from structures import LFU, LRU, register_policy
+
+
+@register_policy("LeCaR")
+class LeCaR:
+    """
+    Learned blend of LRU and LFU (Vietri et al., "Driving Cache Replacement
+    with ML-based LeCaR").
+
+    Both experts order the same resident keys. Each eviction follows one
+    expert, chosen at random in proportion to its weight, and the victim is
+    remembered in that expert's ghost history. A later miss on a ghost key
+    is regret: the expert that evicted it loses weight, by more the sooner
+    the key came back. A key readmitted from a ghost history gets its old
+    frequency back. The blend therefore tracks whichever expert is
+    currently making fewer mistakes instead of switching between them.
+    """
+
+    def __init__(self, capacity, learning_rate=0.45, discount=None, seed=0):
+        self.capacity = capacity
+        self.lru = LRU(capacity)
+        self.lfu = LFU(capacity)
+        self.learning_rate = learning_rate
+        # Regret from a ghost decays to 0.5% after ``capacity`` requests
+        self.discount = discount if discount is not None else 0.005 ** (1 / max(1, capacity))
+        self.weights = [0.5, 0.5]  # LRU, LFU
+        self.ghosts = (OrderedDict(), OrderedDict())  # key -> (eviction time, frequency)
+        self.history = max(1, capacity)
+        self.time = 0
+        self.rng = random.Random(seed)
+        self.draw = self.rng.random()
+
+    def __contains__(self, key):
+        return key in self.lru
+
+    def __len__(self):
+        return len(self.lru)
+
+    def touch(self, key):
+        self.time += 1
+        if not self.lru.touch(key):
+            return False
+        self.lfu.touch(key)
+        return True
+
+    def _candidates(self):
+        lfu = self.lfu
+        return self.lru.dll.tail.key, lfu.freq_map[lfu.min_freq].tail.key
+
+    def _choice(self, weights=None):
+        return 0 if self.draw < (weights or self.weights)[0] else 1
+
+    def _ghost(self, key):
+        for expert, ghosts in enumerate(self.ghosts):
+            ghost = ghosts.get(key)
+            if ghost is not None:
+                return expert, ghost
+        return None, None
+
+    def _regretted(self, expert, evicted_at):
+        # The other expert would have kept the key; shift weight to it
+        weights = list(self.weights)
+        penalty = self.discount ** (self.time - evicted_at)
+        weights[1 - expert] *= math.exp(self.learning_rate * penalty)
+        total = weights[0] + weights[1]
+        return [weights[0] / total, weights[1] / total]
+
+    def _regret(self, key):
+        """Penalize the expert that evicted ``key``; returns its old frequency."""
+        expert, ghost = self._ghost(key)
+        if ghost is None:
+            return 1
+        del self.ghosts[expert][key]
+        evicted_at, freq = ghost
+        self.weights = self._regretted(expert, evicted_at)
+        return freq
+
+    def _restore_freq(self, key, freq, min_before):
+        lfu = self.lfu
+        node = lfu.map[key]
+        ones = lfu.freq_map[1]
+        ones.remove_node(node)
+        node.freq = freq
+        lfu.get_freq_dll(freq).insert_first(node)
+        if ones.length == 0:
+            lfu.min_freq = min(min_before, freq) if min_before else freq
+
+    def evict(self):
+        if not len(self.lru):
+            return None
+        candidates = self._candidates()
+        expert = self._choice()
+        self.draw = self.rng.random()
+        victim = candidates[expert]
+        freq = self.lfu.map[victim].freq
+        self.lru.discard(victim)
+        self.lfu.discard(victim)
+        if candidates[0] != candidates[1]:
+            ghosts = self.ghosts[expert]
+            ghosts[victim] = (self.time, freq)
+            if len(ghosts) > self.history:
+                ghosts.popitem(last=False)
+        return victim
+
+    def admit(self, key, value=None):
+        if self.capacity <= 0:
+            return None
+        freq = self._regret(key)
+        evicted = self.evict() if len(self.lru) >= self.capacity else None
+        min_before = self.lfu.min_freq if len(self.lfu) else 0
+        self.lru.admit(key)
+        self.lfu.admit(key)
+        if freq > 1:
+            self._restore_freq(key, freq, min_before)
+        return evicted
+
+    def discard(self, key):
+        self.lru.discard(key)
+        self.lfu.discard(key)
+
+    def victim(self, key=None):
+        # The expert for the next eviction is drawn ahead of time, but
+        # admit(key) first learns from a ghost hit on ``key``
+        if self.capacity <= 0 or len(self.lru) < self.capacity:
+            return None
+        expert, ghost = self._ghost(key)
+        weights = self._regretted(expert, ghost[0]) if ghost is not None else None
+        return self._candidates()[self._choice(weights)]
+
+    def stats(self):
+        return {
+            'lru_weight': self.weights[0],
+            'lfu_weight': self.weights[1],
+            'lru_ghosts': len(self.ghosts[0]),
+            'lfu_ghosts': len(self.ghosts[1])
+        }
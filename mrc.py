@@ -0,0 +1,152 @@
+"""
+One-pass LRU miss-ratio curves from reuse (stack) distances.
+
+Mattson's stack algorithm: an access hits in an LRU cache of capacity C
+exactly when fewer than C distinct keys were touched since the key's last
+access. A Fenwick tree over access times, holding a 1 at each key's most
+recent access, gives that count in O(log n), so a single pass yields the
+miss ratio for every capacity at once.
+
+For very long traces, SHARDS sampling (Waldspurger et al.) only tracks keys
+whose hash falls under ``rate`` and scales their distances by 1/rate.
+"""
+import math
+from array import array
+
+MASK64 = (1 << 64) - 1
+SHARDS_MODULUS = 1 << 24
+
+
+class FenwickTree:
+    def __init__(self, size):
+        self.size = size
+        self.tree = array('l', [0]) * (size + 1)
+
+    def add(self, i, delta):
+        tree = self.tree
+        while i <= self.size:
+            tree[i] += delta
+            i += i & -i
+
+    def prefix(self, i):
+        tree = self.tree
+        total = 0
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+
+class StackDistanceProfiler:
+    def __init__(self, rate=1.0, initial_size=1 << 16):
+        if not 0 < rate <= 1:
+            raise ValueError("rate must be in (0, 1]")
+        self.rate = rate
+        self.threshold = int(rate * SHARDS_MODULUS)
+        self.last_access = {}
+        self.histogram = {}
+        self.cold_misses = 0
+        self.sampled = 0
+        self.references = 0
+        self.clock = 0
+        self.tree = FenwickTree(initial_size)
+
+    def _sampled(self, key):
+        h = (hash(key) * 0x9E3779B97F4A7C15) & MASK64
+        return (h >> 40) % SHARDS_MODULUS < self.threshold
+
+    def _compact(self):
+        # Renumber every key's latest access to 1..K (keeping order) so the
+        # tree only ever needs to span about twice the distinct key count
+        order = sorted(self.last_access.items(), key=lambda item: item[1])
+        size = max(self.tree.size, 2 * len(order) + 1)
+        self.tree = FenwickTree(size)
+        for t, (key, _) in enumerate(order, 1):
+            self.last_access[key] = t
+            self.tree.add(t, 1)
+        self.clock = len(order)
+
+    def access(self, key):
+        self.references += 1
+        if self.rate < 1 and not self._sampled(key):
+            return
+        self.sampled += 1
+        if self.clock >= self.tree.size:
+            self._compact()
+        self.clock += 1
+        now = self.clock
+        tree = self.tree
+        prev = self.last_access.get(key)
+        if prev is None:
+            self.cold_misses += 1
+        else:
+            # Distinct keys touched strictly after prev, plus the key itself
+            distance = tree.prefix(now - 1) - tree.prefix(prev) + 1
+            if self.rate < 1:
+                distance = int(math.ceil(distance / self.rate))
+            self.histogram[distance] = self.histogram.get(distance, 0) + 1
+            tree.add(prev, -1)
+        tree.add(now, 1)
+        self.last_access[key] = now
+
+    def feed(self, keys):
+        access = self.access
+        for key in keys:
+            access(key)
+        return self
+
+    def feed_chunks(self, chunks):
+        for chunk in chunks:
+            self.feed(chunk)
+        return self
+
+    def miss_ratio(self, capacity):
+        if self.sampled == 0:
+            return 0
+        hits = sum(c for d, c in self.histogram.items() if d <= capacity)
+        return 1 - hits / self.sampled
+
+    def curve(self, capacities=None, points=100):
+        """
+        Return ``(capacities, miss_ratios)``. Without explicit capacities the
+        curve spans 1..max distance in about ``points`` even steps.
+        """
+        if self.sampled == 0:
+            return [], []
+        if capacities is None:
+            top = max(self.histogram, default=1)
+            step = max(1, top // points)
+            capacities = list(range(step, top + step, step))
+        capacities = sorted(capacities)
+        distances = sorted(self.histogram.items())
+        ratios = []
+        hits = 0
+        i = 0
+        for c in capacities:
+            while i < len(distances) and distances[i][0] <= c:
+                hits += distances[i][1]
+                i += 1
+            ratios.append(1 - hits / self.sampled)
+        return capacities, ratios
+
+    def stats(self):
+        return {
+            'references': self.references,
+            'sampled': self.sampled,
+            'distinct_keys': len(self.last_access),
+            'cold_misses': self.cold_misses,
+            'rate': self.rate
+        }
+
+
+def miss_ratio_curve(keys, capacities=None, rate=1.0, points=100):
+    profiler = StackDistanceProfiler(rate).feed(keys)
+    return profiler.curve(capacities, points)
+
+
+def miss_ratio_curve_file(path, capacities=None, rate=1.0, points=100, fmt=None, **reader_options):
+    """Build the curve for a trace file, streaming it with replay.open_trace."""
+    from replay import open_trace
+    profiler = StackDistanceProfiler(rate)
+    profiler.feed_chunks(open_trace(path, fmt, **reader_options))
+    return profiler.curve(capacities, points)
@@ -0,0 +1,214 @@
+import os
+import pickle
+import queue
+import sqlite3
+import struct
+import threading
+import time
+
+RECORD_HEADER = struct.Struct("<II")  # key length, value length
+
+
+def _dumps(obj):
+    return pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)
+
+
+class SQLiteBackend:
+    """Stores entries in one sqlite3 table, one transaction per batch."""
+
+    def __init__(self, path, table="swapcache"):
+        if not table.isidentifier():
+            raise ValueError(f"Invalid table name: {table!r}")
+        self.path = path
+        self.table = table
+        # Only the writer thread writes, but load() may run on the caller's
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.conn:
+            self.conn.execute(f"CREATE TABLE IF NOT EXISTS {table} (key BLOB PRIMARY KEY, value BLOB)")
+
+    def write_batch(self, items):
+        rows = [(_dumps(k), _dumps(v)) for k, v in items]
+        with self.lock, self.conn:
+            self.conn.executemany(f"INSERT OR REPLACE INTO {self.table} (key, value) VALUES (?, ?)", rows)
+
+    def load(self):
+        with self.lock:
+            rows = self.conn.execute(f"SELECT key, value FROM {self.table}").fetchall()
+        for k, v in rows:
+            yield pickle.loads(k), pickle.loads(v)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class AppendLogBackend:
+    """
+    Append-only log of length-prefixed pickled records. The latest record
+    for a key wins on load.
+    """
+
+    def __init__(self, path, fsync=True):
+        self.path = path
+        self.fsync = fsync
+        self.file = open(path, "ab")
+
+    def write_batch(self, items):
+        parts = []
+        for k, v in items:
+            kb, vb = _dumps(k), _dumps(v)
+            parts.append(RECORD_HEADER.pack(len(kb), len(vb)))
+            parts.append(kb)
+            parts.append(vb)
+        self.file.write(b"".join(parts))
+        self.file.flush()
+        if self.fsync:
+            os.fsync(self.file.fileno())
+
+    def load(self):
+        entries = {}
+        if not os.path.exists(self.path):
+            return iter(())
+        with open(self.path, "rb") as f:
+            data = f.read()
+        pos = 0
+        size = RECORD_HEADER.size
+        while pos + size <= len(data):
+            klen, vlen = RECORD_HEADER.unpack_from(data, pos)
+            end = pos + size + klen + vlen
+            if end > len(data):
+                break  # torn write at the tail
+            key = pickle.loads(data[pos + size:pos + size + klen])
+            entries[key] = pickle.loads(data[pos + size + klen:end])
+            pos = end
+        return iter(entries.items())
+
+    def close(self):
+        self.file.close()
+
+
+class WriteBehindWriter:
+    """
+    Asynchronous, coalescing writer in front of a persistence backend.
+
+    ``enqueue`` only records the latest value for a key and returns; a
+    background thread drains pending writes in batches of up to
+    ``batch_size``. When ``max_pending`` distinct keys are waiting, callers
+    block (up to ``put_timeout`` seconds, then queue.Full) until the writer
+    catches up.
+    """
+
+    def __init__(self, backend, max_pending=10000, batch_size=512,
+                 flush_interval=0.05, put_timeout=None):
+        self.backend = backend
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.pending = {}
+        self.in_flight = 0
+        self.lock = threading.Lock()
+        self.not_full = threading.Condition(self.lock)
+        self.not_empty = threading.Condition(self.lock)
+        self.idle = threading.Condition(self.lock)
+        self.closed = False
+        self.enqueued = 0
+        self.coalesced = 0
+        self.written = 0
+        self.batches = 0
+        self.errors = 0
+        self.last_error = None
+        self.thread = threading.Thread(target=self._run, name="swapcache-writer", daemon=True)
+        self.thread.start()
+
+    def enqueue(self, key, value):
+        with self.lock:
+            if self.closed:
+                raise RuntimeError("writer is closed")
+            if key in self.pending:
+                self.coalesced += 1
+            else:
+                if len(self.pending) >= self.max_pending:
+                    if not self.not_full.wait_for(lambda: len(self.pending) < self.max_pending or self.closed,
+                                                  self.put_timeout):
+                        raise queue.Full("write-behind queue is full")
+                    if self.closed:
+                        raise RuntimeError("writer is closed")
+                self.not_empty.notify()
+            self.pending[key] = value
+            self.enqueued += 1
+
+    def enqueue_many(self, items):
+        for key, value in items:
+            self.enqueue(key, value)
+
+    def _take_batch(self):
+        batch = []
+        pending = self.pending
+        for key in pending:
+            batch.append((key, pending[key]))
+            if len(batch) >= self.batch_size:
+                break
+        for key, _ in batch:
+            del pending[key]
+        return batch
+
+    def _run(self):
+        while True:
+            with self.lock:
+                self.not_empty.wait_for(lambda: self.pending or self.closed, self.flush_interval)
+                if not self.pending:
+                    if self.closed:
+                        return
+                    continue
+                batch = self._take_batch()
+                self.in_flight = len(batch)
+                self.not_full.notify_all()
+            try:
+                self.backend.write_batch(batch)
+            except Exception as e:
+                with self.lock:
+                    self.errors += 1
+                    self.last_error = repr(e)
+                    # Requeue, without clobbering values written since
+                    for key, value in batch:
+                        self.pending.setdefault(key, value)
+                    self.in_flight = 0
+                    closed = self.closed
+                if closed:
+                    return
+                time.sleep(self.flush_interval)
+                continue
+            with self.lock:
+                self.written += len(batch)
+                self.batches += 1
+                self.in_flight = 0
+                if not self.pending:
+                    self.idle.notify_all()
+
+    def flush(self, timeout=None):
+        """Block until everything enqueued so far has reached the backend."""
+        with self.lock:
+            self.not_empty.notify()
+            return self.idle.wait_for(lambda: not self.pending and not self.in_flight, timeout)
+
+    def close(self, timeout=None):
+        with self.lock:
+            self.closed = True
+            self.not_empty.notify_all()
+            self.not_full.notify_all()
+        self.thread.join(timeout)
+        self.backend.close()
+
+    def stats(self):
+        with self.lock:
+            return {
+                'pending': len(self.pending),
+                'enqueued': self.enqueued,
+                'coalesced': self.coalesced,
+                'written': self.written,
+                'batches': self.batches,
+                'errors': self.errors,
+                'last_error': self.last_error
+            }
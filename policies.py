@@ -0,0 +1,452 @@
+import heapq
+from itertools import count
+
+from structures import DLL, Node, register_policy
+
+
+class KeyList:
+    """Recency-ordered list of keys (front = most recent) built on DLL."""
+
+    def __init__(self):
+        self.map = {}
+        self.dll = DLL()
+
+    def __contains__(self, key):
+        return key in self.map
+
+    def __len__(self):
+        return self.dll.length
+
+    def push_front(self, key):
+        node = Node(key, None)
+        self.dll.insert_first(node)
+        self.map[key] = node
+
+    def back(self):
+        tail = self.dll.tail
+        return tail.key if tail is not None else None
+
+    def pop_back(self):
+        node = self.dll.delete_last()
+        del self.map[node.key]
+        return node.key
+
+    def move_to_front(self, key):
+        self.dll.move_to_front(self.map[key])
+
+    def remove(self, key):
+        node = self.map.pop(key, None)
+        if node is None:
+            return False
+        self.dll.remove_node(node)
+        return True
+
+
+@register_policy("ARC")
+class ARC:
+    """
+    Adaptive Replacement Cache (Megiddo & Modha).
+
+    T1/T2 hold resident keys seen once / more than once; B1/B2 are ghost
+    lists of keys recently evicted from each. Ghost hits move the target
+    size ``p`` of T1 towards whichever side would have hit.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.p = 0
+        self.t1 = KeyList()
+        self.t2 = KeyList()
+        self.b1 = KeyList()
+        self.b2 = KeyList()
+
+    def __contains__(self, key):
+        return key in self.t1 or key in self.t2
+
+    def __len__(self):
+        return len(self.t1) + len(self.t2)
+
+    def touch(self, key):
+        if key in self.t1:
+            self.t1.remove(key)
+            self.t2.push_front(key)
+            return True
+        if key in self.t2:
+            self.t2.move_to_front(key)
+            return True
+        return False
+
+    def _replace_t1(self, p, in_b2):
+        return len(self.t1) and (len(self.t1) > p or (in_b2 and len(self.t1) == p))
+
+    def _adapted_p(self, key):
+        # Target size of T1 once a miss on ``key`` has been learned from
+        c = self.capacity
+        if key in self.b1:
+            return min(c, self.p + max(len(self.b2) // len(self.b1), 1))
+        if key in self.b2:
+            return max(0, self.p - max(len(self.b1) // len(self.b2), 1))
+        return self.p
+
+    def _replace(self, in_b2):
+        if self._replace_t1(self.p, in_b2):
+            victim = self.t1.pop_back()
+            self.b1.push_front(victim)
+        else:
+            victim = self.t2.pop_back()
+            self.b2.push_front(victim)
+        return victim
+
+    def admit(self, key, value=None):
+        c = self.capacity
+        if c <= 0:
+            return None
+        evicted = None
+        full = len(self.t1) + len(self.t2) >= c
+        if key in self.b1:
+            self.p = self._adapted_p(key)
+            if full:
+                evicted = self._replace(False)
+            self.b1.remove(key)
+            self.t2.push_front(key)
+            return evicted
+        if key in self.b2:
+            self.p = self._adapted_p(key)
+            if full:
+                evicted = self._replace(True)
+            self.b2.remove(key)
+            self.t2.push_front(key)
+            return evicted
+
+        l1 = len(self.t1) + len(self.b1)
+        total = l1 + len(self.t2) + len(self.b2)
+        if l1 >= c:
+            if len(self.t1) < c:
+                self.b1.pop_back()
+                if full:
+                    evicted = self._replace(False)
+            else:
+                evicted = self.t1.pop_back()
+        elif total >= c:
+            if total >= 2 * c:
+                self.b2.pop_back()
+            if full:
+                evicted = self._replace(False)
+        self.t1.push_front(key)
+        return evicted
+
+    def discard(self, key):
+        for lst in (self.t1, self.t2, self.b1, self.b2):
+            if lst.remove(key):
+                return
+
+    def victim(self, key=None):
+        # Follows admit(key): a ghost hit shifts p before REPLACE picks a list
+        if self.capacity <= 0 or len(self) < self.capacity:
+            return None
+        if key not in self.b1 and key not in self.b2 and len(self.t1) >= self.capacity:
+            return self.t1.back()
+        if self._replace_t1(self._adapted_p(key), key in self.b2):
+            return self.t1.back()
+        return self.t2.back() if len(self.t2) else self.t1.back()
+
+    def evict(self):
+        if not len(self):
+            return None
+        if len(self.t1) and (len(self.t1) > self.p or not len(self.t2)):
+            victim = self.t1.pop_back()
+            self.b1.push_front(victim)
+        else:
+            victim = self.t2.pop_back()
+            self.b2.push_front(victim)
+        return victim
+
+
+@register_policy("SLRU")
+class SLRU:
+    """
+    Segmented LRU: new keys enter a probationary segment and are promoted
+    to the protected segment on their second hit. Evictions come from the
+    probationary tail, so one-pass scans cannot flush the protected set.
+    """
+
+    def __init__(self, capacity, protected_ratio=0.8):
+        self.capacity = capacity
+        self.protected_capacity = int(capacity * protected_ratio)
+        self.probation = KeyList()
+        self.protected = KeyList()
+
+    def __contains__(self, key):
+        return key in self.probation or key in self.protected
+
+    def __len__(self):
+        return len(self.probation) + len(self.protected)
+
+    def touch(self, key):
+        if key in self.protected:
+            self.protected.move_to_front(key)
+            return True
+        if key in self.probation:
+            self.probation.remove(key)
+            if self.protected_capacity <= 0:
+                self.probation.push_front(key)
+                return True
+            if len(self.protected) >= self.protected_capacity:
+                self.probation.push_front(self.protected.pop_back())
+            self.protected.push_front(key)
+            return True
+        return False
+
+    def admit(self, key, value=None):
+        if self.capacity <= 0:
+            return None
+        evicted = None
+        if len(self) >= self.capacity:
+            if len(self.probation):
+                evicted = self.probation.pop_back()
+            else:
+                evicted = self.protected.pop_back()
+        self.probation.push_front(key)
+        return evicted
+
+    def discard(self, key):
+        if not self.probation.remove(key):
+            self.protected.remove(key)
+
+    def victim(self, key=None):
+        if self.capacity <= 0 or len(self) < self.capacity:
+            return None
+        return self.probation.back() if len(self.probation) else self.protected.back()
+
+    def evict(self):
+        if len(self.probation):
+            return self.probation.pop_back()
+        if len(self.protected):
+            return self.protected.pop_back()
+        return None
+
+
+@register_policy("2Q")
+class TwoQ:
+    """
+    Full 2Q (Johnson & Shasha). First-time keys go to the A1in FIFO; keys
+    pushed out of it are remembered in the A1out ghost FIFO, and a miss on a
+    ghost key admits it straight into the Am LRU.
+    """
+
+    def __init__(self, capacity, in_ratio=0.25, out_ratio=0.5):
+        self.capacity = capacity
+        self.kin = max(1, int(capacity * in_ratio))
+        self.kout = max(1, int(capacity * out_ratio))
+        self.a1in = KeyList()
+        self.a1out = KeyList()
+        self.am = KeyList()
+
+    def __contains__(self, key):
+        return key in self.am or key in self.a1in
+
+    def __len__(self):
+        return len(self.am) + len(self.a1in)
+
+    def touch(self, key):
+        if key in self.am:
+            self.am.move_to_front(key)
+            return True
+        # A1in is a FIFO: hits there do not reorder
+        return key in self.a1in
+
+    def _reclaim(self):
+        if len(self.a1in) > self.kin or not len(self.am):
+            victim = self.a1in.pop_back()
+            self.a1out.push_front(victim)
+            if len(self.a1out) > self.kout:
+                self.a1out.pop_back()
+        else:
+            victim = self.am.pop_back()
+        return victim
+
+    def admit(self, key, value=None):
+        if self.capacity <= 0:
+            return None
+        evicted = self._reclaim() if len(self) >= self.capacity else None
+        if self.a1out.remove(key):
+            self.am.push_front(key)
+        else:
+            self.a1in.push_front(key)
+        return evicted
+
+    def discard(self, key):
+        for lst in (self.am, self.a1in, self.a1out):
+            if lst.remove(key):
+                return
+
+    def victim(self, key=None):
+        if self.capacity <= 0 or len(self) < self.capacity:
+            return None
+        if len(self.a1in) > self.kin or not len(self.am):
+            return self.a1in.back()
+        return self.am.back()
+
+    def evict(self):
+        return self._reclaim() if len(self) else None
+
+
+@register_policy("CLOCK")
+class CLOCK:
+    """Second-chance CLOCK over a fixed ring of slots with one reference bit each."""
+
+    def __init__(self, capacity):
+        self.capacity = max(0, capacity)
+        self.keys = [None] * self.capacity
+        self.ref = bytearray(self.capacity)
+        self.slots = {}
+        self.free = list(range(self.capacity - 1, -1, -1))
+        self.hand = 0
+
+    def __contains__(self, key):
+        return key in self.slots
+
+    def __len__(self):
+        return len(self.slots)
+
+    def touch(self, key):
+        slot = self.slots.get(key)
+        if slot is None:
+            return False
+        self.ref[slot] = 1
+        return True
+
+    def _sweep(self):
+        # Advance, clearing reference bits, until an unreferenced slot turns up
+        while self.ref[self.hand]:
+            self.ref[self.hand] = 0
+            self.hand = (self.hand + 1) % self.capacity
+        return self.hand
+
+    def admit(self, key, value=None):
+        if self.capacity <= 0:
+            return None
+        evicted = None
+        if self.free:
+            slot = self.free.pop()
+        else:
+            slot = self._sweep()
+            self.hand = (self.hand + 1) % self.capacity
+            evicted = self.keys[slot]
+            del self.slots[evicted]
+        self.keys[slot] = key
+        self.ref[slot] = 0
+        self.slots[key] = slot
+        return evicted
+
+    def discard(self, key):
+        slot = self.slots.pop(key, None)
+        if slot is not None:
+            self.keys[slot] = None
+            self.ref[slot] = 0
+            self.free.append(slot)
+
+    def victim(self, key=None):
+        # Peek at where _sweep would stop without clearing bits or moving the
+        # hand; if every bit is set a full turn clears them and it stops here
+        if self.capacity <= 0 or self.free:
+            return None
+        ref, hand = self.ref, self.hand
+        slot = ref.find(0, hand)
+        if slot < 0:
+            slot = ref.find(0, 0, hand)
+        return self.keys[slot if slot >= 0 else hand]
+
+    def evict(self):
+        if not self.slots:
+            return None
+        # Free slots have a clear bit, so the hand may stop on one; step past it
+        while True:
+            slot = self._sweep()
+            self.hand = (self.hand + 1) % self.capacity
+            if self.keys[slot] is not None:
+                break
+        key = self.keys[slot]
+        self.discard(key)
+        return key
+
+
+@register_policy("GDSF")
+class GDSF:
+    """
+    Greedy-Dual-Size-Frequency (Cherkasova). A key's priority is
+    ``L + freq * cost / size``, where L is the priority of the last victim,
+    so small, frequently used entries stay and idle ones age out as L rises.
+    Sizes arrive through weigh(); until then a key counts as size 1, which
+    makes GDSF an LFU with aging. The heap drops stale entries lazily.
+    """
+
+    def __init__(self, capacity, cost=1.0):
+        self.capacity = capacity
+        self.cost = cost
+        self.inflation = 0.0
+        self.entries = {}  # key -> [priority, freq, size, seq]
+        self.heap = []
+        self.seq = count()
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _push(self, key, entry):
+        entry[0] = self.inflation + entry[1] * self.cost / entry[2]
+        entry[3] = next(self.seq)
+        heapq.heappush(self.heap, (entry[0], entry[3], key))
+        if len(self.heap) > 2 * len(self.entries) + 64:
+            self.heap = [(e[0], e[3], k) for k, e in self.entries.items()]
+            heapq.heapify(self.heap)
+
+    def _top(self):
+        heap = self.heap
+        while heap:
+            _, seq, key = heap[0]
+            entry = self.entries.get(key)
+            if entry is not None and entry[3] == seq:
+                return key
+            heapq.heappop(heap)
+        return None
+
+    def touch(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return False
+        entry[1] += 1
+        self._push(key, entry)
+        return True
+
+    def admit(self, key, value=None):
+        if self.capacity <= 0:
+            return None
+        evicted = self.evict() if len(self.entries) >= self.capacity else None
+        entry = self.entries[key] = [0.0, 1, 1, 0]
+        self._push(key, entry)
+        return evicted
+
+    def evict(self):
+        key = self._top()
+        if key is None:
+            return None
+        heapq.heappop(self.heap)
+        self.inflation = self.entries.pop(key)[0]
+        return key
+
+    def discard(self, key):
+        self.entries.pop(key, None)
+
+    def victim(self, key=None):
+        if self.capacity <= 0 or len(self.entries) < self.capacity:
+            return None
+        return self._top()
+
+    def weigh(self, key, size):
+        entry = self.entries.get(key)
+        if entry is not None and entry[2] != size:
+            entry[2] = max(1, size)
+            self._push(key, entry)
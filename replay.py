@@ -0,0 +1,240 @@
+"""
+Headless trace replay for offline policy evaluation.
+
+Traces are streamed from disk in chunks, so a run never holds the whole
+trace in memory. Supported formats:
+
+    text    one key per line
+    csv     keys taken from one column
+    binary  packed little-endian int64 keys, read through mmap
+
+Example:
+    python replay.py trace.bin --capacity 10000 --policies LRU,LFU,ARC
+"""
+import argparse
+import csv
+import json
+import mmap
+import os
+import sys
+import time
+
+from structures import DynamicCache, create_policy
+
+try:
+    import numpy as np
+except ImportError:  # plain memoryview fallback
+    np = None
+
+DEFAULT_CHUNK = 1 << 16
+
+
+def _parse(key_type):
+    if key_type is None:
+        return None
+    if key_type == "int":
+        return int
+    if key_type == "str":
+        return str
+    return key_type
+
+
+def read_text(path, chunk_size=DEFAULT_CHUNK, key_type="int"):
+    convert = _parse(key_type)
+    chunk = []
+    with open(path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            chunk.append(convert(line) if convert else line)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+def read_csv(path, chunk_size=DEFAULT_CHUNK, column=0, key_type="int", header=False):
+    convert = _parse(key_type)
+    chunk = []
+    with open(path, "r", newline="") as f:
+        reader = csv.reader(f)
+        if header:
+            names = next(reader, [])
+            if isinstance(column, str):
+                column = names.index(column)
+        for row in reader:
+            if not row:
+                continue
+            value = row[column].strip()
+            chunk.append(convert(value) if convert else value)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+def read_binary(path, chunk_size=DEFAULT_CHUNK):
+    if os.path.getsize(path) == 0:
+        return
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        count = len(mm) // 8
+        if np is not None:
+            keys = np.frombuffer(mm, dtype="<i8", count=count)
+            try:
+                for i in range(0, count, chunk_size):
+                    yield keys[i:i + chunk_size].tolist()
+            finally:
+                # The array pins the map; drop it before the map closes
+                del keys
+        else:
+            view = memoryview(mm)[:count * 8].cast("q")
+            try:
+                for i in range(0, count, chunk_size):
+                    yield view[i:i + chunk_size].tolist()
+            finally:
+                view.release()
+
+
+def write_binary(path, keys):
+    """Write an iterable of ints as a packed int64 trace."""
+    from array import array
+    buf = array("q")
+    with open(path, "wb") as f:
+        for key in keys:
+            buf.append(key)
+            if len(buf) >= DEFAULT_CHUNK:
+                buf.tofile(f)
+                del buf[:]
+        buf.tofile(f)
+
+
+READERS = {"text": read_text, "csv": read_csv, "binary": read_binary}
+
+
+def detect_format(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".bin", ".i64", ".int64"):
+        return "binary"
+    if ext == ".csv":
+        return "csv"
+    return "text"
+
+
+def open_trace(path, fmt=None, chunk_size=DEFAULT_CHUNK, **options):
+    fmt = fmt or detect_format(path)
+    if fmt not in READERS:
+        raise ValueError(f"Unknown trace format: {fmt!r}")
+    return READERS[fmt](path, chunk_size=chunk_size, **options)
+
+
+def replay(chunks, cache, warmup=0, limit=None, progress=None):
+    """
+    Replay ``chunks`` of keys against ``cache``: a DynamicCache (get, then
+    put on a miss) or a bare policy (touch, then admit on a miss).
+
+    The first ``warmup`` requests fill the cache without being counted.
+    ``progress`` is called with the running request count after each chunk.
+    """
+    is_dynamic = hasattr(cache, "store")
+    requests = hits = seen = 0
+    start = time.perf_counter()
+    for chunk in chunks:
+        if limit is not None and seen >= limit:
+            break
+        if limit is not None and seen + len(chunk) > limit:
+            chunk = chunk[:limit - seen]
+        if is_dynamic:
+            get, put = cache.get, cache.put
+            for key in chunk:
+                seen += 1
+                if get(key) != -1:
+                    if seen > warmup:
+                        hits += 1
+                else:
+                    put(key, key)
+        else:
+            touch, admit = cache.touch, cache.admit
+            for key in chunk:
+                seen += 1
+                if touch(key):
+                    if seen > warmup:
+                        hits += 1
+                else:
+                    admit(key)
+        requests = max(0, seen - warmup)
+        if progress is not None:
+            progress(seen)
+    elapsed = time.perf_counter() - start
+
+    result = {
+        "requests": requests,
+        "hits": hits,
+        "misses": requests - hits,
+        "hit_ratio": hits / requests if requests > 0 else 0,
+        "elapsed_s": elapsed,
+        "ops_per_sec": seen / elapsed if elapsed > 0 else 0
+    }
+    if is_dynamic:
+        result["final_strategy"] = cache.current_strategy
+        result["switches"] = list(cache.switch_log)
+        result["policies"] = {name: s.stats() for name, s in cache.policy_stats.items()}
+    return result
+
+
+def replay_file(path, capacity, policy=None, fmt=None, chunk_size=DEFAULT_CHUNK,
+                warmup=0, limit=None, progress=None, reader_options=None, **cache_options):
+    """Replay a trace file against one policy, or a DynamicCache when ``policy`` is None."""
+    if policy is not None:
+        cache = create_policy(policy, capacity)
+    else:
+        cache = DynamicCache(capacity, **cache_options)
+    chunks = open_trace(path, fmt, chunk_size, **(reader_options or {}))
+    return replay(chunks, cache, warmup=warmup, limit=limit, progress=progress)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a cache trace")
+    parser.add_argument("trace")
+    parser.add_argument("--capacity", type=int, required=True)
+    parser.add_argument("--format", choices=sorted(READERS))
+    parser.add_argument("--policy", help="replay a single registered policy")
+    parser.add_argument("--policies", default="LRU,LFU",
+                        help="comma-separated candidates for DynamicCache")
+    parser.add_argument("--switch-threshold", type=int, default=10)
+    parser.add_argument("--window", type=int, default=1000)
+    parser.add_argument("--decay", type=float)
+    parser.add_argument("--hysteresis", type=float, default=0.01)
+    parser.add_argument("--min-dwell", type=int, help="default: one window")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK)
+    parser.add_argument("--warmup", type=int, default=0)
+    parser.add_argument("--limit", type=int)
+    parser.add_argument("--column", default="0", help="CSV column index or name")
+    parser.add_argument("--header", action="store_true", help="CSV has a header row")
+    parser.add_argument("--key-type", choices=["int", "str"], default="int")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or detect_format(args.trace)
+    reader_options = {}
+    if fmt in ("text", "csv"):
+        reader_options["key_type"] = args.key_type
+    if fmt == "csv":
+        reader_options["column"] = int(args.column) if args.column.isdigit() else args.column
+        reader_options["header"] = args.header
+
+    result = replay_file(
+        args.trace, args.capacity, policy=args.policy, fmt=fmt,
+        chunk_size=args.chunk_size, warmup=args.warmup, limit=args.limit,
+        reader_options=reader_options,
+        policies=tuple(args.policies.split(",")),
+        switch_threshold=args.switch_threshold, window=args.window,
+        decay=args.decay, hysteresis=args.hysteresis, min_dwell=args.min_dwell
+    )
+    json.dump(result, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
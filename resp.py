@@ -0,0 +1,151 @@
+"""
+Wire protocol for the SwapCache server: a subset of RESP2.
+
+Requests are arrays of bulk strings (``*2\\r\\n$3\\r\\nGET\\r\\n$1\\r\\nk\\r\\n``).
+Replies are simple strings (``+OK``), errors (``-ERR ...``), integers
+(``:1``), bulk strings (``$3\\r\\nabc``, ``$-1`` for none) or arrays of
+those. Any number of requests may be sent before reading replies; they
+are answered in order.
+"""
+
+CRLF = b"\r\n"
+
+
+class ProtocolError(Exception):
+    """Malformed data on the wire; the connection cannot continue."""
+
+
+class ReplyError(Exception):
+    """An error reply from the server."""
+
+
+class _Incomplete(Exception):
+    pass
+
+
+def to_bytes(value):
+    if isinstance(value, bytes):
+        return value
+    if isinstance(value, (bytearray, memoryview)):
+        return bytes(value)
+    if isinstance(value, str):
+        return value.encode("utf-8")
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value).encode()
+    raise TypeError(f"Cannot send {type(value).__name__} over the wire; use bytes or str")
+
+
+def encode_command(*args):
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        data = to_bytes(arg)
+        parts.append(b"$%d\r\n" % len(data))
+        parts.append(data)
+        parts.append(CRLF)
+    return b"".join(parts)
+
+
+class SimpleString(str):
+    """A reply sent as ``+text`` rather than as a bulk string."""
+
+
+OK = SimpleString("OK")
+
+
+def encode_reply(value, out):
+    """Append the encoding of ``value`` to the list ``out``."""
+    if value is None:
+        out.append(b"$-1\r\n")
+    elif isinstance(value, SimpleString):
+        out.append(b"+" + value.encode() + CRLF)
+    elif isinstance(value, ReplyError):
+        out.append(b"-" + " ".join(str(value).splitlines()).encode() + CRLF)
+    elif isinstance(value, bool):
+        out.append(b":%d\r\n" % value)
+    elif isinstance(value, int):
+        out.append(b":%d\r\n" % value)
+    elif isinstance(value, (list, tuple)):
+        out.append(b"*%d\r\n" % len(value))
+        for item in value:
+            encode_reply(item, out)
+    else:
+        data = to_bytes(value)
+        out.append(b"$%d\r\n" % len(data))
+        out.append(data)
+        out.append(CRLF)
+
+
+class Parser:
+    """
+    Incremental RESP parser. ``feed`` raw bytes, then iterate for the
+    messages that are complete; a partial message stays buffered. Error
+    replies are returned as ReplyError instances, not raised.
+    """
+
+    def __init__(self, max_bulk=512 << 20):
+        self.buffer = bytearray()
+        self.pos = 0
+        self.max_bulk = max_bulk
+
+    def feed(self, data):
+        self.buffer += data
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            value, self.pos = self._parse(self.pos)
+        except _Incomplete:
+            # Drop consumed bytes once, not after every message
+            if self.pos:
+                del self.buffer[:self.pos]
+                self.pos = 0
+            raise StopIteration
+        return value
+
+    def _line(self, pos):
+        end = self.buffer.find(CRLF, pos)
+        if end < 0:
+            raise _Incomplete
+        return bytes(self.buffer[pos:end]), end + 2
+
+    def _int(self, line):
+        try:
+            return int(line)
+        except ValueError:
+            raise ProtocolError(f"Expected an integer, got {line[:32]!r}") from None
+
+    def _parse(self, pos):
+        if pos >= len(self.buffer):
+            raise _Incomplete
+        kind = self.buffer[pos]
+        line, pos = self._line(pos + 1)
+        if kind == 0x24:  # $ bulk string
+            length = self._int(line)
+            if length < 0:
+                return None, pos
+            if length > self.max_bulk:
+                raise ProtocolError(f"Bulk string of {length} bytes is over the limit")
+            end = pos + length
+            if end + 2 > len(self.buffer):
+                raise _Incomplete
+            if self.buffer[end:end + 2] != CRLF:
+                raise ProtocolError("Bulk string is not terminated by CRLF")
+            return bytes(self.buffer[pos:end]), end + 2
+        if kind == 0x2a:  # * array
+            count = self._int(line)
+            if count < 0:
+                return None, pos
+            items = []
+            for _ in range(count):
+                item, pos = self._parse(pos)
+                items.append(item)
+            return items, pos
+        if kind == 0x2b:  # + simple string
+            return SimpleString(line.decode("utf-8", "replace")), pos
+        if kind == 0x2d:  # - error
+            return ReplyError(line.decode("utf-8", "replace")), pos
+        if kind == 0x3a:  # : integer
+            return self._int(line), pos
+        raise ProtocolError(f"Unknown message type {chr(kind)!r}")
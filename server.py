@@ -0,0 +1,232 @@
+"""
+asyncio TCP server that shares one DynamicCache over the network.
+
+Speaks the RESP subset in resp.py. Every complete request in a read is
+executed and the replies go out in one write, so pipelined clients pay
+one round trip per batch. Commands:
+
+    PING                    -> +PONG
+    GET key                 -> value or nil
+    SET key value [EX s]    -> +OK
+    MGET key [key ...]      -> array of values or nil
+    MSET key value [...]    -> +OK
+    DBSIZE                  -> number of entries
+    STATS                   -> JSON of cache and server stats
+
+Keys and values are bytes. The cache is only touched from the event loop
+thread, so it needs no locking.
+
+Example:
+    python server.py --port 7379 --capacity 100000
+"""
+import argparse
+import asyncio
+import json
+
+from resp import OK, Parser, ProtocolError, ReplyError, SimpleString, encode_reply
+from structures import DynamicCache
+
+PONG = SimpleString("PONG")
+HIGH_WATER = 1 << 20  # stop reading while this much output is unsent
+
+
+class _Connection(asyncio.Protocol):
+    def __init__(self, server):
+        self.server = server
+        self.parser = Parser()
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+        transport.set_write_buffer_limits(high=HIGH_WATER)
+        self.server.connections.add(self)
+        self.server.accepted += 1
+
+    def connection_lost(self, exc):
+        self.server.connections.discard(self)
+
+    def pause_writing(self):
+        # Slow reader: stop taking requests until replies drain
+        self.transport.pause_reading()
+
+    def resume_writing(self):
+        self.transport.resume_reading()
+
+    def data_received(self, data):
+        self.parser.feed(data)
+        out = []
+        try:
+            for request in self.parser:
+                reply = self.server.execute(request)
+                mark = len(out)
+                try:
+                    encode_reply(reply, out)
+                except Exception as e:
+                    # e.g. a value put from Python that is not bytes
+                    del out[mark:]
+                    self.server.errors += 1
+                    encode_reply(ReplyError(f"ERR cannot encode reply: {e}"), out)
+        except ProtocolError as e:
+            encode_reply(ReplyError(f"ERR protocol error: {e}"), out)
+            self.transport.write(b"".join(out))
+            self.transport.close()
+            self.server.errors += 1
+            return
+        if out:
+            self.server.batches += 1
+            self.transport.write(b"".join(out))
+
+
+class CacheServer:
+    """
+    Serves ``cache`` (a DynamicCache, or one built from ``capacity`` and
+    ``cache_options``) on ``host``:``port``; port 0 picks a free one.
+    """
+
+    def __init__(self, cache=None, host="127.0.0.1", port=0, capacity=10000, **cache_options):
+        self.cache = cache if cache is not None else DynamicCache(capacity, **cache_options)
+        self.host = host
+        self.port = port
+        self.server = None
+        self.connections = set()
+        self.accepted = 0
+        self.commands = 0
+        self.batches = 0
+        self.errors = 0
+        self.handlers = {
+            b"PING": self._ping,
+            b"GET": self._get,
+            b"SET": self._set,
+            b"MGET": self._mget,
+            b"MSET": self._mset,
+            b"DBSIZE": self._dbsize,
+            b"STATS": self._stats,
+        }
+
+    @property
+    def address(self):
+        return self.host, self.port
+
+    async def start(self):
+        """Start listening; returns the bound (host, port)."""
+        loop = asyncio.get_running_loop()
+        self.server = await loop.create_server(lambda: _Connection(self), self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.address
+
+    async def serve_forever(self):
+        if self.server is None:
+            await self.start()
+        await self.server.serve_forever()
+
+    async def close(self):
+        if self.server is None:
+            return
+        self.server.close()
+        for conn in list(self.connections):
+            conn.transport.close()
+        await self.server.wait_closed()
+        self.server = None
+
+    def execute(self, request):
+        self.commands += 1
+        if not isinstance(request, list) or not request or not all(isinstance(a, bytes) for a in request):
+            self.errors += 1
+            return ReplyError("ERR requests must be arrays of bulk strings")
+        handler = self.handlers.get(request[0].upper())
+        if handler is None:
+            self.errors += 1
+            return ReplyError(f"ERR unknown command {request[0][:32].decode('utf-8', 'replace')!r}")
+        try:
+            return handler(request[1:])
+        except ReplyError as e:
+            self.errors += 1
+            return e
+        except Exception as e:
+            # Reply in place so the rest of a pipelined batch still lines up
+            self.errors += 1
+            return ReplyError(f"ERR {type(e).__name__}: {e}")
+
+    def _arity(self, args, count, name):
+        if len(args) != count:
+            raise ReplyError(f"ERR wrong number of arguments for {name}")
+
+    def _ping(self, args):
+        return args[0] if args else PONG
+
+    def _get(self, args):
+        self._arity(args, 1, "GET")
+        value = self.cache.get(args[0])
+        return None if value == -1 else value
+
+    def _set(self, args):
+        ttl = None
+        if len(args) == 4 and args[2].upper() == b"EX":
+            try:
+                ttl = float(args[3])
+            except ValueError:
+                raise ReplyError("ERR EX needs a number of seconds") from None
+            if ttl <= 0:
+                raise ReplyError("ERR EX must be positive")
+        elif len(args) != 2:
+            raise ReplyError("ERR wrong number of arguments for SET")
+        self.cache.put(args[0], args[1], ttl)
+        return OK
+
+    def _mget(self, args):
+        if not args:
+            raise ReplyError("ERR wrong number of arguments for MGET")
+        found, _ = self.cache.get_many(args)
+        return [found.get(key) for key in args]
+
+    def _mset(self, args):
+        if not args or len(args) % 2:
+            raise ReplyError("ERR wrong number of arguments for MSET")
+        self.cache.put_many(zip(args[::2], args[1::2]))
+        return OK
+
+    def _dbsize(self, args):
+        return len(self.cache)
+
+    def _stats(self, args):
+        return json.dumps({'server': self.stats(), 'cache': self.cache.stats()}, default=str)
+
+    def stats(self):
+        return {
+            'address': f"{self.host}:{self.port}",
+            'connections': len(self.connections),
+            'accepted': self.accepted,
+            'commands': self.commands,
+            'batches': self.batches,
+            'errors': self.errors,
+            'commands_per_batch': self.commands / self.batches if self.batches else 0
+        }
+
+
+async def start_cluster(count, host="127.0.0.1", capacity=10000, **cache_options):
+    """Start ``count`` servers on free local ports in this event loop."""
+    servers = []
+    for _ in range(count):
+        server = CacheServer(host=host, capacity=capacity, **cache_options)
+        await server.start()
+        servers.append(server)
+    return servers
+
+
+async def _main(args):
+    server = CacheServer(host=args.host, port=args.port, capacity=args.capacity)
+    host, port = await server.start()
+    # loadgen.py --spawn reads this line to learn the port
+    print(f"listening on {host}:{port}", flush=True)
+    await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a DynamicCache over TCP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7379)
+    parser.add_argument("--capacity", type=int, default=100000)
+    try:
+        asyncio.run(_main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
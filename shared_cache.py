@@ -0,0 +1,354 @@
+import multiprocessing
+import pickle
+import zlib
+from multiprocessing import shared_memory
+
+EMPTY = -1
+MAGIC = 0x53575043  # "SWPC"
+HEADER_FIELDS = 4  # magic, slots per shard, slot size, shards
+SHARD_FIELDS = 6  # hand, count, hits, misses, evictions, oversized
+HAND, COUNT, HITS, MISSES, EVICTIONS, OVERSIZED = range(SHARD_FIELDS)
+WIDTHS = {'q': 8, 'i': 4, 'I': 4, 'B': 1}
+
+
+def _align(n, to=8):
+    return (n + to - 1) & ~(to - 1)
+
+
+def _layout(num_shards, slots, table, slot_size):
+    # Every column spans all shards; shard s owns the s-th stretch of each
+    sizes = (
+        ('header', 'q', HEADER_FIELDS),
+        ('counters', 'q', num_shards * SHARD_FIELDS),
+        ('index', 'i', num_shards * table),
+        ('hashes', 'I', num_shards * slots),
+        ('key_len', 'i', num_shards * slots),
+        ('value_len', 'i', num_shards * slots),
+        ('ref', 'B', num_shards * slots),
+        ('data', 'B', num_shards * slots * slot_size),
+    )
+    offsets = {}
+    position = 0
+    for name, fmt, count in sizes:
+        offsets[name] = (position, fmt, count)
+        position = _align(position + WIDTHS[fmt] * count)
+    return offsets, position
+
+
+def _attach(name):
+    shm = shared_memory.SharedMemory(name=name)
+    # Before 3.13 every attaching process registers the segment with its
+    # resource tracker, which then unlinks it when that process exits
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+        pass
+    return shm
+
+
+class SharedMemoryCache:
+    """
+    Cache shared by every process on a host, held in one shared_memory
+    segment.
+
+    The segment is split into ``num_shards`` shards, each with its own
+    multiprocessing lock, a linear-probing hash table of slot numbers and a
+    fixed number of value slots evicted by CLOCK. Keys and values are
+    pickled into a slot of ``slot_size`` bytes; entries that do not fit are
+    not cached. Keys are matched on their pickled bytes.
+
+    Create the cache before forking workers (e.g. in a gunicorn ``on_starting``
+    hook or with ``preload_app``) so they inherit it, or pass it to a
+    ``multiprocessing.Process`` as an argument.
+    """
+
+    def __init__(self, capacity, slot_size=1024, num_shards=16, name=None, _attach_to=None):
+        if num_shards <= 0:
+            raise ValueError("num_shards must be positive")
+        slots = max(1, -(-capacity // num_shards))
+        table = 1
+        while table < 2 * slots:
+            table <<= 1
+        self.capacity = slots * num_shards
+        self.slot_size = slot_size
+        self.num_shards = num_shards
+        self.slots = slots
+        self.table = table
+        self.mask = table - 1
+        self.offsets, size = _layout(num_shards, slots, table, slot_size)
+        if _attach_to is None:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            self.owner = True
+            self.locks = [multiprocessing.Lock() for _ in range(num_shards)]
+        else:
+            self.shm = _attach(_attach_to)
+            self.owner = False
+        self._map()
+        if self.owner:
+            self.header[0] = MAGIC
+            self.header[1] = slots
+            self.header[2] = slot_size
+            self.header[3] = num_shards
+            for i in range(len(self.index)):
+                self.index[i] = EMPTY
+        elif self.header[0] != MAGIC or self.header[1] != slots or self.header[3] != num_shards:
+            raise ValueError(f"{_attach_to} does not hold a matching SharedMemoryCache")
+
+    def _map(self):
+        buf = self.shm.buf
+        for name, (start, fmt, count) in self.offsets.items():
+            setattr(self, name, buf[start:start + WIDTHS[fmt] * count].cast(fmt))
+
+    def __reduce__(self):
+        return (_reattach, (self.shm.name, self.capacity, self.slot_size, self.num_shards, self.locks))
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def _hash(self, kb):
+        h = zlib.crc32(kb)
+        return h, h % self.num_shards
+
+    def _find(self, shard, h, kb):
+        """Return (table position, slot) for ``kb`` in ``shard``; slot is EMPTY on a miss."""
+        base = shard * self.table
+        mask = self.mask
+        index, hashes, key_len, data = self.index, self.hashes, self.key_len, self.data
+        size = self.slot_size
+        pos = (h >> 8) & mask
+        while True:
+            slot = index[base + pos]
+            if slot == EMPTY:
+                return pos, EMPTY
+            if hashes[slot] == h:
+                start = slot * size
+                if key_len[slot] == len(kb) and data[start:start + len(kb)] == kb:
+                    return pos, slot
+            pos = (pos + 1) & mask
+
+    def _unlink(self, shard, slot):
+        # Backward-shift deletion keeps probe chains intact without tombstones
+        base = shard * self.table
+        mask = self.mask
+        index, hashes = self.index, self.hashes
+        i = (hashes[slot] >> 8) & mask
+        while index[base + i] != slot:
+            i = (i + 1) & mask
+        j = i
+        while True:
+            j = (j + 1) & mask
+            moved = index[base + j]
+            if moved == EMPTY:
+                break
+            home = (hashes[moved] >> 8) & mask
+            if (i <= j and i < home <= j) or (i > j and (home > i or home <= j)):
+                continue
+            index[base + i] = moved
+            i = j
+        index[base + i] = EMPTY
+
+    def _claim(self, shard):
+        # CLOCK over the shard's slots; a slot with no key is free
+        counters = shard * SHARD_FIELDS
+        first = shard * self.slots
+        ref, key_len = self.ref, self.key_len
+        hand = self.counters[counters + HAND]
+        while True:
+            slot = first + hand
+            hand = (hand + 1) % self.slots
+            if key_len[slot] == 0:
+                self.counters[counters + COUNT] += 1
+                break
+            if ref[slot]:
+                ref[slot] = 0
+                continue
+            self._unlink(shard, slot)
+            self.counters[counters + EVICTIONS] += 1
+            break
+        self.counters[counters + HAND] = hand
+        return slot
+
+    def _write(self, slot, h, kb, vb):
+        start = slot * self.slot_size
+        self.data[start:start + len(kb)] = kb
+        self.data[start + len(kb):start + len(kb) + len(vb)] = vb
+        self.hashes[slot] = h
+        self.key_len[slot] = len(kb)
+        self.value_len[slot] = len(vb)
+
+    def get(self, key):
+        kb = pickle.dumps(key, pickle.HIGHEST_PROTOCOL)
+        h, shard = self._hash(kb)
+        counters = shard * SHARD_FIELDS
+        with self.locks[shard]:
+            _, slot = self._find(shard, h, kb)
+            if slot == EMPTY:
+                self.counters[counters + MISSES] += 1
+                return -1
+            self.ref[slot] = 1
+            self.counters[counters + HITS] += 1
+            start = slot * self.slot_size + self.key_len[slot]
+            vb = bytes(self.data[start:start + self.value_len[slot]])
+        return pickle.loads(vb)
+
+    def put(self, key, value):
+        kb = pickle.dumps(key, pickle.HIGHEST_PROTOCOL)
+        vb = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        h, shard = self._hash(kb)
+        counters = shard * SHARD_FIELDS
+        with self.locks[shard]:
+            pos, slot = self._find(shard, h, kb)
+            if len(kb) + len(vb) > self.slot_size:
+                self.counters[counters + OVERSIZED] += 1
+                if slot != EMPTY:
+                    self._release(shard, slot)
+                return False
+            if slot == EMPTY:
+                slot = self._claim(shard)
+                # The eviction may have shifted the chain; probe again
+                pos, _ = self._find(shard, h, kb)
+                self.index[shard * self.table + pos] = slot
+                self.ref[slot] = 0
+            else:
+                self.ref[slot] = 1
+            self._write(slot, h, kb, vb)
+        return True
+
+    def _release(self, shard, slot):
+        self._unlink(shard, slot)
+        self.key_len[slot] = 0
+        self.ref[slot] = 0
+        self.counters[shard * SHARD_FIELDS + COUNT] -= 1
+
+    def discard(self, key):
+        kb = pickle.dumps(key, pickle.HIGHEST_PROTOCOL)
+        h, shard = self._hash(kb)
+        with self.locks[shard]:
+            _, slot = self._find(shard, h, kb)
+            if slot == EMPTY:
+                return False
+            self._release(shard, slot)
+        return True
+
+    def __contains__(self, key):
+        kb = pickle.dumps(key, pickle.HIGHEST_PROTOCOL)
+        h, shard = self._hash(kb)
+        with self.locks[shard]:
+            return self._find(shard, h, kb)[1] != EMPTY
+
+    def __len__(self):
+        return sum(self.counters[s * SHARD_FIELDS + COUNT] for s in range(self.num_shards))
+
+    def get_many(self, keys):
+        found = {}
+        misses = {}
+        for key in keys:
+            value = self.get(key)
+            if value == -1:
+                misses[key] = None
+            else:
+                found[key] = value
+        return found, list(misses)
+
+    def put_many(self, items):
+        if isinstance(items, dict):
+            items = items.items()
+        for key, value in items:
+            self.put(key, value)
+
+    def stats(self):
+        totals = [0] * SHARD_FIELDS
+        for s in range(self.num_shards):
+            for field in range(SHARD_FIELDS):
+                totals[field] += self.counters[s * SHARD_FIELDS + field]
+        lookups = totals[HITS] + totals[MISSES]
+        return {
+            'entries': totals[COUNT],
+            'capacity': self.capacity,
+            'hits': totals[HITS],
+            'misses': totals[MISSES],
+            'hit_rate': totals[HITS] / lookups if lookups else 0,
+            'evictions': totals[EVICTIONS],
+            'oversized': totals[OVERSIZED],
+            'shards': self.num_shards,
+            'segment_bytes': self.shm.size
+        }
+
+    def close(self):
+        """Detach from the segment; the creating process also removes it."""
+        for name in self.offsets:
+            view = getattr(self, name, None)
+            if view is not None:
+                view.release()
+                setattr(self, name, None)
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _reattach(name, capacity, slot_size, num_shards, locks):
+    cache = SharedMemoryCache.__new__(SharedMemoryCache)
+    cache.locks = locks
+    SharedMemoryCache.__init__(cache, capacity, slot_size, num_shards, _attach_to=name)
+    return cache
+
+
+def _bench_worker(cache, keys, reads, results):
+    import time
+    start = time.perf_counter()
+    value = b"v" * 100
+    for k, read in zip(keys, reads):
+        if not read or cache.get(k) == -1:
+            cache.put(k, value)
+    results.put(time.perf_counter() - start)
+
+
+def benchmark_processes(workers=(1, 2, 4, 8), ops=50000, capacity=20000, keyspace=50000,
+                        num_shards=16, read_ratio=0.9, seed=0):
+    """
+    Aggregate ops/sec of ``n`` processes sharing one SharedMemoryCache, for
+    each ``n`` in ``workers``. Every process runs ``ops`` Zipf-like lookups,
+    filling misses with a put.
+    """
+    import random
+
+    results = {}
+    for n in workers:
+        cache = SharedMemoryCache(capacity, slot_size=256, num_shards=num_shards)
+        try:
+            queue = multiprocessing.Queue()
+            procs = []
+            for w in range(n):
+                rng = random.Random(seed + w)
+                keys = [int(rng.paretovariate(1.2)) % keyspace for _ in range(ops)]
+                reads = [rng.random() < read_ratio for _ in range(ops)]
+                procs.append(multiprocessing.Process(target=_bench_worker, args=(cache, keys, reads, queue)))
+            for p in procs:
+                p.start()
+            elapsed = max(queue.get() for _ in procs)
+            for p in procs:
+                p.join()
+            stats = cache.stats()
+            results[n] = {
+                'ops_per_sec': n * ops / elapsed if elapsed > 0 else 0,
+                'hit_rate': stats['hit_rate'],
+                'evictions': stats['evictions']
+            }
+        finally:
+            cache.close()
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Multi-process SharedMemoryCache throughput")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--ops", type=int, default=50000)
+    parser.add_argument("--capacity", type=int, default=20000)
+    parser.add_argument("--shards", type=int, default=16)
+    args = parser.parse_args()
+    for n, r in benchmark_processes(args.workers, args.ops, args.capacity, num_shards=args.shards).items():
+        print(f"{n:3d} procs {r['ops_per_sec']:12.0f} ops/s  hit rate {r['hit_rate']:.3f}  evictions {r['evictions']}")
@@ -0,0 +1,99 @@
+"""
+Simulation backend for the Streamlit visualizer.
+
+Runs a DynamicCache over a trace of keys in chunks, reporting progress
+after each one, and returns compact, plot-ready results: per-op hit flags
+are reduced with NumPy and time series are downsampled to a fixed number
+of points, so traces of millions of operations stay cheap to draw.
+"""
+import time
+
+import numpy as np
+
+from structures import DynamicCache
+
+DEFAULT_CHUNK = 1 << 16
+MAX_POINTS = 2000
+MAX_SWITCHES = 10000
+
+
+def key_statistics(ops):
+    """Unique keys, most frequent key and its count, and the key range, in one vectorized pass."""
+    ops = np.asarray(ops)
+    if ops.size == 0:
+        return {'total': 0, 'unique': 0, 'most_frequent': None, 'most_frequent_count': 0,
+                'min': None, 'max': None}
+    keys, counts = np.unique(ops, return_counts=True)
+    top = int(np.argmax(counts))
+    return {
+        'total': int(ops.size),
+        'unique': int(keys.size),
+        'most_frequent': keys[top].item(),
+        'most_frequent_count': int(counts[top]),
+        'min': keys[0].item(),
+        'max': keys[-1].item()
+    }
+
+
+def downsample(steps, values, max_points=MAX_POINTS):
+    """Thin a series to at most ``max_points`` evenly spaced points, keeping the last one."""
+    steps = np.asarray(steps)
+    values = np.asarray(values)
+    if steps.size <= max_points:
+        return steps, values
+    idx = np.linspace(0, steps.size - 1, max_points).astype(np.int64)
+    return steps[idx], values[idx]
+
+
+def simulate(ops, capacity, policies=("LRU", "LFU"), chunk_size=DEFAULT_CHUNK,
+             max_points=MAX_POINTS, progress=None, **cache_options):
+    """
+    Replay ``ops`` against a DynamicCache (get, then put on a miss).
+
+    ``progress(done, total)`` is called after every chunk. The returned hit
+    log is the running hit rate in percent as (step, rate) pairs, thinned to
+    ``max_points``.
+    """
+    ops = np.asarray(ops)
+    total = int(ops.size)
+    cache = DynamicCache(capacity, policies=tuple(policies), **cache_options)
+    flags = bytearray(total)
+    switches = []
+    switch_count = 0
+    get, put = cache.get, cache.put
+    start = time.perf_counter()
+
+    for begin in range(0, total, chunk_size):
+        chunk = ops[begin:begin + chunk_size].tolist()
+        for offset, key in enumerate(chunk):
+            if get(key) != -1:
+                flags[begin + offset] = 1
+            else:
+                put(key, key)
+            if cache.switch_count != switch_count:
+                switch_count = cache.switch_count
+                if len(switches) < MAX_SWITCHES:
+                    switches.append({'step': begin + offset + 1, 'to': cache.current_strategy})
+        if progress is not None:
+            progress(min(begin + chunk_size, total), total)
+    elapsed = time.perf_counter() - start
+
+    hits_per_op = np.frombuffer(bytes(flags), dtype=np.uint8)
+    hits = int(hits_per_op.sum())
+    steps = np.arange(1, total + 1)
+    running = np.cumsum(hits_per_op, dtype=np.int64) * 100.0 / steps if total else np.zeros(0)
+    steps, running = downsample(steps, running, max_points)
+
+    return {
+        'operations': total,
+        'hits': hits,
+        'misses': total - hits,
+        'hit_rate': hits / total * 100 if total else 0,
+        'hit_log': list(zip(steps.tolist(), running.tolist())),
+        'switches': switches,
+        'switch_count': switch_count,
+        'final_strategy': cache.current_strategy,
+        'policies': {name: s.stats() for name, s in cache.policy_stats.items()},
+        'elapsed_s': elapsed,
+        'ops_per_sec': total / elapsed if elapsed > 0 else 0
+    }
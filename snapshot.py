@@ -0,0 +1,195 @@
+"""
+Warm-restart snapshots of a DynamicCache.
+
+Layout:
+    b"SWPCSNAP" | u32 version | u32 header length | JSON header | sections
+
+The header records the cache settings and the byte offset/length of each
+section. Sections hold the pickled key table and values, and int64 arrays
+of key indices for each policy's order (plus frequencies for LFU). Keys
+with a TTL get an index section and a float64 section of the seconds
+they had left at save time. Loading maps the file and rebuilds each
+policy in bulk via ``load_order``; TTLs are rescheduled minus the wall
+time that passed since the save, and entries already past it are dropped.
+"""
+import json
+import mmap
+import os
+import pickle
+import struct
+import time
+from array import array
+from operator import itemgetter
+
+from codec import Compressed, decompress
+from events import EXPIRE
+from structures import DynamicCache
+
+MAGIC = b"SWPCSNAP"
+VERSION = 1
+PREAMBLE = struct.Struct("<8sII")
+
+
+def _take(keys, indexes):
+    # itemgetter does the gather in C, which matters for millions of keys
+    if not indexes:
+        return []
+    if len(indexes) == 1:
+        return [keys[indexes[0]]]
+    return list(itemgetter(*indexes)(keys))
+
+
+def save(cache, path):
+    """Write ``cache`` to ``path`` atomically. Returns the snapshot size in bytes."""
+    index = {}
+    key_table = []
+
+    def ids(keys):
+        out = array('q')
+        for key in keys:
+            i = index.get(key)
+            if i is None:
+                i = index[key] = len(key_table)
+                key_table.append(key)
+            out.append(i)
+        return out
+
+    sections = {}
+    policy_state = {}
+    for name, policy in cache.policies.items():
+        if not hasattr(policy, "snapshot_order"):
+            policy_state[name] = None  # rebuilt from the live order on load
+            continue
+        keys, freqs = policy.snapshot_order()
+        sections[f"{name}.order"] = ids(keys).tobytes()
+        if freqs is not None:
+            sections[f"{name}.freqs"] = array('q', freqs).tobytes()
+        policy_state[name] = {'freqs': freqs is not None}
+
+    store_keys = list(cache.store)
+    sections["store.index"] = ids(store_keys).tobytes()
+    sections["values"] = pickle.dumps([cache.store[k] for k in store_keys], pickle.HIGHEST_PROTOCOL)
+    if cache.ttl_wheel is not None:
+        # Deadlines are on the monotonic clock, which does not survive a
+        # restart; keep the time left instead
+        now = cache.clock()
+        deadline = cache.ttl_wheel.deadline
+        ttl_keys = []
+        remaining = array('d')
+        for key in store_keys:
+            at = deadline(key)
+            if at is not None:
+                ttl_keys.append(key)
+                remaining.append(at - now)
+        sections["ttl.index"] = ids(ttl_keys).tobytes()
+        sections["ttl.remaining"] = remaining.tobytes()
+    sections["keys"] = pickle.dumps(key_table, pickle.HIGHEST_PROTOCOL)
+
+    offsets = {}
+    position = 0
+    for name, blob in sections.items():
+        offsets[name] = [position, len(blob)]
+        position += len(blob)
+    header = json.dumps({
+        'capacity': cache.capacity,
+        'current_strategy': cache.current_strategy,
+        'policies': list(cache.policies),
+        'policy_state': policy_state,
+        'operation_count': cache.operation_count,
+        'saved_at': time.time(),
+        'sections': offsets
+    }).encode()
+
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(PREAMBLE.pack(MAGIC, VERSION, len(header)))
+        f.write(header)
+        for blob in sections.values():
+            f.write(blob)
+    os.replace(tmp, path)
+    return PREAMBLE.size + len(header) + position
+
+
+def load(path, **options):
+    """
+    Rebuild a DynamicCache from a snapshot. ``options`` are passed to the
+    DynamicCache constructor (e.g. compact=True); capacity, policies and the
+    live strategy come from the snapshot.
+    """
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        magic, version, header_len = PREAMBLE.unpack_from(mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a SwapCache snapshot")
+        if version != VERSION:
+            raise ValueError(f"Unsupported snapshot version {version}")
+        base = PREAMBLE.size + header_len
+        header = json.loads(mm[PREAMBLE.size:base])
+        view = memoryview(mm)
+
+        def section(name):
+            start, length = header['sections'][name]
+            return view[base + start:base + start + length]
+
+        def int_section(name):
+            out = array('q')
+            out.frombytes(section(name))
+            return out
+
+        try:
+            key_table = pickle.loads(section("keys"))
+            values = pickle.loads(section("values"))
+            store_keys = _take(key_table, int_section("store.index"))
+
+            options['policies'] = tuple(header['policies'])
+            cache = DynamicCache(header['capacity'], **options)
+            if cache.codec is None:
+                # Snapshots keep compressed values as they were stored
+                values = [decompress(v) if isinstance(v, Compressed) else v for v in values]
+            cache.store = dict(zip(store_keys, values))
+            for name, state in header['policy_state'].items():
+                if state is None:
+                    continue
+                keys = _take(key_table, int_section(f"{name}.order"))
+                freqs = int_section(f"{name}.freqs").tolist() if state['freqs'] else None
+                cache.policies[name].load_order(keys, freqs)
+            ttls = None
+            if "ttl.index" in header['sections']:
+                remaining = array('d')
+                remaining.frombytes(section("ttl.remaining"))
+                ttls = list(zip(_take(key_table, int_section("ttl.index")), remaining))
+        finally:
+            view.release()
+
+    live = header['current_strategy']
+    cache.current_strategy = live
+    cache.operation_count = header['operation_count']
+    # Policies without bulk loading are refilled from the live recency order
+    live_order = None
+    for name, state in header['policy_state'].items():
+        if state is not None:
+            continue
+        if live_order is None:
+            live_policy = cache.policies[live]
+            if hasattr(live_policy, "snapshot_order"):
+                live_order = live_policy.snapshot_order()[0]
+            else:
+                live_order = list(cache.store)
+        policy = cache.policies[name]
+        for key in reversed(live_order):
+            policy.admit(key)
+    if cache.weights is not None:
+        # Only stored values can be weighed; shadow-only keys count as empty
+        cache.weights = {key: cache.sizer(value) for key, value in cache.store.items()}
+        for name, policy in cache.policies.items():
+            cache.policy_bytes[name] = sum(w for key, w in cache.weights.items() if key in policy)
+    if ttls:
+        now = cache.clock()
+        elapsed = max(0.0, time.time() - header.get('saved_at', time.time()))
+        for key, left in ttls:
+            left -= elapsed
+            if left <= 0:
+                cache._forget(key, EXPIRE)
+                cache.expirations += 1
+            else:
+                cache._set_ttl(key, left, now)
+    return cache
@@ -1,14 +1,27 @@
 # streamer.py
 import streamlit as st
-import random
 from plotter import plot_hit_miss_ratio, plot_hit_rate_over_time, plot_real_world_comparison, plot_benchmarks, plot_strategy_switches, plot_cache_state_evolution
-from structures import DynamicCache  
+from structures import POLICY_REGISTRY
+from simulation import simulate, key_statistics
 import matplotlib.pyplot as plt
 import numpy as np
+import os
 
 # Set up the pag
 st.set_page_config(layout="wide", page_title="Dynamic Cache Visualizer")
 
+PREVIEW_OPS = 200  # keys shown in sequence previews
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def run_simulation(trace, capacity, policies, _progress=None):
+    # Memoized per (trace, capacity, policies); reruns reuse the result
+    return simulate(trace, capacity, policies, progress=_progress)
+
+
+def preview(ops, limit=PREVIEW_OPS):
+    return ", ".join(map(str, ops[:limit])) + ("..." if len(ops) > limit else "")
+
 # Header
 st.title("Dynamic Cache Strategy Visualizer")
 st.markdown(""" 
@@ -17,12 +30,16 @@ and when it's best to switch dynamically between them.
 """)
 
 
+# Measured results from `python benchmark.py --output benchmark_results.json`,
+# falling back to the reference figures when none have been generated
+BENCHMARK_RESULTS = "benchmark_results.json" if os.path.exists("benchmark_results.json") else None
+
 col1, col2 = st.columns([1, 1])
 
 with col1:
     st.subheader("Real-World Performance Comparison")
     try:
-        fig = plot_real_world_comparison()
+        fig = plot_real_world_comparison(BENCHMARK_RESULTS)
         st.pyplot(fig, use_container_width=True)
         plt.close(fig)  # Free memory
     except Exception as e:
@@ -31,7 +48,7 @@ with col1:
 with col2:
     st.subheader("🏆 Benchmark Results")
     try:
-        fig1 = plot_benchmarks()
+        fig1 = plot_benchmarks(BENCHMARK_RESULTS)
         st.pyplot(fig1, use_container_width=True)
         plt.close(fig1)  # Free memory
     except Exception as e:
@@ -59,6 +76,11 @@ with config_col3:
     else:
         st.metric("Mode", "Manual Input", "✍️")
 
+candidate_policies = st.multiselect(
+    "Candidate Policies", sorted(POLICY_REGISTRY), default=["LRU", "LFU"],
+    help="Eviction policies the switcher compares; the first one selected starts live"
+) or ["LRU", "LFU"]
+
 # Input section based on mode
 if mode == "Random":
     st.markdown("#### 🎲 Random Sequence Generation")
@@ -67,17 +89,18 @@ if mode == "Random":
     rand_col1, rand_col2, rand_col3 = st.columns([1, 1, 1])
     
     with rand_col1:
-        operation_count = st.slider("Number of Operations", min_value=10, max_value=100, value=30)
+        operation_count = st.number_input("Number of Operations", min_value=10, max_value=5_000_000,
+                                          value=1000, step=1000)
     
     with rand_col2:
-        keys_range = st.slider("Range of Key Values", min_value=1, max_value=100, value=20)
+        keys_range = st.number_input("Range of Key Values", min_value=1, max_value=10_000_000, value=20)
     
     with rand_col3:
         st.write("")  # Spacer
         generate_btn = st.button("🎯 Generate Random Sequence", type="primary", use_container_width=True)
     
     if generate_btn:
-        ops = [random.randint(1, keys_range) for _ in range(operation_count)]
+        ops = np.random.default_rng().integers(1, keys_range + 1, size=int(operation_count))
         st.session_state["generated_ops"] = ops
         st.success(f"Generated {len(ops)} operations with keys ranging from 1 to {keys_range}")
     
@@ -87,19 +110,19 @@ if mode == "Random":
         # Display sequence in an expandable section
         with st.expander("🔄 View Generated Access Sequence", expanded=False):
             # Format the sequence nicely
-            formatted_ops = ", ".join(map(str, ops))
-            st.code(formatted_ops, language="text")
+            st.code(preview(ops), language="text")
             
             # Show some statistics
+            key_stats = key_statistics(ops)
             stats_col1, stats_col2, stats_col3, stats_col4 = st.columns(4)
             with stats_col1:
-                st.metric("Total Operations", len(ops))
+                st.metric("Total Operations", key_stats['total'])
             with stats_col2:
-                st.metric("Unique Keys", len(set(ops)))
+                st.metric("Unique Keys", key_stats['unique'])
             with stats_col3:
-                st.metric("Most Frequent", max(set(ops), key=ops.count))
+                st.metric("Most Frequent", key_stats['most_frequent'])
             with stats_col4:
-                st.metric("Key Range", f"{min(ops)}-{max(ops)}")
+                st.metric("Key Range", f"{key_stats['min']}-{key_stats['max']}")
 
 else:  # Manual mode
     st.markdown("#### ✍️ Manual Sequence Input")
@@ -123,14 +146,14 @@ else:  # Manual mode
                 
                 with preview_col:
                     with st.expander("🔄 Preview Access Sequence", expanded=True):
-                        formatted_ops = ", ".join(map(str, ops))
-                        st.code(formatted_ops, language="text")
+                        st.code(preview(ops), language="text")
                 
                 with stats_col:
+                    key_stats = key_statistics(ops)
                     st.markdown("**📈 Sequence Statistics**")
-                    st.metric("Total Operations", len(ops))
-                    st.metric("Unique Keys", len(set(ops)))
-                    st.metric("Key Range", f"{min(ops)}-{max(ops)}")
+                    st.metric("Total Operations", key_stats['total'])
+                    st.metric("Unique Keys", key_stats['unique'])
+                    st.metric("Key Range", f"{key_stats['min']}-{key_stats['max']}")
             else:
                 st.warning("No valid integers found. Please check your input.")
                 
@@ -150,7 +173,7 @@ elif mode == "Manual" and manual_input:
         ops = None
 
 # Display simulation when ops are available
-if ops and len(ops) > 0:
+if ops is not None and len(ops) > 0:
     st.divider()
     st.markdown("### Cache Simulation & Results")
     
@@ -170,40 +193,26 @@ if ops and len(ops) > 0:
             st.session_state['auto_simulate'] = True
         
         try:
-            # Run simulation using the DynamicCache class
-            with st.spinner("Running cache simulation..."):
-                cache = DynamicCache(capacity)
-                
-                # Track hits, misses, and other metrics
-                hits = 0
-                misses = 0
-                hit_log = []
-                strategy_switches = []
-                current_strategy = cache.current_strategy
-                
-                # Run operations
-                for i, key in enumerate(ops):
-                    result = cache.get(key)
-                    if result != -1:
-                        hits += 1
-                    else:
-                        misses += 1
-                        # PUT operation for cache miss
-                        cache.put(key, f"value_{key}")
-                    # logs of strategy switches
-                    if cache.current_strategy != current_strategy:
-                        strategy_switches.append(f"Step {i+1}: Switched to {cache.current_strategy}")
-                        current_strategy = cache.current_strategy
-                    # running hit rate
-                    total_so_far = hits + misses
-                    hit_rate_so_far = (hits / total_so_far) * 100 if total_so_far > 0 else 0
-                    hit_log.append((i+1, hit_rate_so_far))
-            
+            # Run the simulation in chunks, reporting progress as it goes
+            progress_bar = st.progress(0.0, text="Running cache simulation...")
+
+            def report(done, total):
+                progress_bar.progress(done / total, text=f"Simulated {done:,} of {total:,} operations")
+
+            sim = run_simulation(np.asarray(ops), int(capacity), tuple(candidate_policies), _progress=report)
+            progress_bar.empty()
+
+            hits = sim['hits']
+            misses = sim['misses']
+            hit_log = sim['hit_log']
+            strategy_switches = [f"Step {s['step']}: Switched to {s['to']}" for s in sim['switches']]
+
             # Calculate final metrics
-            total_ops = hits + misses
-            hit_rate = (hits / total_ops * 100) if total_ops > 0 else 0
+            total_ops = sim['operations']
+            hit_rate = sim['hit_rate']
             
-            st.success(f"✅ Simulation completed! Hit rate: {hit_rate:.1f}%")
+            st.success(f"✅ Simulation completed! Hit rate: {hit_rate:.1f}% "
+                       f"({sim['ops_per_sec']:,.0f} ops/s)")
             
             # Display key metrics
             metric_col1, metric_col2, metric_col3, metric_col4 = st.columns(4)
@@ -266,15 +275,15 @@ if ops and len(ops) > 0:
                         plt.close(fig)
                 else:
                     st.info("Insufficient data for time-series plot")
-            if strategy_switches and len(strategy_switches) > 0:
+            if sim['switch_count'] > 0:
                 st.markdown("#### 🔄 Strategy Switching Analysis")
                 switch_col1, switch_col2 = st.columns([1, 1])
                 
                 with switch_col1:
-                    st.metric("Total Switches", len(strategy_switches))
+                    st.metric("Total Switches", sim['switch_count'])
                 
                 with switch_col2:
-                    switch_rate = (len(strategy_switches) / len(ops)) * 100
+                    switch_rate = (sim['switch_count'] / len(ops)) * 100
                     st.metric("Switch Rate", f"{switch_rate:.1f}%")
                 
                 with st.expander("View Strategy Switch Details", expanded=False):
@@ -285,9 +294,10 @@ if ops and len(ops) > 0:
             
             # Additional insights
             with st.expander("Detailed Analysis", expanded=False):
-                unique_keys = len(set(ops))
-                most_frequent = max(set(ops), key=ops.count) if ops else None
-                key_frequency = ops.count(most_frequent) if most_frequent else 0
+                key_stats = key_statistics(ops)
+                unique_keys = key_stats['unique']
+                most_frequent = key_stats['most_frequent']
+                key_frequency = key_stats['most_frequent_count']
                 
                 st.markdown(f"""
                 **Performance Analysis:**
@@ -295,7 +305,7 @@ if ops and len(ops) > 0:
                 - Unique keys accessed: {unique_keys}
                 - Cache utilization: {min(unique_keys, capacity)}/{capacity} slots
                 - Most accessed key: {most_frequent} ({key_frequency} times)
-                - Final strategy: {cache.current_strategy}
+                - Final strategy: {sim['final_strategy']}
                 
                 **Cache Efficiency Breakdown:**
                 - **Overall Performance:** {efficiency} ({hit_rate:.1f}% hit rate)
@@ -315,9 +325,7 @@ if ops and len(ops) > 0:
                 
                 # Show access sequence sample
                 st.markdown("**Access Sequence Sample:**")
-                sample_size = min(50, len(ops))
-                sample_ops = ops[:sample_size]
-                st.code(", ".join(map(str, sample_ops)) + ("..." if len(ops) > sample_size else ""))
+                st.code(preview(ops, 50))
         
         except Exception as e:
             st.error(f"❌ Simulation failed: {str(e)}")
@@ -341,17 +349,16 @@ if ops and len(ops) > 0:
         
         # Preview the sequence
         with st.expander("🔍 Preview Access Sequence", expanded=False):
-            preview_size = min(30, len(ops))
-            preview_ops = ops[:preview_size]
-            st.code(", ".join(map(str, preview_ops)) + ("..." if len(ops) > preview_size else ""))
+            st.code(preview(ops, 30))
             
+            key_stats = key_statistics(ops)
             prev_col1, prev_col2, prev_col3 = st.columns(3)
             with prev_col1:
-                st.metric("Total Operations", len(ops))
+                st.metric("Total Operations", key_stats['total'])
             with prev_col2:
-                st.metric("Unique Keys", len(set(ops)))
+                st.metric("Unique Keys", key_stats['unique'])
             with prev_col3:
-                st.metric("Key Range", f"{min(ops)}-{max(ops)}")
+                st.metric("Key Range", f"{key_stats['min']}-{key_stats['max']}")
 
 # Footer
 st.divider()
@@ -1,6 +1,20 @@
+import sys
+import threading
 import time
+from array import array
+from collections import deque
+
+from arena import ArenaLFU, ArenaLRU
+from codec import ValueCodec, codec_stats
+from disk_tier import DiskTier
+from events import EVICT, EXPIRE, HIT, INSERT, SWITCH, EventLog
+from instrumentation import Instrumentation
+from persistence import WriteBehindWriter
+from timing_wheel import TimingWheel
 
 class Node:
+    __slots__ = ('key', 'val', 'prev', 'next', 'freq')
+
     def __init__(self, key, data):
         self.key = key
         self.val = data
@@ -82,12 +96,41 @@ class DLL:
         self.remove_node(node)
         self.insert_first(node)
 
+    def keys(self):
+        curr = self.head
+        while curr:
+            yield curr.key
+            curr = curr.next
+
+    @classmethod
+    def from_nodes(cls, nodes):
+        """Link ``nodes`` front to back in one pass."""
+        dll = cls()
+        prev = None
+        for node in nodes:
+            node.prev = prev
+            node.next = None
+            if prev is not None:
+                prev.next = node
+            prev = node
+        if nodes:
+            dll.head = nodes[0]
+            dll.tail = nodes[-1]
+        dll.length = len(nodes)
+        return dll
+
 class LRU:
     def __init__(self, C):
         self.capacity = C
         self.map = {}
         self.dll = DLL()
 
+    def __contains__(self, key):
+        return key in self.map
+
+    def __len__(self):
+        return len(self.map)
+
     def get(self, key):
         if key in self.map:
             node = self.map[key]
@@ -101,13 +144,62 @@ class LRU:
             node.val = value
             self.dll.move_to_front(node)
         else:
-            if len(self.map) >= self.capacity:
-                lru_node = self.dll.delete_last()
-                if lru_node:
-                    del self.map[lru_node.key]
-            new_node = Node(key, value)
-            self.dll.insert_first(new_node)
-            self.map[key] = new_node
+            self.admit(key, value)
+
+    # Key-only interface used when DynamicCache keeps the values itself
+    def touch(self, key):
+        node = self.map.get(key)
+        if node is None:
+            return False
+        self.dll.move_to_front(node)
+        return True
+
+    def admit(self, key, value=None):
+        """Track a new key, returning the key evicted to make room (or None)."""
+        if self.capacity <= 0:
+            return None
+        evicted = None
+        if len(self.map) >= self.capacity:
+            lru_node = self.dll.delete_last()
+            del self.map[lru_node.key]
+            evicted = lru_node.key
+        new_node = Node(key, value)
+        self.dll.insert_first(new_node)
+        self.map[key] = new_node
+        return evicted
+
+    def discard(self, key):
+        node = self.map.pop(key, None)
+        if node is not None:
+            self.dll.remove_node(node)
+
+    def victim(self, key=None):
+        """Key admit(``key``) would evict, or None while there is room."""
+        if self.capacity <= 0 or len(self.map) < self.capacity:
+            return None
+        return self.dll.tail.key
+
+    def evict(self):
+        """Evict and return the least recently used key, even if there is room."""
+        if not self.map:
+            return None
+        node = self.dll.delete_last()
+        del self.map[node.key]
+        return node.key
+
+    def snapshot_order(self):
+        """Keys from most to least recently used; LRU has no frequencies."""
+        return list(self.dll.keys()), None
+
+    def load_order(self, keys, freqs=None, values=None):
+        """Rebuild from ``snapshot_order`` output in O(n) without replaying puts."""
+        keys = keys[:max(0, self.capacity)]
+        if values is None:
+            nodes = [Node(k, None) for k in keys]
+        else:
+            nodes = [Node(k, v) for k, v in zip(keys, values)]
+        self.map = dict(zip(keys, nodes))
+        self.dll = DLL.from_nodes(nodes)
 
 class LFU:
     def __init__(self, capacity):  # Fixed parameter name
@@ -116,6 +208,12 @@ class LFU:
         self.freq_map = {}
         self.min_freq = 0
 
+    def __contains__(self, key):
+        return key in self.map
+
+    def __len__(self):
+        return len(self.map)
+
     def get_freq_dll(self, freq):  # Fixed method name (was get_node)
         if freq not in self.freq_map:
             self.freq_map[freq] = DLL()
@@ -143,119 +241,1097 @@ class LFU:
         return node.val
     
     def put(self, key, value):  # Added missing put method
-        if self.capacity <= 0:
-            return
-        
         if key in self.map:
             # Update existing key
             node = self.map[key]
             node.val = value
             self.update_freq(node)
         else:
-            # Add new key
-            if len(self.map) >= self.capacity:
-                # Remove least frequently used item
-                if self.min_freq in self.freq_map:
-                    min_freq_dll = self.freq_map[self.min_freq]
-                    if min_freq_dll.length > 0:
-                        lfu_node = min_freq_dll.delete_last()
-                        if lfu_node:
-                            del self.map[lfu_node.key]
-            
-            # Create new node and add it
-            new_node = Node(key, value)
-            new_node.freq = 1
-            self.map[key] = new_node
-            freq_1_dll = self.get_freq_dll(1)
-            freq_1_dll.insert_first(new_node)
-            self.min_freq = 1
+            self.admit(key, value)
+
+    # Key-only interface used when DynamicCache keeps the values itself
+    def touch(self, key):
+        node = self.map.get(key)
+        if node is None:
+            return False
+        self.update_freq(node)
+        return True
+
+    def admit(self, key, value=None):
+        """Track a new key, returning the key evicted to make room (or None)."""
+        if self.capacity <= 0:
+            return None
+        evicted = None
+        if len(self.map) >= self.capacity:
+            # Remove least frequently used item
+            if self.min_freq in self.freq_map:
+                min_freq_dll = self.freq_map[self.min_freq]
+                if min_freq_dll.length > 0:
+                    lfu_node = min_freq_dll.delete_last()
+                    del self.map[lfu_node.key]
+                    evicted = lfu_node.key
+
+        # Create new node and add it
+        new_node = Node(key, value)
+        new_node.freq = 1
+        self.map[key] = new_node
+        freq_1_dll = self.get_freq_dll(1)
+        freq_1_dll.insert_first(new_node)
+        self.min_freq = 1
+        return evicted
+
+    def discard(self, key):
+        node = self.map.pop(key, None)
+        if node is None:
+            return
+        dll = self.freq_map[node.freq]
+        dll.remove_node(node)
+        if node.freq == self.min_freq and dll.length == 0:
+            # Next admit resets min_freq to 1, so only a non-empty cache needs a rescan.
+            # Empty buckets are dropped on the way, which keeps each rescan
+            # proportional to the buckets created since the last one.
+            for f in [f for f, d in self.freq_map.items() if not d.length]:
+                del self.freq_map[f]
+            self.min_freq = min(self.freq_map, default=0)
+
+    def victim(self, key=None):
+        """Key admit(``key``) would evict, or None while there is room."""
+        if self.capacity <= 0 or len(self.map) < self.capacity:
+            return None
+        dll = self.freq_map.get(self.min_freq)
+        return dll.tail.key if dll is not None and dll.length else None
+
+    def evict(self):
+        """Evict and return the least frequently used key, even if there is room."""
+        if not self.map:
+            return None
+        key = self.freq_map[self.min_freq].tail.key
+        self.discard(key)
+        return key
+
+    def snapshot_order(self):
+        """Keys grouped by ascending frequency, each group most recent first."""
+        keys = []
+        freqs = []
+        for f in sorted(self.freq_map):
+            group = list(self.freq_map[f].keys())
+            keys.extend(group)
+            freqs.extend([f] * len(group))
+        return keys, freqs
+
+    def load_order(self, keys, freqs, values=None):
+        """Rebuild from ``snapshot_order`` output in O(n) without replaying puts."""
+        if len(keys) > self.capacity:
+            # Keep the most frequently used keys
+            drop = len(keys) - max(0, self.capacity)
+            keys, freqs = keys[drop:], freqs[drop:]
+            values = values[drop:] if values is not None else None
+        if values is None:
+            values = [None] * len(keys)
+        self.map = {}
+        self.freq_map = {}
+        start = 0
+        while start < len(keys):
+            f = freqs[start]
+            end = start
+            while end < len(keys) and freqs[end] == f:
+                end += 1
+            nodes = [Node(k, v) for k, v in zip(keys[start:end], values[start:end])]
+            for node in nodes:
+                node.freq = f
+            self.map.update(zip(keys[start:end], nodes))
+            self.freq_map[f] = DLL.from_nodes(nodes)
+            start = end
+        self.min_freq = freqs[0] if keys else 0
+
+# Eviction policies DynamicCache can choose between. A policy is built as
+# factory(capacity) and must provide the key-only interface: touch(key) ->
+# bool, admit(key) -> evicted key or None, discard(key), victim(key) -> key
+# admit(key) would evict (or None) without changing any state,
+# __contains__ and __len__. Byte
+# budgets also need evict() -> key evicted regardless of room (or None),
+# and size-aware policies may take weigh(key, size).
+POLICY_REGISTRY = {}
+COMPACT_POLICIES = {}
+
+
+def register_policy(name, factory=None, compact=None):
+    """Register an eviction policy; usable as a class decorator."""
+    def register(factory):
+        POLICY_REGISTRY[name] = factory
+        if compact is not None:
+            COMPACT_POLICIES[name] = compact
+        return factory
+    if factory is None:
+        return register
+    return register(factory)
+
+
+def create_policy(name, capacity, compact=False):
+    if compact and name in COMPACT_POLICIES:
+        return COMPACT_POLICIES[name](capacity)
+    if name not in POLICY_REGISTRY:
+        raise KeyError(f"Unknown eviction policy: {name!r}")
+    return POLICY_REGISTRY[name](capacity)
+
+
+register_policy("LRU", LRU, compact=ArenaLRU)
+register_policy("LFU", LFU, compact=ArenaLFU)
+
+
+def estimate_size(value):
+    """Rough size of ``value`` in bytes: sys.getsizeof plus one level of contents."""
+    size = sys.getsizeof(value)
+    if isinstance(value, (bytes, bytearray, str)):
+        return size
+    if isinstance(value, dict):
+        size += sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(sys.getsizeof(v) for v in value)
+    return size
+
+
+class HitWindow:
+    """
+    Recent hit rate, either over the last ``size`` lookups or with
+    exponential ``decay`` (0 < decay < 1). With neither it is cumulative.
+    Lookups may carry a weight (e.g. bytes) to get a weighted hit ratio.
+    """
+
+    def __init__(self, size=None, decay=None):
+        if size is not None and size <= 0:
+            raise ValueError("window size must be positive")
+        if decay is not None and not 0 < decay < 1:
+            raise ValueError("decay must be between 0 and 1")
+        self.size = size
+        self.decay = decay
+        # Integer rings keep the running sums exact
+        self.ring = array('q', [0]) * size if size else None
+        self.weights = array('q', [0]) * size if size else None
+        self.pos = 0
+        self.samples = 0
+        self.score = 0
+        self.weight = 0
+
+    def record(self, hit, weight=1):
+        gained = weight if hit else 0
+        if self.ring is not None:
+            if self.samples == self.size:
+                self.score -= self.ring[self.pos]
+                self.weight -= self.weights[self.pos]
+            else:
+                self.samples += 1
+            self.ring[self.pos] = gained
+            self.weights[self.pos] = weight
+            self.pos = (self.pos + 1) % self.size
+        elif self.decay is not None:
+            self.score *= self.decay
+            self.weight *= self.decay
+            self.samples += 1
+        else:
+            self.samples += 1
+        self.score += gained
+        self.weight += weight
+
+    def rate(self):
+        return self.score / self.weight if self.weight > 0 else 0
+
 
 class Stats:
-    def __init__(self, strategy):
+    def __init__(self, strategy, instrumentation=None, name=None, window=None,
+                 by_bytes=False):
         self.cache = strategy
         self.hits = 0
         self.misses = 0
+        self.byte_hits = 0
+        self.byte_misses = 0
+        self.instrumentation = instrumentation
+        self.name = name or type(strategy).__name__
+        self.window = window
+        # Score the window by byte hit ratio rather than object hit ratio
+        self.by_bytes = by_bytes
 
     def get(self, key):
-        start = time.time()
+        inst = self.instrumentation
+        start = inst.start() if inst is not None else 0
         value = self.cache.get(key)
-        end = time.time()
         if value != -1:
             self.hits += 1
         else:
             self.misses += 1
-        print(f"GET {key} took {end - start:.6f}s")
+        if start:
+            inst.stop(start, "get", value != -1, self.name)
         return value
 
     def put(self, key, value):
-        start = time.time()
+        inst = self.instrumentation
+        start = inst.start() if inst is not None else 0
+        existed = start and key in self.cache
         self.cache.put(key, value)
-        end = time.time()
-        print(f"PUT {key} took {end - start:.6f}s")
+        if start:
+            inst.stop(start, "put", existed, self.name)
+
+    def record(self, hit, size=None):
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        if size is not None:
+            if hit:
+                self.byte_hits += size
+            else:
+                self.byte_misses += size
+        if self.window is not None:
+            self.window.record(hit, size if self.by_bytes and size is not None else 1)
+
+    def record_many(self, hits, sizes=None):
+        if sizes is not None:
+            for hit, size in zip(hits, sizes):
+                self.record(hit, size)
+            return
+        hit_count = sum(hits)
+        self.hits += hit_count
+        self.misses += len(hits) - hit_count
+        if self.window is not None:
+            for hit in hits:
+                self.window.record(hit)
+
+    def recent_hit_rate(self):
+        if self.window is None:
+            return self.stats()['hit_rate']
+        return self.window.rate()
 
     def stats(self):
         total = self.hits + self.misses
         hit_rate = self.hits / total if total > 0 else 0
         miss_rate = self.misses / total if total > 0 else 0
-        return {
+        result = {
             'hits': self.hits,
             'misses': self.misses,
             'hit_rate': hit_rate,
             'miss_rate': miss_rate
         }
+        byte_total = self.byte_hits + self.byte_misses
+        if byte_total:
+            result['byte_hits'] = self.byte_hits
+            result['byte_misses'] = self.byte_misses
+            result['byte_hit_rate'] = self.byte_hits / byte_total
+        if self.window is not None:
+            result['recent_hit_rate'] = self.window.rate()
+        return result
+
+def tier_stats(l1_hits, l2_hits, backend):
+    """Hit counts and rates per tier; ``backend`` counts lookups that missed both."""
+    total = l1_hits + l2_hits + backend
+    return {
+        'l1_hits': l1_hits,
+        'l2_hits': l2_hits,
+        'backend': backend,
+        'l1_hit_rate': l1_hits / total if total > 0 else 0,
+        'l2_hit_rate': l2_hits / total if total > 0 else 0,
+        'backend_rate': backend / total if total > 0 else 0
+    }
+
 
 class DynamicCache:  # Created proper class structure
-    def __init__(self, capacity):
+    """
+    Adaptive cache that serves from one policy while shadowing the others.
+
+    Values live once in ``store``. The live policy decides which keys stay
+    resident; shadow policies only track keys and metadata so their hit
+    rates can be compared. Switching just changes which policy is live, the
+    shadows' eviction order is already up to date.
+    """
+
+    def __init__(self, capacity, instrumentation=None, compact=False,
+                 switch_threshold=10, window=1000, decay=None,
+                 hysteresis=0.01, min_dwell=None, switch_log_size=1024,
+                 policies=("LRU", "LFU"), admission=None, persistence=None,
+                 default_ttl=None, ttl_resolution=1.0, expire_batch=8,
+                 clock=time.monotonic, max_bytes=None, sizer=None,
+                 objective="hits", events=None, l2=None, codec=None):
+        """
+        switch_threshold: evaluate the policies every this many operations.
+        window / decay: score policies over the last ``window`` lookups, or
+            with exponential decay when ``decay`` is given instead.
+        hysteresis: hit-rate margin a candidate must beat the live policy by.
+            The default 0.01 keeps near-equal policies from trading places
+            on noise.
+        min_dwell: operations to stay on a policy after switching to it.
+            Defaults to one scoring window (about 1 / (1 - decay) lookups
+            with decay, 0 with cumulative scoring), so the new policy is judged on lookups it served
+            rather than on the ones that made it win. Pass 0 to disable.
+        policies: registered policy names to evaluate; the first starts live.
+        admission: optional filter (e.g. admission.TinyLFU) consulted before
+            a new key may evict a policy's victim.
+        persistence: a backend from persistence.py (wrapped in a
+            WriteBehindWriter) or a writer; every put is queued to it.
+        default_ttl: seconds an entry lives unless put() gives its own ttl.
+            Deadlines sit in a TimingWheel with ``ttl_resolution`` ticks;
+            each operation reclaims up to ``expire_batch`` expired entries
+            and reads check the entry's own deadline.
+        max_bytes: byte budget for each policy, on top of the ``capacity``
+            entry limit. Entries are weighed with ``sizer(value)`` (default
+            estimate_size) and victims are evicted until a new entry fits.
+        objective: "hits" scores policies by object hit ratio, "bytes" by
+            byte hit ratio (needs ``max_bytes``).
+        events: an events.EventLog, or True for a default one, to receive
+            insert, hit, evict, switch and expire events for stored entries.
+        l2: a disk_tier.DiskTier, or a file path for a new one, that keeps
+            the values the live policy evicts. Lookups that miss check it
+            before reporting a miss and promote hits back into the cache.
+        codec: a codec.ValueCodec, or True for a default one, that stores
+            large bytes/str values compressed. Byte budgets then count the
+            compressed size.
+        """
+        if not policies:
+            raise ValueError("at least one policy is required")
+        if objective not in ("hits", "bytes"):
+            raise ValueError(f"Unknown objective: {objective!r}")
+        if objective == "bytes" and max_bytes is None:
+            # Sizes are only tracked under a byte budget; without one the
+            # switcher would quietly fall back to object hit ratio
+            raise ValueError('objective="bytes" requires max_bytes')
         self.capacity = capacity
-        self.lru_cache = LRU(capacity)
-        self.lfu_cache = LFU(capacity)
-        self.current_strategy = "LRU"
-        self.lru_stats = Stats(self.lru_cache)
-        self.lfu_stats = Stats(self.lfu_cache)
-        self.switch_threshold = 10
+        self.instrumentation = instrumentation
+        self.store = {}
+        self.admission = admission
+        if persistence is not None and not hasattr(persistence, "enqueue"):
+            persistence = WriteBehindWriter(persistence)
+        self.persistence = persistence
+        # compact=True keeps LRU/LFU metadata in array-backed arenas
+        self.policies = {name: create_policy(name, capacity, compact) for name in policies}
+        self.current_strategy = policies[0]
+        if decay is not None:
+            window = None
+        if min_dwell is None:
+            if window is not None:
+                min_dwell = window
+            elif decay is not None:
+                min_dwell = round(1 / (1 - decay))
+            else:
+                min_dwell = 0  # cumulative scores have no window to wait out
+        self.policy_stats = {name: Stats(policy, name=name, window=HitWindow(window, decay),
+                                         by_bytes=objective == "bytes")
+                             for name, policy in self.policies.items()}
+        self.lru_cache = self.policies.get("LRU")
+        self.lfu_cache = self.policies.get("LFU")
+        self.lru_stats = self.policy_stats.get("LRU")
+        self.lfu_stats = self.policy_stats.get("LFU")
+        if switch_threshold <= 0:
+            raise ValueError("switch_threshold must be positive")
+        self.switch_threshold = switch_threshold
+        self.hysteresis = hysteresis
+        self.min_dwell = min_dwell
         self.operation_count = 0
+        self.last_switch = 0
+        self.switch_count = 0
+        self.switch_log = deque(maxlen=switch_log_size)
+        self.evictions = 0
+        self.expirations = 0
+        self.default_ttl = default_ttl
+        self.ttl_resolution = ttl_resolution
+        self.expire_batch = expire_batch
+        self.clock = clock
+        self.ttl_wheel = None
+        if default_ttl is not None:
+            self._wheel()
+        self.max_bytes = max_bytes
+        self.sizer = sizer or estimate_size
+        self.objective = objective
+        self.weights = None
+        if max_bytes is not None:
+            missing = [name for name, p in self.policies.items() if not hasattr(p, "evict")]
+            if missing:
+                raise ValueError(f"Policies without evict() cannot use a byte budget: {missing}")
+            self.weights = {}
+            self.policy_bytes = dict.fromkeys(self.policies, 0)
+            self.weighers = {name: p.weigh for name, p in self.policies.items() if hasattr(p, "weigh")}
+        self.oversized = 0
+        self.events = EventLog() if events is True else events
+        if l2 is not None and not isinstance(l2, DiskTier):
+            l2 = DiskTier(l2)
+        self.l2 = l2
+        self.l1_hits = 0
+        self.l2_hits = 0
+        self.l2_misses = 0  # missed both tiers, so the caller goes to the backend
+        # Lookups actually answered from the cache; policy_stats count what
+        # each policy would have done, live or shadow
+        self.hits = 0
+        self.misses = 0
+        self.codec = ValueCodec() if codec is True else codec
+
+    def __contains__(self, key):
+        return key in self.policies[self.current_strategy] and key in self.store
+
+    def __len__(self):
+        return len(self.store)
 
     def dynamic_switcher(self):  # Fixed method name and indentation
         if self.operation_count < self.switch_threshold:
             return
-        
-        lru_performance = self.lru_stats.stats()
-        lfu_performance = self.lfu_stats.stats()
-        
-        # Switch to the strategy with better hit rate
-        if lfu_performance['hit_rate'] > lru_performance['hit_rate']:
-            if self.current_strategy != "LFU":
-                print(f"Switching to LFU (hit rate: {lfu_performance['hit_rate']:.2f})")
-                self.current_strategy = "LFU"
+        if self.operation_count - self.last_switch < self.min_dwell:
+            return
+
+        scores = {name: s.recent_hit_rate() for name, s in self.policy_stats.items()}
+        current = self.current_strategy
+        best = max(scores, key=scores.get)
+
+        # Switch only when the best candidate clearly beats the live policy
+        if best != current and scores[best] > scores[current] + self.hysteresis:
+            self.current_strategy = best
+            self.last_switch = self.operation_count
+            self.switch_count += 1
+            self.switch_log.append({
+                'step': self.operation_count,
+                'from': current,
+                'to': best,
+                'scores': scores
+            })
+            if self.events is not None:
+                self.events.emit(self.operation_count, SWITCH, detail={'from': current, 'to': best})
+
+    def _reclaim(self, key):
+        # Values are only kept for keys the live policy holds. Right after a
+        # switch the store may still carry entries the new live policy never
+        # admitted; they are dropped here once the shadow lets go of them too.
+        if key not in self.policies[self.current_strategy]:
+            if key in self.store:
+                value = self.store.pop(key)
+                if self.l2 is not None:
+                    self._demote(key, value)
+                if self.codec is not None:
+                    self.codec.discard(key)
+                if self.events is not None:
+                    self.events.emit(self.operation_count, EVICT, key)
+            if self.ttl_wheel is not None:
+                self.ttl_wheel.cancel(key)
+        if self.weights is not None and not any(key in p for p in self.policies.values()):
+            self.weights.pop(key, None)
+
+    def _demote(self, key, value):
+        # Runs before the TTL is cancelled so the deadline moves with the value
+        deadline = self.ttl_wheel.deadline(key) if self.ttl_wheel is not None else None
+        self.l2.put(key, value, deadline)
+
+    def _promote(self, key):
+        """Move ``key`` from L2 back into the cache; returns its value or -1."""
+        entry = self.l2.fetch(key)
+        if entry is None:
+            self.l2_misses += 1
+            return -1
+        value, deadline = entry
+        if deadline is not None and deadline <= self.clock():
+            self.l2.discard(key)
+            self.expirations += 1
+            self.l2_misses += 1
+            return -1
+        self.l2_hits += 1
+        self._insert(key, value)  # still encoded; L2 holds what the store held
+        if key in self.policies[self.current_strategy]:
+            # Tiers are exclusive; a copy rejected by admission stays in L2
+            self.l2.discard(key)
+            if self.events is not None and key not in self.store:
+                self.events.emit(self.operation_count, INSERT, key)
+            self.store[key] = value
+            if deadline is not None:
+                self._wheel().schedule(key, deadline)
+        if self.codec is not None:
+            value = self.codec.decode(key, value)
+        return value
+
+    def _evicted(self, name, key):
+        if self.weights is not None:
+            self.policy_bytes[name] -= self.weights.get(key, 0)
+        if name == self.current_strategy:
+            self.evictions += 1
+        self._reclaim(key)
+
+    def _make_room(self, name, policy, size):
+        # Evict until ``size`` more bytes fit in this policy's budget
+        budget = self.max_bytes - size
+        while self.policy_bytes[name] > budget:
+            key = policy.evict()
+            if key is None:
+                break
+            self._evicted(name, key)
+
+    def _forget(self, key, kind=EVICT):
+        if key in self.store:
+            del self.store[key]
+            if self.events is not None:
+                self.events.emit(self.operation_count, kind, key)
+        weights = self.weights
+        for name, policy in self.policies.items():
+            if weights is not None and key in policy:
+                self.policy_bytes[name] -= weights.get(key, 0)
+            policy.discard(key)
+        if weights is not None:
+            weights.pop(key, None)
+        if self.ttl_wheel is not None:
+            self.ttl_wheel.cancel(key)
+        if self.l2 is not None:
+            self.l2.discard(key)
+        if self.codec is not None:
+            self.codec.discard(key)
+
+    def _drop_stale(self, key):
+        # A put the live policy did not take (admission rejected it, or it was
+        # evicted on the way in) must not leave the previous value servable.
+        # Shadow policies keep their metadata, unlike _forget.
+        if key in self.store:
+            del self.store[key]
+            if self.events is not None:
+                self.events.emit(self.operation_count, EVICT, key)
+        if self.ttl_wheel is not None:
+            self.ttl_wheel.cancel(key)
+        if self.codec is not None:
+            self.codec.discard(key)
+
+    def _lookup_size(self, key):
+        # Misses on keys never put have no known size; charge the mean
+        size = self.weights.get(key)
+        if size is None:
+            live = self.policies[self.current_strategy]
+            size = self.policy_bytes[self.current_strategy] // len(live) if len(live) else 1
+        return size
+
+    def _wheel(self):
+        if self.ttl_wheel is None:
+            self.ttl_wheel = TimingWheel(self.ttl_resolution, now=self.clock())
+        return self.ttl_wheel
+
+    def _expire(self, key):
+        self._forget(key, EXPIRE)
+        self.expirations += 1
+
+    def _expire_due(self):
+        # Proactive reclamation in small steps so no single op pays for a sweep
+        now = self.clock()
+        wheel = self.ttl_wheel
+        wheel.advance(now)
+        for key in wheel.pop_expired(self.expire_batch):
+            self._expire(key)
+        return now
+
+    def _check_ttl(self, key, now):
+        deadline = self.ttl_wheel.deadline(key)
+        if deadline is not None and deadline <= now:
+            self._expire(key)
+
+    def _set_ttl(self, key, ttl, now):
+        if ttl is None:
+            ttl = self.default_ttl
+        if ttl is not None:
+            self._wheel().schedule(key, (now if now is not None else self.clock()) + ttl)
+        elif self.ttl_wheel is not None:
+            self.ttl_wheel.cancel(key)
+
+    def ttl(self, key):
+        """Seconds until ``key`` expires, or None if it has no deadline."""
+        if self.ttl_wheel is None:
+            return None
+        deadline = self.ttl_wheel.deadline(key)
+        return None if deadline is None else max(0.0, deadline - self.clock())
+
+    def enable_instrumentation(self, sample_every=1):
+        if self.instrumentation is None:
+            self.instrumentation = Instrumentation(sample_every=sample_every)
         else:
-            if self.current_strategy != "LRU":
-                print(f"Switching to LRU (hit rate: {lru_performance['hit_rate']:.2f})")
-                self.current_strategy = "LRU"
-    
+            self.instrumentation.sample_every = max(1, sample_every)
+            self.instrumentation.enabled = True
+        return self.instrumentation
+
+    def disable_instrumentation(self):
+        if self.instrumentation is not None:
+            self.instrumentation.enabled = False
+
+    def stats(self):
+        total = self.hits + self.misses
+        result = {
+            'strategy': self.current_strategy,
+            'operations': self.operation_count,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total > 0 else 0,
+            'miss_rate': self.misses / total if total > 0 else 0,
+            'entries': len(self.store),
+            'switches': self.switch_count,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'policies': {name: s.stats() for name, s in self.policy_stats.items()}
+        }
+        if self.weights is not None:
+            result['bytes'] = self.policy_bytes[self.current_strategy]
+            result['max_bytes'] = self.max_bytes
+            result['oversized'] = self.oversized
+        result['live_policy'] = self.policy_stats[self.current_strategy].stats()
+        if self.admission is not None:
+            result['admission'] = self.admission.stats()
+        if self.persistence is not None:
+            result['persistence'] = self.persistence.stats()
+        if self.instrumentation is not None:
+            result['latency'] = self.instrumentation.summary()
+        if self.events is not None:
+            result['events'] = self.events.stats()
+        if self.l2 is not None:
+            result['tiers'] = tier_stats(self.l1_hits, self.l2_hits, self.l2_misses)
+            result['l2'] = self.l2.stats()
+        if self.codec is not None:
+            result['compression'] = self.codec.stats()
+        return result
+
     def get(self, key):  # Fixed indentation and method calls
+        inst = self.instrumentation
+        start = inst.start() if inst is not None else 0
         self.operation_count += 1
+
+        if self.ttl_wheel is not None:
+            self._check_ttl(key, self._expire_due())
         
-        # Execute on both caches for comparison
-        lru_result = self.lru_stats.get(key)
-        lfu_result = self.lfu_stats.get(key)
+        if self.admission is not None:
+            self.admission.record(key)
+
+        # Update every policy's metadata for comparison
+        size = self._lookup_size(key) if self.weights is not None else None
+        for name, policy in self.policies.items():
+            self.policy_stats[name].record(policy.touch(key), size)
         
         # Return result from current strategy
-        result = lru_result if self.current_strategy == "LRU" else lfu_result
+        result = -1
+        if key in self.policies[self.current_strategy]:
+            result = self.store.get(key, -1)
+            if result != -1:
+                if self.events is not None:
+                    self.events.emit(self.operation_count, HIT, key)
+                if self.codec is not None:
+                    result = self.codec.decode(key, result)
+        if self.l2 is not None:
+            if result != -1:
+                self.l1_hits += 1
+            else:
+                result = self._promote(key)
+        if result != -1:
+            self.hits += 1
+        else:
+            self.misses += 1
         
         # Consider switching strategy
         if self.operation_count % self.switch_threshold == 0:
             self.dynamic_switcher()  # Fixed method call
         
+        if start:
+            inst.stop(start, "get", result != -1, self.current_strategy)
         return result
 
-    def put(self, key, value):  # Fixed indentation and method calls
+    def put(self, key, value, ttl=None):  # Fixed indentation and method calls
+        inst = self.instrumentation
+        start = inst.start() if inst is not None else 0
+        existed = start and key in self
         self.operation_count += 1
+
+        now = None
+        if self.ttl_wheel is not None:
+            now = self._expire_due()
+            self._check_ttl(key, now)
         
-        # Execute on both caches
-        self.lru_stats.put(key, value)
-        self.lfu_stats.put(key, value)
+        stored = self.codec.encode(key, value) if self.codec is not None else value
+        self._insert(key, stored)
+        if self.l2 is not None:
+            # The new value supersedes any demoted copy, including the old
+            # value demoted if this insert evicted the key itself
+            self.l2.discard(key)
+        live = self.policies[self.current_strategy]
+        if key in live:
+            if self.events is not None and key not in self.store:
+                self.events.emit(self.operation_count, INSERT, key)
+            self.store[key] = stored
+            if ttl is not None or self.ttl_wheel is not None:
+                self._set_ttl(key, ttl, now)
+        else:
+            self._drop_stale(key)
+        if self.persistence is not None:
+            self.persistence.enqueue(key, value)
         
         # Consider switching strategy
         if self.operation_count % self.switch_threshold == 0:
             self.dynamic_switcher()  # Fixed method call
 
+        if start:
+            inst.stop(start, "put", existed, self.current_strategy)
+
+    def _insert(self, key, value):
+        if self.weights is not None:
+            self._put_weighted(key, value)
+            return
+        # Shadow policies only see the key, the value is stored once
+        admission = self.admission
+        for name, policy in self.policies.items():
+            if not policy.touch(key):
+                if admission is not None and not admission.admit(key, policy.victim(key)):
+                    continue
+                evicted = policy.admit(key)
+                if evicted is not None:
+                    self._evicted(name, evicted)
+
+    def _put_weighted(self, key, value):
+        size = self.sizer(value)
+        if size > self.max_bytes:
+            # Can never fit; drop any stale copy rather than serve it
+            self._forget(key)
+            self.oversized += 1
+            return
+        weights = self.weights
+        old = weights.get(key, size)
+        weights[key] = size
+        admission = self.admission
+        for name, policy in self.policies.items():
+            weigh = self.weighers.get(name)
+            if policy.touch(key):
+                if old != size:
+                    self.policy_bytes[name] += size - old
+                    if weigh is not None:
+                        weigh(key, size)
+                    self._make_room(name, policy, 0)
+                continue
+            if admission is not None and not admission.admit(key, policy.victim(key)):
+                continue
+            self._make_room(name, policy, size)
+            evicted = policy.admit(key)
+            self.policy_bytes[name] += size
+            if weigh is not None:
+                weigh(key, size)
+            if evicted is not None:
+                self._evicted(name, evicted)
+        if not any(key in p for p in self.policies.values()):
+            weights.pop(key, None)
+
+    def save_snapshot(self, path):
+        """Write contents and policy state to ``path``; see snapshot.py."""
+        import snapshot
+        return snapshot.save(self, path)
+
+    @classmethod
+    def load_snapshot(cls, path, **options):
+        import snapshot
+        return snapshot.load(path, **options)
+
+    def serve_metrics(self, port=9464, host="127.0.0.1"):
+        """Expose OpenMetrics at http://host:port/metrics; see metrics.py."""
+        import metrics
+        exporter = metrics.MetricsExporter(self)
+        exporter.serve(port, host)
+        return exporter
+
+    def flush(self, timeout=None):
+        """Wait for queued writes to reach the persistence backend."""
+        if self.persistence is not None:
+            return self.persistence.flush(timeout)
+        return True
+
+    def close(self):
+        if self.persistence is not None:
+            self.persistence.close()
+        if self.l2 is not None:
+            self.l2.close()
+
+    def _advance(self, count):
+        # Batches move the op counter by more than one; run the switcher once
+        # if any evaluation boundary was crossed
+        before = self.operation_count
+        self.operation_count += count
+        if before // self.switch_threshold != self.operation_count // self.switch_threshold:
+            self.dynamic_switcher()
+
+    def get_many(self, keys):
+        """
+        Look up a batch of keys in one pass per policy.
+
+        Returns ``(hits, misses)``: a dict of the keys found and their
+        values, and the distinct missing keys in request order.
+        """
+        inst = self.instrumentation
+        start = inst.start() if inst is not None else 0
+        keys = list(keys)
+
+        if self.ttl_wheel is not None:
+            now = self._expire_due()
+            for key in keys:
+                self._check_ttl(key, now)
+
+        if self.admission is not None:
+            record = self.admission.record
+            for key in keys:
+                record(key)
+
+        sizes = None
+        if self.weights is not None:
+            sizes = [self._lookup_size(key) for key in keys]
+        live = self.current_strategy
+        live_hits = None
+        for name, policy in self.policies.items():
+            touch = policy.touch
+            hits = [touch(key) for key in keys]
+            self.policy_stats[name].record_many(hits, sizes)
+            if name == live:
+                live_hits = hits
+
+        found = {}
+        misses = {}
+        store = self.store
+        events = self.events
+        for i, (key, hit) in enumerate(zip(keys, live_hits)):
+            if hit and key in store:
+                found[key] = store[key]
+                if events is not None:
+                    events.emit(self.operation_count + i + 1, HIT, key)
+            else:
+                misses[key] = None
+        if self.codec is not None:
+            decode = self.codec.decode
+            for key, value in found.items():
+                found[key] = decode(key, value)
+
+        if self.l2 is not None:
+            self.l1_hits += len(found)
+            for key in list(misses):
+                value = self._promote(key)
+                if value != -1:
+                    found[key] = value
+                    del misses[key]
+        # Repeated keys count once each way, like the returned hits and misses
+        self.hits += len(found)
+        self.misses += len(misses)
+
+        self._advance(len(keys))
+
+        if start:
+            inst.stop(start, "get_many", not misses, self.current_strategy)
+        return found, list(misses)
+
+    def put_many(self, items, ttl=None):
+        """Insert a batch of ``(key, value)`` pairs (or a dict) in one pass per policy."""
+        inst = self.instrumentation
+        start = inst.start() if inst is not None else 0
+        if isinstance(items, dict):
+            items = items.items()
+        items = list(items)
+        originals = items
+        if self.codec is not None:
+            encode = self.codec.encode
+            items = [(key, encode(key, value)) for key, value in items]
+
+        now = None
+        if self.ttl_wheel is not None:
+            now = self._expire_due()
+            for key, _ in items:
+                self._check_ttl(key, now)
+
+        admission = self.admission
+        if self.weights is not None:
+            # Byte budgets evict per entry, so weighted batches go one by one
+            for key, value in items:
+                self._put_weighted(key, value)
+        else:
+            for name, policy in self.policies.items():
+                touch, admit, victim = policy.touch, policy.admit, policy.victim
+                for key, _ in items:
+                    if touch(key):
+                        continue
+                    if admission is not None and not admission.admit(key, victim(key)):
+                        continue
+                    evicted = admit(key)
+                    if evicted is not None:
+                        self._evicted(name, evicted)
+        if self.l2 is not None:
+            # After the inserts, so old values of batch keys evicted mid-batch
+            # are not left behind in L2
+            for key, _ in items:
+                self.l2.discard(key)
+
+        live = self.policies[self.current_strategy]
+        store = self.store
+        events = self.events
+        track_ttl = ttl is not None or self.ttl_wheel is not None
+        for i, (key, value) in enumerate(items):
+            if key in live:
+                if events is not None and key not in store:
+                    events.emit(self.operation_count + i + 1, INSERT, key)
+                store[key] = value
+                if track_ttl:
+                    self._set_ttl(key, ttl, now)
+            else:
+                self._drop_stale(key)
+        if self.persistence is not None:
+            self.persistence.enqueue_many(originals)
+
+        self._advance(len(items))
+
+        if start:
+            inst.stop(start, "put_many", True, self.current_strategy)
+
+
+class ShardedDynamicCache:
+    """
+    Thread-safe DynamicCache split into independent shards.
+
+    Keys are hashed onto ``num_shards`` DynamicCache instances, each guarded
+    by its own lock and running its own policy switcher, so threads touching
+    different shards never contend. Extra keyword options are passed on to
+    every shard's DynamicCache; a persistence backend gets one writer that
+    all shards share.
+    """
+
+    def __init__(self, capacity, num_shards=16, instrumentation=False, **options):
+        if num_shards <= 0:
+            raise ValueError("num_shards must be positive")
+        self.capacity = capacity
+        self.num_shards = num_shards
+        per_shard = -(-capacity // num_shards)  # ceil so total >= capacity
+        l2 = options.get("l2")
+        if l2 is not None and not isinstance(l2, DiskTier):
+            options["l2"] = DiskTier(l2)  # one segment shared by every shard
+        persistence = options.get("persistence")
+        if persistence is not None and not hasattr(persistence, "enqueue"):
+            # One writer per backend; several would each close it on close()
+            options["persistence"] = persistence = WriteBehindWriter(persistence)
+        self.persistence = persistence
+        codec = options.get("codec")
+        self.shards = []
+        self.locks = []
+        for _ in range(num_shards):
+            inst = Instrumentation() if instrumentation else None
+            if isinstance(codec, ValueCodec):
+                options["codec"] = codec.clone()  # hot-value caches are per shard
+            self.shards.append(DynamicCache(per_shard, instrumentation=inst, **options))
+            self.locks.append(threading.Lock())
+
+    def _index(self, key):
+        return hash(key) % self.num_shards
+
+    def shard_for(self, key):
+        return self.shards[self._index(key)]
+
+    def __contains__(self, key):
+        i = self._index(key)
+        with self.locks[i]:
+            return key in self.shards[i]
+
+    def __len__(self):
+        return sum(len(shard) for shard in self.shards)
+
+    def get(self, key):
+        i = self._index(key)
+        with self.locks[i]:
+            return self.shards[i].get(key)
+
+    def put(self, key, value, ttl=None):
+        i = self._index(key)
+        with self.locks[i]:
+            self.shards[i].put(key, value, ttl)
+
+    def _group(self, keys):
+        groups = {}
+        for key in keys:
+            groups.setdefault(self._index(key), []).append(key)
+        return groups
+
+    def get_many(self, keys):
+        found = {}
+        misses = []
+        for i, group in self._group(keys).items():
+            with self.locks[i]:
+                shard_found, shard_misses = self.shards[i].get_many(group)
+            found.update(shard_found)
+            misses.extend(shard_misses)
+        return found, misses
+
+    def put_many(self, items, ttl=None):
+        if isinstance(items, dict):
+            items = items.items()
+        groups = {}
+        for key, value in items:
+            groups.setdefault(self._index(key), []).append((key, value))
+        for i, group in groups.items():
+            with self.locks[i]:
+                self.shards[i].put_many(group, ttl)
+
+    def serve_metrics(self, port=9464, host="127.0.0.1"):
+        import metrics
+        exporter = metrics.MetricsExporter(self)
+        exporter.serve(port, host)
+        return exporter
+
+    def flush(self, timeout=None):
+        """Wait for queued writes to reach the persistence backend."""
+        if self.persistence is not None:
+            return self.persistence.flush(timeout)
+        return True
+
+    def close(self):
+        for shard, lock in zip(self.shards, self.locks):
+            with lock:
+                shard.persistence = None  # shared; closed once below
+                shard.close()
+        if self.persistence is not None:
+            # Drains what every shard queued before closing the backend
+            self.persistence.close()
+
+    def stats(self):
+        shard_stats = []
+        latency = Instrumentation()
+        for shard, lock in zip(self.shards, self.locks):
+            with lock:
+                shard_stats.append(shard.stats())
+                if shard.instrumentation is not None:
+                    latency.merge(shard.instrumentation)
+
+        policies = {}
+        for st in shard_stats:
+            for name, ps in st['policies'].items():
+                agg = policies.setdefault(name, {'hits': 0, 'misses': 0})
+                agg['hits'] += ps['hits']
+                agg['misses'] += ps['misses']
+        for agg in policies.values():
+            total = agg['hits'] + agg['misses']
+            agg['hit_rate'] = agg['hits'] / total if total > 0 else 0
+            agg['miss_rate'] = agg['misses'] / total if total > 0 else 0
+
+        hits = sum(st['hits'] for st in shard_stats)
+        misses = sum(st['misses'] for st in shard_stats)
+        total = hits + misses
+        strategies = {}
+        for st in shard_stats:
+            strategies[st['strategy']] = strategies.get(st['strategy'], 0) + 1
+        result = {
+            'shards': self.num_shards,
+            'strategies': strategies,
+            'operations': sum(st['operations'] for st in shard_stats),
+            'switches': sum(st['switches'] for st in shard_stats),
+            'evictions': sum(st['evictions'] for st in shard_stats),
+            'expirations': sum(st['expirations'] for st in shard_stats),
+            'entries': sum(st['entries'] for st in shard_stats),
+            'policies': policies,
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / total if total > 0 else 0,
+            'miss_rate': misses / total if total > 0 else 0,
+            'per_shard': shard_stats
+        }
+        if latency.histograms:
+            result['latency'] = latency.summary()
+        tiered = [shard for shard in self.shards if shard.l2 is not None]
+        if tiered:
+            result['tiers'] = tier_stats(sum(s.l1_hits for s in tiered), sum(s.l2_hits for s in tiered),
+                                         sum(s.l2_misses for s in tiered))
+            result['l2'] = tiered[0].l2.stats()
+        codecs = [shard.codec for shard in self.shards if shard.codec is not None]
+        if codecs:
+            result['compression'] = codec_stats(codecs)
+        return result
+
+
+# Built-in policies register themselves on import
+import policies  # ARC, SLRU, 2Q, CLOCK
+import admission  # W-TinyLFU
+import mixing  # LeCaR
@@ -0,0 +1,108 @@
+import random
+
+import pytest
+
+from admission import CountMinSketch, TinyLFU
+from structures import POLICY_REGISTRY, DynamicCache, create_policy
+
+
+def test_sketch_counts_and_saturates():
+    sketch = CountMinSketch(width=256)
+    for _ in range(3):
+        sketch.increment("a")
+    assert sketch.estimate("a") == 3
+    assert sketch.estimate("never") == 0
+    for _ in range(40):
+        sketch.increment("b")
+    assert sketch.estimate("b") == 15  # 4-bit counters
+
+
+def test_sketch_ages_after_sample_size():
+    sketch = CountMinSketch(width=256, sample_size=10)
+    for _ in range(9):
+        sketch.increment("a")
+    assert sketch.estimate("a") == 9
+    sketch.increment("a")
+    assert sketch.estimate("a") == 5
+    assert sketch.additions == 5
+
+
+def test_tinylfu_admits_only_more_frequent_candidates():
+    tlfu = TinyLFU(width=256)
+    for _ in range(3):
+        tlfu.record("hot")
+    tlfu.record("cold")
+    assert tlfu.admit("new", None)  # room left: always admitted
+    assert not tlfu.admit("cold", "hot")
+    assert tlfu.admit("hot", "cold")
+    assert tlfu.stats()['rejected'] == 1
+
+
+def test_w_tinylfu_keeps_frequent_keys_through_a_scan():
+    cache = DynamicCache(100, policies=("W-TinyLFU",))
+    hot = [f"hot{i}" for i in range(50)]
+    for _ in range(5):
+        for key in hot:
+            if cache.get(key) == -1:
+                cache.put(key, key)
+    for i in range(1000):
+        cache.put(f"scan{i}", i)
+    assert sum(key in cache for key in hot) >= 45
+
+
+def _rejecting_cache():
+    """A cache whose LFU shadow holds "b" and a popular "x" but not "a"."""
+    cache = DynamicCache(2, policies=("LRU", "LFU"), admission=TinyLFU(), switch_threshold=1000)
+    cache.put("b", 1)
+    cache.get("b")
+    cache.get("b")
+    cache.put("a", "old")
+    for _ in range(4):
+        cache.get("x")
+    cache.put("x", 1)
+    assert "a" in cache.policies["LRU"] and "a" not in cache.policies["LFU"]
+    return cache
+
+
+def test_rejected_put_drops_old_value():
+    cache = _rejecting_cache()
+    cache.current_strategy = "LFU"
+    rejected = cache.admission.rejected
+    cache.put("a", "new")
+    assert cache.admission.rejected > rejected
+    assert cache.get("a") == -1
+    cache.current_strategy = "LRU"
+    assert cache.get("a") == -1
+
+
+def test_rejected_put_many_drops_old_values():
+    cache = _rejecting_cache()
+    cache.current_strategy = "LFU"
+    cache.put_many([("a", "new")])
+    cache.current_strategy = "LRU"
+    assert cache.get("a") == -1
+    assert "a" not in cache.store
+
+
+def test_admitted_put_replaces_value():
+    cache = DynamicCache(2, admission=TinyLFU())
+    cache.put("a", "old")
+    cache.put("a", "new")
+    assert cache.get("a") == "new"
+
+
+@pytest.mark.parametrize("name", sorted(POLICY_REGISTRY))
+def test_victim_matches_what_admit_evicts(name):
+    # TinyLFU compares a candidate against victim(key); it must be the key
+    # admit(key) then evicts, ghost-list adaptation included
+    for seed in range(20):
+        rng = random.Random(seed)
+        policy = create_policy(name, 16)
+        for _ in range(5000):
+            key = int(rng.paretovariate(1.0)) % 64
+            if policy.touch(key):
+                continue
+            expected = policy.victim(key)
+            evicted = policy.admit(key)
+            if expected is not None:
+                assert evicted == expected
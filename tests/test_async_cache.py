@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from async_cache import AsyncLoadingCache
+from structures import DynamicCache
+
+
+class FailingPutCache(DynamicCache):
+    def put(self, key, value, ttl=None):
+        raise RuntimeError("store failed")
+
+    def put_many(self, items, ttl=None):
+        raise RuntimeError("store failed")
+
+
+def test_loads_once_for_concurrent_misses():
+    calls = []
+
+    async def loader(key):
+        calls.append(key)
+        await asyncio.sleep(0)
+        return key * 2
+
+    async def main():
+        cache = AsyncLoadingCache(DynamicCache(10))
+        results = await asyncio.gather(*(cache.get_or_load(3, loader) for _ in range(5)))
+        return cache, results
+
+    cache, results = asyncio.run(main())
+    assert results == [6] * 5
+    assert calls == [3]
+    assert cache.cache.get(3) == 6
+
+
+def test_loader_error_reaches_waiters_and_retries():
+    attempts = []
+
+    async def loader(key):
+        attempts.append(key)
+        if len(attempts) == 1:
+            raise ValueError("backend down")
+        return "ok"
+
+    async def main():
+        cache = AsyncLoadingCache(DynamicCache(10))
+        results = await asyncio.gather(cache.get_or_load("k", loader), cache.get_or_load("k", loader),
+                                       return_exceptions=True)
+        assert all(isinstance(r, ValueError) for r in results)
+        assert cache.in_flight == {}
+        assert await cache.get_or_load("k", loader) == "ok"
+        return cache
+
+    cache = asyncio.run(main())
+    assert cache.load_errors == 1
+
+
+def test_put_error_fails_waiters_and_clears_in_flight():
+    async def main():
+        cache = AsyncLoadingCache(FailingPutCache(10))
+        with pytest.raises(RuntimeError):
+            await asyncio.wait_for(cache.get_or_load("k", str), 1)
+        with pytest.raises(RuntimeError):
+            await asyncio.wait_for(cache.get_many_or_load(["a", "b"], lambda keys: {k: k for k in keys}), 1)
+        assert cache.in_flight == {}
+        assert cache.load_errors == 2
+
+    asyncio.run(main())
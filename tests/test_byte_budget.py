@@ -0,0 +1,47 @@
+import pytest
+
+from structures import DynamicCache
+
+
+def test_byte_objective_requires_budget():
+    with pytest.raises(ValueError):
+        DynamicCache(10, objective="bytes")
+
+
+def test_byte_objective_scores_by_size():
+    cache = DynamicCache(10, objective="bytes", max_bytes=1000, sizer=len)
+    cache.put("big", "x" * 500)
+    cache.get("big")
+    cache.put("small", "x")
+    cache.get("nope")
+    stats = cache.stats()['live_policy']
+    assert stats['byte_hits'] == 500
+    assert stats['hit_rate'] == 0.5
+    assert cache.policy_stats["LRU"].recent_hit_rate() > 0.5
+
+
+def test_byte_budget_evicts_until_entry_fits():
+    cache = DynamicCache(10, max_bytes=100, sizer=len)
+    cache.put("a", "x" * 40)
+    cache.put("b", "x" * 40)
+    cache.put("c", "x" * 40)
+    assert "a" not in cache
+    assert cache.stats()['bytes'] == 80
+
+
+def test_byte_budget_tracks_entry_growth():
+    cache = DynamicCache(10, max_bytes=100, sizer=len)
+    cache.put("a", "x" * 40)
+    cache.put("b", "x" * 40)
+    cache.put("b", "x" * 70)
+    assert "a" not in cache
+    assert cache.get("b") == "x" * 70
+    assert cache.policy_bytes == {"LRU": 70, "LFU": 70}
+
+
+def test_oversized_put_drops_old_value():
+    cache = DynamicCache(10, max_bytes=100, sizer=len)
+    cache.put("a", "x" * 10)
+    cache.put("a", "x" * 200)
+    assert cache.get("a") == -1
+    assert cache.stats()['oversized'] == 1
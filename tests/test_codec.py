@@ -0,0 +1,69 @@
+import os
+import pickle
+
+import pytest
+
+from codec import Compressed, ValueCodec, byte_entropy
+from structures import DynamicCache
+
+TEXT = ("the quick brown fox jumps over the lazy dog " * 400)
+
+
+@pytest.mark.parametrize("algorithm", ["zlib", "lzma"])
+@pytest.mark.parametrize("value", [TEXT, TEXT.encode(), bytearray(TEXT.encode())])
+def test_round_trip(algorithm, value):
+    codec = ValueCodec(threshold=1024, algorithm=algorithm)
+    stored = codec.encode("k", value)
+    assert isinstance(stored, Compressed)
+    assert stored.size == len(TEXT)
+    decoded = codec.decode("k", stored)
+    assert decoded == value and type(decoded) is (str if isinstance(value, str) else bytes)
+
+
+def test_skips_small_and_non_bytes_values():
+    codec = ValueCodec(threshold=1024)
+    assert codec.encode("k", "short") == "short"
+    assert codec.encode("k", [1, 2]) == [1, 2]
+    assert codec.stats()['skipped_small'] == 1
+
+
+def test_skips_high_entropy_data():
+    codec = ValueCodec(threshold=1024)
+    noise = os.urandom(64 << 10)
+    assert byte_entropy(noise) > 7.5
+    assert byte_entropy(TEXT.encode()) < 5
+    assert codec.encode("k", noise) is noise
+    assert codec.stats()['skipped_entropy'] == 1
+
+
+def test_skips_values_that_barely_shrink():
+    codec = ValueCodec(threshold=1024, max_entropy=8.0, min_saving=0.5)
+    noise = os.urandom(8 << 10)
+    assert codec.encode("k", noise) is noise
+    assert codec.stats()['skipped_ratio'] == 1
+
+
+def test_hot_cache_skips_decoding_until_rewritten():
+    codec = ValueCodec(threshold=1024, hot_entries=1)
+    stored = codec.encode("k", TEXT)
+    codec.decode("k", stored)
+    codec.decode("k", stored)
+    assert (codec.counts['decoded'], codec.counts['hot_hits']) == (1, 1)
+    newer = codec.encode("k", TEXT + "!")
+    assert codec.decode("k", newer) == TEXT + "!"
+    assert codec.counts['decoded'] == 2
+
+
+def test_compressed_blob_pickles():
+    codec = ValueCodec(threshold=1024)
+    stored = pickle.loads(pickle.dumps(codec.encode("k", TEXT)))
+    assert codec.decode("other", stored) == TEXT
+
+
+def test_cache_serves_original_values_and_charges_compressed_size():
+    cache = DynamicCache(10, max_bytes=4096, codec=ValueCodec(threshold=1024))
+    cache.put("a", TEXT)
+    cache.put_many([("b", TEXT.encode())])
+    assert cache.get("a") == TEXT
+    assert cache.get_many(["b"])[0] == {"b": TEXT.encode()}
+    assert cache.stats()['bytes'] < len(TEXT)
@@ -0,0 +1,70 @@
+import random
+
+import numpy as np
+import pytest
+
+from int_cache import IntKeyCache
+from structures import create_policy
+
+
+@pytest.mark.parametrize("policy", ["LRU", "LFU"])
+def test_sequential_replay_matches_node_policies(policy):
+    cache = IntKeyCache(50, policy=policy, key_range=16)
+    reference = create_policy(policy, 50)
+    rng = random.Random(4)
+    for _ in range(20000):
+        key = int(rng.paretovariate(0.9)) % 300
+        hit = cache.get(key) != -1
+        assert hit == reference.touch(key)
+        if not hit:
+            cache.put(key, key)
+            reference.admit(key)
+    assert sorted(cache.keys[cache.keys >= 0].tolist()) == sorted(reference.snapshot_order()[0])
+
+
+def test_values_and_updates():
+    cache = IntKeyCache(4)
+    cache.put(3, ("a", 1))
+    cache.put_many([5, 3], ["x", [1, 2]])
+    assert cache.get(3) == [1, 2]
+    assert cache.get(5) == "x"
+    assert cache.get(7) == -1
+    cache.discard(5)
+    assert 5 not in cache and len(cache) == 1
+
+
+def test_get_many_returns_mask_and_values():
+    cache = IntKeyCache(8)
+    cache.put_many(np.arange(4), ["a", "b", "c", "d"])
+    mask, values = cache.get_many([0, 9, 2, -1], with_values=True)
+    assert mask.tolist() == [True, False, True, False]
+    assert values.tolist() == ["a", "c"]
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+def test_put_many_evicts_least_recent_and_keeps_latest_duplicates():
+    cache = IntKeyCache(3)
+    cache.put_many([1, 2, 3])
+    cache.get(1)
+    evicted = cache.put_many([4, 4], ["old", "new"])
+    assert evicted.tolist() == [2]
+    assert cache.get(4) == "new"
+    assert len(cache) == 3
+
+
+def test_key_table_grows_and_rejects_negative_keys():
+    cache = IntKeyCache(4, key_range=8)
+    cache.put(1000, "far")
+    assert cache.slot_of.size > 1000
+    assert cache.get(1000) == "far"
+    with pytest.raises(ValueError):
+        cache.put(-1, "neg")
+
+
+def test_numeric_value_dtype():
+    cache = IntKeyCache(4, value_dtype=np.float64)
+    cache.put_many([1, 2], [0.5, 1.5])
+    cache.put(3)
+    assert cache.get(2) == 1.5
+    cache.discard(1)
+    assert cache.get(1) == -1
@@ -0,0 +1,91 @@
+import threading
+
+import pytest
+
+from disk_tier import DiskTier
+from structures import DynamicCache
+
+
+@pytest.fixture
+def l2_path(tmp_path):
+    return str(tmp_path / "l2.seg")
+
+
+def test_evicted_value_is_demoted_and_promoted(l2_path):
+    cache = DynamicCache(2, policies=("LRU",), l2=l2_path)
+    try:
+        cache.put("a", "1")
+        cache.put("b", "2")
+        cache.put("c", "3")
+        assert "a" not in cache
+        assert cache.get("a") == "1"
+        assert "a" in cache
+        assert cache.l2_hits == 1
+    finally:
+        cache.close()
+
+
+def test_put_many_does_not_leave_old_value_in_l2(l2_path):
+    cache = DynamicCache(2, policies=("LRU",), l2=l2_path)
+    try:
+        cache.put("a", "old")
+        # "a" is evicted by "c" later in the same batch
+        cache.put_many([("a", "new"), ("b", "2"), ("c", "3")])
+        assert cache.get("a") != "old"
+    finally:
+        cache.close()
+
+
+def test_growing_entry_does_not_demote_old_value(l2_path):
+    cache = DynamicCache(10, policies=("LFU",), max_bytes=100, sizer=len, l2=l2_path)
+    try:
+        cache.put("b", "y" * 40)
+        for _ in range(3):
+            cache.get("b")
+        cache.put("a", "x" * 10)
+        # "a" is still the least frequent, so making room for it evicts it
+        cache.put("a", "z" * 95)
+        assert cache.get("a") in ("z" * 95, -1)
+    finally:
+        cache.close()
+
+
+def test_growing_entry_keeps_budget(l2_path):
+    cache = DynamicCache(10, policies=("LRU",), max_bytes=100, sizer=len, l2=l2_path)
+    try:
+        cache.put("a", "x" * 40)
+        cache.put("b", "y" * 40)
+        cache.put("a", "z" * 80)
+        assert cache.policy_bytes["LRU"] <= 100
+        assert cache.get("a") == "z" * 80
+        assert cache.get("b") == "y" * 40  # promoted back from L2
+    finally:
+        cache.close()
+
+
+@pytest.mark.parametrize("retain, compact_at", [(0.5, 0.75), (0.9, 1.0)])
+def test_compaction_under_concurrent_writes_stays_in_segment(tmp_path, retain, compact_at):
+    tier = DiskTier(str(tmp_path / "l2.seg"), max_bytes=1 << 16, retain=retain, compact_at=compact_at)
+    errors = []
+
+    def writer(n):
+        try:
+            for i in range(5000):
+                tier.put((n, i % 300), b"v" * (50 + i % 200))
+                if i % 500 == 0:
+                    tier.compact()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    try:
+        assert errors == []
+        assert tier.tail <= tier.max_bytes
+        for key in list(tier.index):
+            assert tier.fetch(key) is not None
+    finally:
+        tier.close()
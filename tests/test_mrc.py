@@ -0,0 +1,66 @@
+import random
+from collections import OrderedDict
+
+import pytest
+
+import replay
+from mrc import StackDistanceProfiler, miss_ratio_curve, miss_ratio_curve_file
+
+CAPACITIES = [1, 2, 5, 10, 50, 100, 400]
+
+
+def _trace(n=20000, keys=500, seed=0):
+    rng = random.Random(seed)
+    return [int(rng.paretovariate(0.8)) % keys for _ in range(n)]
+
+
+def _lru_miss_ratio(trace, capacity):
+    cache = OrderedDict()
+    misses = 0
+    for key in trace:
+        if key in cache:
+            cache.move_to_end(key)
+        else:
+            misses += 1
+            cache[key] = None
+            if len(cache) > capacity:
+                cache.popitem(last=False)
+    return misses / len(trace)
+
+
+@pytest.mark.parametrize("initial_size", [1 << 16, 64])  # 64 forces compaction
+def test_matches_exact_lru_simulation(initial_size):
+    trace = _trace()
+    profiler = StackDistanceProfiler(initial_size=initial_size).feed(trace)
+    capacities, ratios = profiler.curve(CAPACITIES)
+    assert capacities == CAPACITIES
+    for capacity, ratio in zip(capacities, ratios):
+        assert ratio == pytest.approx(_lru_miss_ratio(trace, capacity))
+        assert profiler.miss_ratio(capacity) == pytest.approx(ratio)
+
+
+def test_curve_is_non_increasing():
+    _, ratios = miss_ratio_curve(_trace(seed=1))
+    assert all(a >= b for a, b in zip(ratios, ratios[1:]))
+
+
+def test_cold_misses_only_on_first_access():
+    profiler = StackDistanceProfiler().feed([1, 2, 3, 1, 2, 3])
+    assert profiler.stats()['cold_misses'] == 3
+    assert profiler.miss_ratio(3) == 0.5
+    assert profiler.miss_ratio(2) == 1.0
+
+
+def test_shards_sampling_approximates_the_curve():
+    trace = _trace(n=100000, keys=5000, seed=2)
+    _, exact = miss_ratio_curve(trace, [100, 1000])
+    _, sampled = miss_ratio_curve(trace, [100, 1000], rate=0.1)
+    for e, s in zip(exact, sampled):
+        assert abs(e - s) < 0.05
+
+
+def test_curve_from_trace_file(tmp_path):
+    trace = _trace(n=5000)
+    path = str(tmp_path / "trace.bin")
+    replay.write_binary(path, trace)
+    assert miss_ratio_curve_file(path, CAPACITIES) == miss_ratio_curve(trace, CAPACITIES)
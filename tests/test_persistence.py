@@ -0,0 +1,141 @@
+import os
+import queue
+import threading
+import time
+
+import pytest
+
+from persistence import AppendLogBackend, SQLiteBackend, WriteBehindWriter
+from structures import DynamicCache, ShardedDynamicCache
+
+
+def test_sharded_cache_shares_one_writer(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "cache.db"))
+    cache = ShardedDynamicCache(100, num_shards=4, persistence=backend)
+    assert len({id(shard.persistence) for shard in cache.shards}) == 1
+    cache.close()
+
+
+def test_sharded_close_writes_every_entry(tmp_path):
+    path = str(tmp_path / "cache.log")
+    cache = ShardedDynamicCache(1000, num_shards=8, persistence=AppendLogBackend(path, fsync=False))
+    cache.put_many((i, i) for i in range(20000))
+    cache.close()
+    reader = AppendLogBackend(path, fsync=False)
+    try:
+        assert dict(reader.load()) == {i: i for i in range(20000)}
+    finally:
+        reader.close()
+
+
+def test_sharded_flush_reaches_backend(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "cache.db"))
+    cache = ShardedDynamicCache(100, num_shards=4, persistence=backend)
+    try:
+        cache.put_many((i, str(i)) for i in range(50))
+        assert cache.flush(timeout=10)
+        assert len(dict(backend.load())) == 50
+    finally:
+        cache.close()
+
+
+class GatedBackend:
+    """Records batches; write_batch waits for ``gate`` and can be made to fail."""
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.gate.set()
+        self.batches = []
+        self.fail = 0
+        self.closed = False
+
+    def write_batch(self, items):
+        self.gate.wait(5)
+        if self.fail:
+            self.fail -= 1
+            raise OSError("disk full")
+        self.batches.append(list(items))
+
+    def close(self):
+        self.closed = True
+
+    def rows(self):
+        return {k: v for batch in self.batches for k, v in batch}
+
+
+@pytest.mark.parametrize("make", [
+    lambda path: SQLiteBackend(path + ".db"),
+    lambda path: AppendLogBackend(path + ".log", fsync=False),
+])
+def test_backend_round_trip_keeps_latest_value(tmp_path, make):
+    backend = make(str(tmp_path / "store"))
+    backend.write_batch([("a", 1), (("t", 2), [1, 2])])
+    backend.write_batch([("a", 3)])
+    assert dict(backend.load()) == {"a": 3, ("t", 2): [1, 2]}
+    backend.close()
+
+
+def test_append_log_ignores_torn_tail(tmp_path):
+    path = str(tmp_path / "store.log")
+    backend = AppendLogBackend(path, fsync=False)
+    backend.write_batch([("a", 1), ("b", 2)])
+    backend.close()
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 3)
+    assert dict(AppendLogBackend(path, fsync=False).load()) == {"a": 1}
+
+
+def test_writer_coalesces_pending_writes():
+    backend = GatedBackend()
+    writer = WriteBehindWriter(backend, flush_interval=0.01)
+    try:
+        backend.gate.clear()
+        writer.enqueue("first", 0)
+        while not backend.batches and writer.stats()['pending']:
+            time.sleep(0.001)  # the writer thread is now parked in write_batch
+        for i in range(5):
+            writer.enqueue("k", i)
+        assert writer.stats()['coalesced'] == 4
+        backend.gate.set()
+        assert writer.flush(timeout=5)
+        assert backend.rows() == {"first": 0, "k": 4}
+        assert writer.stats()['written'] == 2
+    finally:
+        writer.close()
+    assert backend.closed
+
+
+def test_writer_blocks_then_raises_when_full():
+    backend = GatedBackend()
+    backend.gate.clear()
+    writer = WriteBehindWriter(backend, max_pending=2, batch_size=1, flush_interval=0.01, put_timeout=0.05)
+    try:
+        with pytest.raises(queue.Full):
+            for i in range(10):
+                writer.enqueue(i, i)
+    finally:
+        backend.gate.set()
+        writer.close()
+
+
+def test_writer_retries_failed_batches():
+    backend = GatedBackend()
+    backend.fail = 2
+    writer = WriteBehindWriter(backend, flush_interval=0.01)
+    try:
+        writer.enqueue("a", 1)
+        assert writer.flush(timeout=5)
+        assert backend.rows() == {"a": 1}
+        assert writer.stats()['errors'] == 2
+    finally:
+        writer.close()
+
+
+def test_cache_puts_reach_the_backend(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "cache.db"))
+    cache = DynamicCache(10, persistence=backend)
+    cache.put("a", 1)
+    cache.put_many([("b", 2), ("a", 3)])
+    assert cache.flush(timeout=5)
+    assert dict(backend.load()) == {"a": 3, "b": 2}
+    cache.close()
@@ -0,0 +1,92 @@
+import pytest
+
+from structures import create_policy
+
+
+def test_clock_victim_does_not_change_state():
+    clock = create_policy("CLOCK", 3)
+    for key in "abc":
+        clock.admit(key)
+    clock.touch("a")
+    clock.touch("b")
+    before = (bytes(clock.ref), clock.hand)
+    assert clock.victim("d") == "c"
+    assert (bytes(clock.ref), clock.hand) == before
+    assert clock.admit("d") == "c"
+
+
+@pytest.mark.parametrize("touched", [(), ("a",), ("a", "b", "c")])
+def test_clock_victim_matches_admit(touched):
+    clock = create_policy("CLOCK", 3)
+    for key in "abc":
+        clock.admit(key)
+    for key in touched:
+        clock.touch(key)
+    expected = clock.victim("d")
+    assert clock.admit("d") == expected
+
+
+def _admit_all(policy, keys):
+    return [policy.admit(key) for key in keys]
+
+
+def test_registry_builds_every_policy():
+    for name in ("LRU", "LFU", "ARC", "SLRU", "2Q", "CLOCK", "GDSF"):
+        policy = create_policy(name, 4)
+        assert _admit_all(policy, "abcd") == [None] * 4
+        assert len(policy) == 4 and "a" in policy
+    with pytest.raises(KeyError):
+        create_policy("nope", 4)
+
+
+def test_arc_ghost_hit_shifts_target():
+    arc = create_policy("ARC", 2)
+    _admit_all(arc, "ab")
+    arc.touch("a")  # a moves to T2
+    assert arc.admit("c") == "b"  # b goes to the B1 ghost list
+    assert "b" in arc.b1
+    # A B1 hit grows T1's target, so REPLACE now takes T2's tail
+    assert arc.admit("b") == "a"
+    assert arc.p == 1
+    assert "b" in arc.t2
+
+
+def test_slru_protects_reused_keys_from_scans():
+    slru = create_policy("SLRU", 4)  # two protected slots
+    _admit_all(slru, "abcd")
+    slru.touch("a")
+    slru.touch("b")
+    assert _admit_all(slru, "efgh") == ["c", "d", "e", "f"]
+    assert "a" in slru and "b" in slru
+
+
+def test_2q_readmits_ghosts_into_am():
+    twoq = create_policy("2Q", 4)  # A1in holds 1, A1out remembers 2
+    _admit_all(twoq, "abcd")
+    assert twoq.admit("e") == "a"
+    assert "a" in twoq.a1out
+    assert twoq.admit("a") == "b"
+    assert "a" in twoq.am
+    assert twoq.admit("f") == "c"  # A1in drains first, "a" stays
+    assert "a" in twoq
+
+
+def test_clock_gives_referenced_keys_a_second_chance():
+    clock = create_policy("CLOCK", 3)
+    _admit_all(clock, "abc")
+    clock.touch("a")
+    assert clock.admit("d") == "b"
+    assert clock.admit("e") == "c"
+    assert clock.admit("f") == "a"  # its bit was cleared on the first pass
+
+
+def test_gdsf_prefers_evicting_large_cold_entries():
+    gdsf = create_policy("GDSF", 2)
+    gdsf.admit("big")
+    gdsf.weigh("big", 100)
+    gdsf.admit("small")
+    gdsf.weigh("small", 1)
+    assert gdsf.admit("new") == "big"
+    assert gdsf.inflation == pytest.approx(0.01)
+    gdsf.touch("small")
+    assert gdsf.admit("other") == "new"
@@ -0,0 +1,15 @@
+import replay
+
+
+def test_read_binary_round_trip(tmp_path):
+    path = str(tmp_path / "trace.bin")
+    replay.write_binary(path, range(10))
+    assert [k for chunk in replay.read_binary(path, chunk_size=4) for k in chunk] == list(range(10))
+
+
+def test_read_binary_closes_early(tmp_path):
+    path = str(tmp_path / "trace.bin")
+    replay.write_binary(path, range(10))
+    chunks = replay.read_binary(path, chunk_size=4)
+    assert next(chunks) == [0, 1, 2, 3]
+    chunks.close()  # must not raise BufferError from closing the map
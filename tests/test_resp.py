@@ -0,0 +1,67 @@
+import pytest
+
+from resp import OK, Parser, ProtocolError, ReplyError, SimpleString, encode_command, encode_reply
+
+
+def _encode(value):
+    out = []
+    encode_reply(value, out)
+    return b"".join(out)
+
+
+def _parse(data):
+    parser = Parser()
+    parser.feed(data)
+    return list(parser)
+
+
+def test_encode_command():
+    assert encode_command("SET", b"k", 12) == b"*3\r\n$3\r\nSET\r\n$1\r\nk\r\n$2\r\n12\r\n"
+    with pytest.raises(TypeError):
+        encode_command("SET", "k", object())
+
+
+@pytest.mark.parametrize("value", [
+    None, OK, 0, -7, b"", b"a\r\nb", [b"x", None, 3, [SimpleString("PONG")]], [],
+])
+def test_reply_round_trip(value):
+    assert _parse(_encode(value)) == [value]
+
+
+def test_reply_types():
+    assert _encode(True) == b":1\r\n"
+    assert _encode("é") == b"$2\r\n\xc3\xa9\r\n"
+    assert isinstance(_parse(_encode(OK))[0], SimpleString)
+    error = _parse(_encode(ReplyError("ERR bad\r\nthing")))[0]
+    assert isinstance(error, ReplyError) and str(error) == "ERR bad thing"
+
+
+def test_partial_frames_are_buffered():
+    data = encode_command("MSET", "a", "1", "b", b"x" * 100) + encode_command("GET", "a")
+    parser = Parser()
+    messages = []
+    for i in range(0, len(data), 3):
+        parser.feed(data[i:i + 3])
+        messages.extend(parser)
+    assert messages == [[b"MSET", b"a", b"1", b"b", b"x" * 100], [b"GET", b"a"]]
+    assert not parser.buffer
+
+
+def test_pipelined_replies_in_order():
+    data = b"".join(_encode(v) for v in (OK, b"v", None, 2))
+    assert _parse(data + b"$5\r\nab") == [OK, b"v", None, 2]
+
+
+@pytest.mark.parametrize("data", [
+    b"!3\r\n", b"$x\r\n", b"$1\r\nabc\r\n", b":1.5\r\n",
+])
+def test_malformed_data_raises(data):
+    with pytest.raises(ProtocolError):
+        _parse(data)
+
+
+def test_bulk_limit():
+    parser = Parser(max_bulk=4)
+    parser.feed(b"$5\r\n")
+    with pytest.raises(ProtocolError):
+        list(parser)
@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+
+from client import CacheClient, HashRing
+from resp import ReplyError
+from server import CacheServer
+from structures import DynamicCache
+
+
+class FlakyCache(DynamicCache):
+    """Raises a non-ReplyError on puts of b"bad", like a full write queue."""
+
+    def put(self, key, value, ttl=None):
+        if key == b"bad":
+            raise RuntimeError("queue full")
+        super().put(key, value, ttl)
+
+
+def _serve(cache, test):
+    async def main():
+        server = CacheServer(cache)
+        await server.start()
+        client = CacheClient([server.address])
+        try:
+            return await asyncio.wait_for(test(server, client), 5)
+        finally:
+            await client.close()
+            await server.close()
+
+    return asyncio.run(main())
+
+
+def test_hash_ring_moves_few_keys():
+    keys = [f"key{i}" for i in range(5000)]
+    ring = HashRing(["a", "b", "c", "d"])
+    before = {k: ring.node_for(k) for k in keys}
+    reordered = HashRing(["d", "c", "b", "a"])
+    assert {k: reordered.node_for(k) for k in keys} == before
+    assert set(before.values()) == {"a", "b", "c", "d"}
+
+    ring.add("e")
+    after = {k: ring.node_for(k) for k in keys}
+    moved = [k for k in keys if after[k] != before[k]]
+    assert all(after[k] == "e" for k in moved)
+    assert 0.1 < len(moved) / len(keys) < 0.3  # about 1/5
+
+    ring.remove("e")
+    assert {k: ring.node_for(k) for k in keys} == before
+    with pytest.raises(LookupError):
+        HashRing().node_for("k")
+
+
+def test_set_get_round_trip():
+    async def test(server, client):
+        await client.set("a", "1")
+        await client.mset({"b": b"2", "c": b"3"})
+        return await client.mget(["a", "b", "c", "d"])
+
+    assert _serve(DynamicCache(10), test) == [b"1", b"2", b"3", None]
+
+
+def test_cache_error_does_not_break_pipeline():
+    async def test(server, client):
+        pipe = client.pipeline()
+        pipe.set("a", "1").set("bad", "x").get("a")
+        replies = await pipe.execute(raise_on_error=False)
+        assert await client.get("a") == b"1"  # connection still usable
+        return server, replies
+
+    server, replies = _serve(FlakyCache(10), test)
+    assert replies[0] == "OK"
+    assert isinstance(replies[1], ReplyError) and "queue full" in str(replies[1])
+    assert replies[2] == b"1"
+    assert server.errors == 1
+
+
+def test_unencodable_value_gets_error_reply():
+    cache = DynamicCache(10)
+    cache.put(b"obj", object())
+
+    async def test(server, client):
+        pipe = client.pipeline()
+        pipe.get("obj").set("a", "1")
+        return await pipe.execute(raise_on_error=False)
+
+    replies = _serve(cache, test)
+    assert isinstance(replies[0], ReplyError)
+    assert replies[1] == "OK"
+
+
+def test_unknown_command_is_an_error():
+    async def test(server, client):
+        with pytest.raises(ReplyError):
+            await client._one("k", "NOPE", "k")
+
+    _serve(DynamicCache(10), test)
+
+
+def test_keys_spread_over_servers():
+    async def main():
+        servers = [CacheServer(DynamicCache(1000)) for _ in range(3)]
+        for server in servers:
+            await server.start()
+        client = CacheClient([s.address for s in servers])
+        try:
+            items = {f"k{i}": b"v%d" % i for i in range(300)}
+            await client.mset(items)
+            keys = list(items) + ["missing"]
+            assert await client.mget(keys) == list(items.values()) + [None]
+            assert await client.get("k7") == b"v7"
+            assert len(await client.ping()) == 3
+        finally:
+            await client.close()
+            for server in servers:
+                await server.close()
+        return items, client, servers
+
+    items, client, servers = asyncio.run(main())
+    for server in servers:
+        owned = [k for k in items if client.ring.node_for(k) == server.address]
+        assert owned and len(server.cache) == len(owned)
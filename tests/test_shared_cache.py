@@ -0,0 +1,74 @@
+import multiprocessing
+import random
+
+import pytest
+
+from shared_cache import SharedMemoryCache
+
+
+@pytest.fixture
+def cache():
+    cache = SharedMemoryCache(64, slot_size=256, num_shards=4)
+    yield cache
+    cache.close()
+
+
+def _writer(cache, start, count):
+    for i in range(start, start + count):
+        cache.put(("k", i), i * i)
+
+
+def test_put_get_update_discard(cache):
+    assert cache.get("a") == -1
+    assert cache.put("a", {"v": 1})
+    assert cache.get("a") == {"v": 1}
+    cache.put("a", [2])
+    assert cache.get("a") == [2]
+    assert len(cache) == 1
+    assert cache.discard("a")
+    assert "a" not in cache and len(cache) == 0
+
+
+def test_evicts_when_a_shard_is_full():
+    cache = SharedMemoryCache(4, num_shards=1)
+    try:
+        for i in range(10):
+            cache.put(i, i)
+        assert len(cache) == 4
+        assert cache.stats()['evictions'] == 6
+        assert sum(cache.get(i) != -1 for i in range(10)) == 4
+    finally:
+        cache.close()
+
+
+def test_oversized_values_are_not_cached(cache):
+    cache.put("a", "small")
+    assert not cache.put("a", "x" * 1000)
+    assert cache.get("a") == -1
+    assert cache.stats()['oversized'] == 1
+
+
+def test_churn_never_returns_stale_values(cache):
+    rng = random.Random(0)
+    latest = {}
+    for i in range(5000):
+        key = rng.randrange(200)
+        if rng.random() < 0.5:
+            cache.put(key, i)
+            latest[key] = i
+        else:
+            value = cache.get(key)
+            assert value == -1 or value == latest[key]
+        if rng.random() < 0.05:
+            cache.discard(key)
+    assert len(cache) <= cache.capacity
+
+
+def test_workers_share_entries(cache):
+    procs = [multiprocessing.Process(target=_writer, args=(cache, n * 10, 10)) for n in range(3)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(10)
+        assert p.exitcode == 0
+    assert {cache.get(("k", i)) for i in range(30)} == {i * i for i in range(30)}
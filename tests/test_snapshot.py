@@ -0,0 +1,52 @@
+import snapshot
+from structures import DynamicCache
+
+
+def test_round_trip_keeps_values_and_order(tmp_path):
+    path = str(tmp_path / "cache.snap")
+    cache = DynamicCache(3)
+    for key in "abc":
+        cache.put(key, key.upper())
+    cache.get("a")
+    cache.save_snapshot(path)
+
+    loaded = DynamicCache.load_snapshot(path)
+    assert loaded.store == {"a": "A", "b": "B", "c": "C"}
+    loaded.put("d", "D")
+    assert "a" in loaded and "b" not in loaded
+
+
+def test_round_trip_restores_ttls(tmp_path, clock):
+    path = str(tmp_path / "cache.snap")
+    cache = DynamicCache(10, clock=clock)
+    cache.put("short", 1, ttl=5)
+    cache.put("long", 2, ttl=60)
+    cache.put("forever", 3)
+    clock.now += 2
+    cache.save_snapshot(path)
+
+    clock.now = 50.0  # a new process has a different monotonic clock
+    loaded = DynamicCache.load_snapshot(path, clock=clock)
+    assert 2.5 < loaded.ttl("short") <= 3
+    assert 57.5 < loaded.ttl("long") <= 58
+    assert loaded.ttl("forever") is None
+    clock.now += 4
+    assert loaded.get("short") == -1
+    assert loaded.get("long") == 2
+    assert loaded.get("forever") == 3
+
+
+def test_load_drops_entries_that_expired_while_saved(tmp_path, monkeypatch, clock):
+    path = str(tmp_path / "cache.snap")
+    cache = DynamicCache(10, clock=clock)
+    cache.put("short", 1, ttl=5)
+    cache.put("long", 2, ttl=60)
+    cache.save_snapshot(path)
+
+    saved = snapshot.time.time()
+    monkeypatch.setattr(snapshot.time, "time", lambda: saved + 10)
+    loaded = DynamicCache.load_snapshot(path, clock=clock)
+    assert "short" not in loaded.store
+    assert "short" not in loaded.policies["LRU"]
+    assert loaded.get("long") == 2
+    assert 49 < loaded.ttl("long") <= 50
@@ -0,0 +1,62 @@
+from metrics import MetricsExporter
+from structures import DynamicCache, ShardedDynamicCache
+
+
+def test_stats_report_served_lookups():
+    cache = DynamicCache(2, policies=("LRU", "LFU"))
+    cache.put("a", 1)
+    cache.get("a")
+    cache.get("b")
+    cache.get_many(["a", "c"])
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses']) == (2, 2)
+    assert stats['hit_rate'] == 0.5
+    assert stats['live_policy']['hits'] == 2
+    assert set(stats['policies']) == {"LRU", "LFU"}
+
+
+def test_served_counts_differ_from_live_policy_after_rejection():
+    cache = DynamicCache(1, policies=("LRU", "LFU"))
+    cache.put("a", 1)
+    cache.current_strategy = "LFU"
+    cache.policies["LFU"].discard("a")
+    cache.get("a")
+    stats = cache.stats()
+    assert stats['misses'] == 1
+    assert stats['policies']['LRU']['hits'] == 1
+
+
+def test_sharded_stats_sum_served_lookups():
+    cache = ShardedDynamicCache(8, num_shards=2)
+    for key in range(4):
+        cache.put(key, key)
+    for key in range(6):
+        cache.get(key)
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses']) == (4, 2)
+
+
+def test_exporter_exports_served_lookups():
+    cache = DynamicCache(4)
+    cache.put("a", 1)
+    cache.get("a")
+    cache.get("b")
+    text = MetricsExporter(cache).render()
+    assert 'swapcache_requests_total{result="hit"} 1' in text
+    assert 'swapcache_requests_total{result="miss"} 1' in text
+
+
+def test_switcher_defaults_damp_flapping():
+    cache = DynamicCache(10, window=200)
+    assert cache.hysteresis > 0
+    assert cache.min_dwell == 200
+    assert DynamicCache(10, decay=0.99).min_dwell == 100
+    assert DynamicCache(10, min_dwell=0, hysteresis=0.0).min_dwell == 0
+
+
+def test_cumulative_scoring_has_no_default_dwell():
+    cache = DynamicCache(10, window=None)
+    assert cache.min_dwell == 0
+    for key in range(50):
+        cache.put(key, key)
+        cache.get(key)
@@ -0,0 +1,55 @@
+import random
+
+import pytest
+
+from arena import ArenaLFU, ArenaLRU
+from structures import LFU, LRU, DynamicCache, create_policy
+
+
+@pytest.mark.parametrize("cls", [LRU, ArenaLRU])
+def test_lru_evicts_least_recently_used(cls):
+    cache = cls(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert cache.get("b") == -1
+    assert cache.get("a") == 1
+
+
+@pytest.mark.parametrize("cls", [LFU, ArenaLFU])
+def test_lfu_evicts_least_frequently_used(cls):
+    cache = cls(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert cache.get("b") == -1
+    assert cache.get("a") == 1
+
+
+@pytest.mark.parametrize("name", ["LRU", "LFU"])
+def test_compact_policies_evict_like_node_policies(name):
+    nodes = create_policy(name, 32)
+    arena = create_policy(name, 32, compact=True)
+    rng = random.Random(3)
+    for _ in range(20000):
+        key = int(rng.paretovariate(1.1)) % 200
+        if rng.random() < 0.05:
+            nodes.discard(key)
+            arena.discard(key)
+            continue
+        hit = nodes.touch(key)
+        assert arena.touch(key) == hit
+        if not hit:
+            assert arena.admit(key) == nodes.admit(key)
+    assert nodes.snapshot_order() == arena.snapshot_order()
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_put_replaces_value(compact):
+    cache = DynamicCache(2, compact=compact)
+    cache.put("a", 1)
+    cache.put("a", 2)
+    assert cache.get("a") == 2
+    assert len(cache) == 1
@@ -0,0 +1,92 @@
+import math
+import random
+
+import pytest
+
+from timing_wheel import TimingWheel
+
+
+def test_expires_at_deadline():
+    wheel = TimingWheel(resolution=1.0)
+    wheel.schedule("a", 5.0)
+    wheel.schedule("b", 5.5)
+    wheel.advance(4.9)
+    assert wheel.pop_expired() == []
+    wheel.advance(5.0)
+    assert wheel.pop_expired() == ["a"]
+    wheel.advance(6.0)
+    assert wheel.pop_expired() == ["b"]
+    assert len(wheel) == 0
+
+
+def test_past_deadline_is_ready_at_once():
+    wheel = TimingWheel(now=10.0)
+    wheel.schedule("a", 3.0)
+    assert wheel.pop_expired() == ["a"]
+
+
+def test_cancel_and_reschedule():
+    wheel = TimingWheel()
+    wheel.schedule("a", 2.0)
+    wheel.schedule("b", 2.0)
+    assert wheel.cancel("a")
+    assert not wheel.cancel("a")
+    wheel.schedule("b", 10.0)
+    wheel.advance(5.0)
+    assert wheel.pop_expired() == []
+    assert wheel.deadline("b") == 10.0
+
+
+def test_pop_expired_respects_limit():
+    wheel = TimingWheel()
+    for i in range(5):
+        wheel.schedule(i, 1.0)
+    wheel.advance(1.0)
+    assert wheel.pop_expired(2) == [0, 1]
+    assert wheel.pop_expired() == [2, 3, 4]
+
+
+def test_cascades_from_higher_levels():
+    wheel = TimingWheel(slots=4, levels=3)
+    wheel.schedule("far", 37.0)  # beyond level 0's 4 ticks and level 1's 16
+    assert wheel.entries["far"][0] == 2
+    wheel.advance(36.0)
+    assert wheel.pop_expired() == []
+    assert wheel.entries["far"][0] == 0  # moved down as its buckets came round
+    wheel.advance(37.0)
+    assert wheel.pop_expired() == ["far"]
+
+
+def test_parks_deadlines_past_the_horizon():
+    wheel = TimingWheel(slots=4, levels=2)  # horizon of 15 ticks
+    wheel.schedule("far", 100.0)
+    wheel.advance(99.0)
+    assert wheel.pop_expired() == []
+    wheel.advance(100.0)
+    assert wheel.pop_expired() == ["far"]
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_matches_brute_force(seed):
+    rng = random.Random(seed)
+    wheel = TimingWheel(resolution=0.5, slots=8, levels=3)
+    deadlines = {}
+    now = 0.0
+    for step in range(400):
+        for _ in range(5):
+            key = rng.randrange(300)
+            deadline = now + rng.expovariate(1 / 50)
+            wheel.schedule(key, deadline)
+            deadlines[key] = deadline
+        if rng.random() < 0.2 and deadlines:
+            key = rng.choice(list(deadlines))
+            wheel.cancel(key)
+            del deadlines[key]
+        now += rng.random() * 3
+        wheel.advance(now)
+        expired = set(wheel.pop_expired())
+        tick = math.floor(now / 0.5)
+        due = {k for k, d in deadlines.items() if math.ceil(d / 0.5) <= tick}
+        assert expired == due
+        for key in expired:
+            assert deadlines.pop(key) <= now
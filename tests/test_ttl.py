@@ -0,0 +1,11 @@
+from structures import DynamicCache
+
+
+def test_ttl_expires_entries(clock):
+    cache = DynamicCache(10, clock=clock)
+    cache.put("a", 1, ttl=5)
+    cache.put("b", 2)
+    clock.now += 6
+    assert cache.get("a") == -1
+    assert cache.get("b") == 2
+    assert cache.expirations == 1
@@ -0,0 +1,116 @@
+import math
+from collections import deque
+
+READY = -1
+
+
+class TimingWheel:
+    """
+    Hierarchical timing wheel for expiry deadlines.
+
+    Level 0 has ``slots`` buckets of one ``resolution`` tick each; every
+    higher level's bucket spans a whole turn of the level below. A deadline
+    is filed at the coarsest level that still distinguishes it and is moved
+    down a level each time its bucket comes round ("cascading"), so
+    scheduling, cancelling and expiring are amortized O(1) and nothing is
+    ever scanned in full. Deadlines past the top level's horizon are parked
+    in its furthest bucket and re-filed when they come round.
+
+    Expired keys collect in a ready queue; drain them with ``pop_expired``.
+    """
+
+    def __init__(self, resolution=1.0, slots=64, levels=4, now=0.0):
+        if slots & (slots - 1) or slots < 2:
+            raise ValueError("slots must be a power of two")
+        self.resolution = resolution
+        self.bits = slots.bit_length() - 1
+        self.mask = slots - 1
+        self.levels = levels
+        self.wheels = [[{} for _ in range(slots)] for _ in range(levels)]
+        self.entries = {}  # key -> (level, slot, deadline)
+        self.scheduled = 0
+        self.ready = deque()
+        self.tick = int(now // resolution)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def deadline(self, key):
+        entry = self.entries.get(key)
+        return entry[2] if entry is not None else None
+
+    def _place(self, key, deadline):
+        due = math.ceil(deadline / self.resolution)
+        delta = due - self.tick
+        if delta <= 0:
+            self.entries[key] = (READY, 0, deadline)
+            self.ready.append(key)
+            return
+        level = 0
+        while level < self.levels - 1 and delta >= 1 << (self.bits * (level + 1)):
+            level += 1
+        horizon = (1 << (self.bits * (level + 1))) - 1
+        if delta > horizon:
+            due = self.tick + horizon
+        slot = (due >> (self.bits * level)) & self.mask
+        self.wheels[level][slot][key] = deadline
+        self.entries[key] = (level, slot, deadline)
+        self.scheduled += 1
+
+    def schedule(self, key, deadline):
+        self.cancel(key)
+        self._place(key, deadline)
+
+    def cancel(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return False
+        level, slot, _ = entry
+        if level != READY:
+            del self.wheels[level][slot][key]
+            self.scheduled -= 1
+        return True
+
+    def _cascade(self, level, slot):
+        bucket = self.wheels[level][slot]
+        if not bucket:
+            return
+        self.wheels[level][slot] = {}
+        self.scheduled -= len(bucket)
+        for key, deadline in bucket.items():
+            self._place(key, deadline)
+
+    def _step(self):
+        self.tick += 1
+        t = self.tick
+        top = 0
+        while top < self.levels - 1 and t & ((1 << (self.bits * (top + 1))) - 1) == 0:
+            top += 1
+        for level in range(top, 0, -1):
+            self._cascade(level, (t >> (self.bits * level)) & self.mask)
+        self._cascade(0, t & self.mask)
+
+    def advance(self, now):
+        """Move the wheel to ``now``, queueing every key whose deadline has passed."""
+        target = int(now // self.resolution)
+        while self.tick < target:
+            if not self.scheduled:
+                self.tick = target
+                break
+            self._step()
+
+    def pop_expired(self, limit=None):
+        """Return up to ``limit`` expired keys, removing them from the wheel."""
+        out = []
+        while self.ready and (limit is None or len(out) < limit):
+            key = self.ready.popleft()
+            entry = self.entries.get(key)
+            # Skip keys that were cancelled or rescheduled after expiring
+            if entry is None or entry[0] != READY:
+                continue
+            del self.entries[key]
+            out.append(key)
+        return out
@@ -0,0 +1,121 @@
+"""
+Seeded synthetic access patterns for benchmarking eviction policies.
+
+Every generator returns a list of ``n`` integer keys and is fully
+determined by its ``seed``, so runs are reproducible across machines.
+"""
+import random
+from itertools import accumulate
+
+
+def _zipf_cdf(keys, skew):
+    return list(accumulate(1.0 / (rank ** skew) for rank in range(1, keys + 1)))
+
+
+def _shuffled_ids(keys, rng, offset=0):
+    # Hot ranks map to scattered ids, so popularity is not just key order
+    ids = list(range(offset, offset + keys))
+    rng.shuffle(ids)
+    return ids
+
+
+def zipf(n, keys=10000, skew=0.99, seed=0):
+    """Independent draws from a Zipf(``skew``) distribution over ``keys`` keys."""
+    rng = random.Random(seed)
+    ids = _shuffled_ids(keys, rng)
+    ranks = rng.choices(range(keys), cum_weights=_zipf_cdf(keys, skew), k=n)
+    return [ids[r] for r in ranks]
+
+
+def scan_hot(n, hot_keys=1000, skew=0.8, scan_length=5000, scan_every=20000, seed=0):
+    """
+    A Zipf hot set interrupted by one-pass sequential scans over keys that
+    are never reused, the pattern that flushes a plain LRU.
+    """
+    rng = random.Random(seed)
+    ids = _shuffled_ids(hot_keys, rng)
+    cdf = _zipf_cdf(hot_keys, skew)
+    out = []
+    next_scan_key = hot_keys
+    while len(out) < n:
+        burst = min(scan_every, n - len(out))
+        out.extend(ids[r] for r in rng.choices(range(hot_keys), cum_weights=cdf, k=burst))
+        scan = min(scan_length, n - len(out))
+        out.extend(range(next_scan_key, next_scan_key + scan))
+        next_scan_key += scan
+    return out
+
+
+def shifting(n, keys=10000, skew=0.99, phases=4, seed=0):
+    """
+    Zipf traffic whose popular keys change abruptly ``phases`` times, so a
+    policy that over-trusts old frequencies keeps stale entries.
+    """
+    rng = random.Random(seed)
+    cdf = _zipf_cdf(keys, skew)
+    out = []
+    per_phase = -(-n // phases)
+    for phase in range(phases):
+        ids = _shuffled_ids(keys, rng, offset=phase * keys)
+        count = min(per_phase, n - len(out))
+        out.extend(ids[r] for r in rng.choices(range(keys), cum_weights=cdf, k=count))
+    return out
+
+
+def phases(n, keys=10000, skew=0.99, window=500, phase_length=20000, seed=0):
+    """
+    Alternates a stable Zipf hot set, where frequency wins, with a drifting
+    working set of ``window`` keys, where recency wins and the hot set's old
+    counts only get in the way.
+    """
+    rng = random.Random(seed)
+    ids = _shuffled_ids(keys, rng)
+    cdf = _zipf_cdf(keys, skew)
+    out = []
+    next_key = keys
+    phase = 0
+    while len(out) < n:
+        count = min(phase_length, n - len(out))
+        if phase % 2 == 0:
+            out.extend(ids[r] for r in rng.choices(range(keys), cum_weights=cdf, k=count))
+        else:
+            # The window slides forward by one new key every other request
+            for i in range(count):
+                if i % 2 == 0:
+                    next_key += 1
+                out.append(next_key - rng.randrange(window))
+        phase += 1
+    return out
+
+
+def loop(n, loop_size=1200, noise=0.05, keys=100000, seed=0):
+    """
+    Repeated sequential passes over ``loop_size`` keys with a fraction of
+    random one-off keys mixed in. A loop just larger than the cache is the
+    worst case for LRU.
+    """
+    rng = random.Random(seed)
+    out = []
+    i = 0
+    while len(out) < n:
+        if rng.random() < noise:
+            out.append(loop_size + rng.randrange(keys))
+        else:
+            out.append(i)
+            i = (i + 1) % loop_size
+    return out
+
+
+WORKLOADS = {
+    "zipf": zipf,
+    "scan-hot": scan_hot,
+    "shifting": shifting,
+    "phases": phases,
+    "loop": loop,
+}
+
+
+def make_workload(name, n, seed=0, **params):
+    if name not in WORKLOADS:
+        raise KeyError(f"Unknown workload: {name!r}")
+    return WORKLOADS[name](n, seed=seed, **params)